@@ -0,0 +1,64 @@
+"""
+Benchmark downscaling of large JPEGs before upload.
+
+Compares a full resolution decode followed by `ImageOps.contain` with
+`preprocess_image`, which decodes JPEGs at a reduced scale first.
+
+    poetry run python benchmarks/jpeg_downscale.py --width 6000 --height 4000
+"""
+
+import argparse
+import io
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from epigos.core.uploader import DEFAULT_IMAGE_SIZE, preprocess_image
+
+
+def make_jpeg(path: Path, size: typing.Tuple[int, int]) -> None:
+    """
+    Write a noisy JPEG, which is as expensive to decode as a camera photo.
+    """
+    Image.effect_noise(size, 64).convert("RGB").save(path, quality=90)
+
+
+def full_decode(path: Path) -> typing.Tuple[int, int]:
+    """
+    Previous implementation decoding the full resolution image
+    """
+    with Image.open(path) as img:
+        img = ImageOps.contain(img, DEFAULT_IMAGE_SIZE)
+        with io.BytesIO() as fp:
+            img.save(fp, format="JPEG")
+        return img.size
+
+
+def draft_decode(path: Path) -> typing.Tuple[int, int]:
+    return preprocess_image(path).size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--images", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = [Path(temp_dir) / f"image-{idx}.jpg" for idx in range(args.images)]
+        for path in paths:
+            make_jpeg(path, (args.width, args.height))
+
+        for name, fn in [("full decode", full_decode), ("draft decode", draft_decode)]:
+            start = time.perf_counter()
+            sizes = [fn(path) for path in paths]
+            per_image = (time.perf_counter() - start) / len(paths)
+            print(f"{name:<14} {per_image * 1000:8.1f} ms/image -> {sizes[0]}")
+
+
+if __name__ == "__main__":
+    main()
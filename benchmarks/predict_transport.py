@@ -0,0 +1,105 @@
+"""
+Benchmark the transports of prediction requests.
+
+Sends the same images to a local stand-in of the prediction API with the
+images base64 encoded in a JSON body and as multipart form data, and compares
+the bytes sent and the latency per request.
+
+    poetry run python benchmarks/predict_transport.py --width 4000 --height 3000
+"""
+
+import argparse
+import http.server
+import io
+import json
+import threading
+import time
+import typing
+
+from PIL import Image
+
+from epigos import Epigos, typings
+
+RESPONSE = json.dumps(
+    {"detections": [dict(label="foo", confidence=0.7, x=1, y=2, width=10, height=10)]}
+).encode("utf-8")
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Reads the request body and answers with a fixed detection
+    """
+
+    received = 0
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        length = int(self.headers["Content-Length"])
+        self.rfile.read(length)
+        with StandInHandler.lock:
+            StandInHandler.received += length
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args: typing.Any) -> None:
+        pass
+
+
+def make_jpeg(size: typing.Tuple[int, int]) -> bytes:
+    """
+    Encode a noisy JPEG, which compresses about as well as a camera photo.
+    """
+    buffer = io.BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def run(
+    base_url: str, transport: typings.PredictTransport, images: typing.List[bytes]
+) -> typing.Tuple[float, int]:
+    StandInHandler.received = 0
+    with Epigos("api_key", base_url=base_url, transport=transport) as client:
+        model = client.object_detection("model_id")
+        # warm up the connection
+        model.detect(images[0])
+        StandInHandler.received = 0
+
+        start = time.perf_counter()
+        for image in images:
+            model.detect(image)
+        per_image = (time.perf_counter() - start) / len(images)
+    return per_image, StandInHandler.received // len(images)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--images", type=int, default=20)
+    args = parser.parse_args()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        images = [make_jpeg((args.width, args.height)) for _ in range(args.images)]
+        print(f"image size {len(images[0]) / 1024:10.1f} KiB")
+        for transport in (
+            typings.PredictTransport.json,
+            typings.PredictTransport.multipart,
+        ):
+            per_image, sent = run(base_url, transport, images)
+            print(
+                f"{transport.value:<10} {sent / 1024:10.1f} KiB/request "
+                f"{per_image * 1000:8.1f} ms/request"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
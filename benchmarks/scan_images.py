@@ -0,0 +1,78 @@
+"""
+Benchmark directory scanning of image datasets.
+
+Compares the previous per-extension recursive globs with the single-pass
+`scan_images` scanner on a synthetic tree of empty image files.
+
+    poetry run python benchmarks/scan_images.py --files 1000000 --workers 8
+"""
+
+import argparse
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+from epigos.dataset.utils import IMAGE_FILE_EXTENSIONS, scan_images
+
+
+def make_tree(root: Path, num_files: int, num_dirs: int) -> None:
+    """
+    Create `num_files` empty image files spread over `num_dirs` class directories
+    with two levels of nesting.
+    """
+    for idx in range(num_files):
+        directory = root / f"class-{idx % num_dirs}" / f"part-{idx % 10}"
+        if idx < num_dirs * 10:
+            directory.mkdir(parents=True, exist_ok=True)
+        ext = IMAGE_FILE_EXTENSIONS[idx % len(IMAGE_FILE_EXTENSIONS)]
+        (directory / f"img-{idx}{ext}").touch()
+
+
+def glob_images(directory: Path) -> typing.Dict[str, Path]:
+    """
+    Previous implementation walking the tree once per extension
+    """
+    return {
+        p.name: p for ext in IMAGE_FILE_EXTENSIONS for p in directory.glob(f"**/*{ext}")
+    }
+
+
+def timed(fn: typing.Callable[[], typing.Dict[str, Path]]) -> typing.Tuple[float, int]:
+    start = time.perf_counter()
+    found = fn()
+    return time.perf_counter() - start, len(found)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--dirs", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--root", type=Path, default=None, help="Reuse an existing tree"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = args.root
+        if root is None:
+            root = Path(temp_dir)
+            print(f"Creating {args.files} files in {root} ...")
+            make_tree(root, args.files, args.dirs)
+
+        runs = [
+            ("glob per extension", lambda: glob_images(root)),
+            ("scan_images", lambda: scan_images(root)),
+            (
+                f"scan_images workers={args.workers}",
+                lambda: scan_images(root, num_workers=args.workers),
+            ),
+        ]
+        for name, fn in runs:
+            seconds, count = timed(fn)
+            print(f"{name:<32} {seconds:8.2f}s {count:>10} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
-from .client import Epigos
-from .core import ClassificationModel, ObjectDetectionModel, Project
+from .client import AsyncEpigos, Epigos
+from .core import (
+    AsyncClassificationModel,
+    AsyncObjectDetectionModel,
+    AsyncProject,
+    ClassificationModel,
+    ObjectDetectionModel,
+    Project,
+)
 from .exceptions import EpigosException
 
 __all__ = (
+    "AsyncClassificationModel",
+    "AsyncEpigos",
+    "AsyncObjectDetectionModel",
+    "AsyncProject",
     "ClassificationModel",
     "Epigos",
     "EpigosException",
@@ -1,32 +1,104 @@
+import base64
+import dataclasses
+import os
+import secrets
 import typing
 from json import JSONDecodeError
 
 import httpx
 import tenacity
 
+from . import typings
 from .__version__ import __version__
-from .core import ClassificationModel, ObjectDetectionModel, Project
+from .core import (
+    AsyncClassificationModel,
+    AsyncObjectDetectionModel,
+    AsyncProject,
+    ClassificationModel,
+    ObjectDetectionModel,
+    Project,
+)
+from .core.cache import PredictionCache
 from .exceptions import EpigosException
+from .utils import image as image_utils
 from .utils import logger
+from .utils.limiter import AdaptiveLimiter, AsyncAdaptiveLimiter, alimited, limited
+from .utils.retry import (
+    RetryBudget,
+    parse_retry_after,
+    stop_retry_after_exceeds,
+    stop_retry_budget,
+    wait_retry_after,
+)
 
 BASE_API = "https://api.epigos.ai"
-RETRY_STATUS_CODES = [502, 503, 504]
+RETRY_STATUS_CODES = [429, 502, 503, 504]
+DEFAULT_RETRY_MAX_WAIT = 15.0
+# statuses of servers rejecting multipart prediction requests
+MULTIPART_UNSUPPORTED_STATUS_CODES = [400, 415, 422]
+DEFAULT_STORAGE_OPTIONS: typings.StorageOptions = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "http2": False,
+    "timeout": 60.0,
+}
+DEFAULT_CONCURRENCY_OPTIONS: typings.ConcurrencyOptions = {
+    "initial_limit": 4,
+    "min_limit": 1,
+    "max_limit": 64,
+    "backoff": 0.5,
+    "latency_tolerance": 2.0,
+}
 
 
-def _retry_on_status_codes(exc: BaseException) -> bool:
-    return isinstance(exc, EpigosException) and exc.status_code in RETRY_STATUS_CODES
+def _retry_on_status_codes(
+    status_codes: typing.Sequence[int],
+) -> typing.Callable[[BaseException], bool]:
+    def _retry(exc: BaseException) -> bool:
+        return isinstance(exc, EpigosException) and exc.status_code in status_codes
 
+    return _retry
 
-class Epigos:
+
+@dataclasses.dataclass(frozen=True)
+class _ClientOptions:
+    """
+    Connection, retry and prediction settings of a client,
+    shared by its requests.
     """
-    Epigos.
 
-    API client for handling resource request to Epigos API.
+    base_url: httpx.URL
+    timeout: httpx.Timeout
+    storage: typings.StorageOptions
+    concurrency: typing.Optional[typings.ConcurrencyOptions]
+    retry: typings.RetryOptions
+    url_validation: typings.UrlValidation
+    transport: typings.PredictTransport
+
+
+class _BaseEpigos:
+    """
+    Shared configuration and helpers for the sync and async API clients.
 
     :param api_key: Your epigos.ai workspace api key
     :param base_url: Base url to the epigos api.
     :param timeout: HTTP request timeout in seconds. Defaults to 15 seconds.
     :param retries: Number of times to retry requests. Defaults to 3.
+    :param storage_options: Connection pool settings for image uploads
+    to storage.
+    :param concurrency: If set, the number of requests in flight to the API
+    and to storage adapts to their latency and error rate within these limits.
+    :param retry_options: Default retry policy of API requests.
+    :param retry_budget: Budget limiting retries to a fraction of the requests.
+    Defaults to a budget of 20% of requests.
+    :param url_validation: How image urls are checked before predictions.
+    `cached` checks each url once every few minutes, `pooled` checks it before
+    every prediction and `off` leaves it to the API. Defaults to `cached`.
+    :param transport: How images are sent for predictions. `json` sends them
+    base64 encoded in a JSON body, `multipart` sends the image bytes as
+    multipart form data and `auto` tries multipart and falls back to JSON
+    if the API rejects it. Defaults to `json`.
     """
 
     def __init__(
@@ -35,19 +107,183 @@ class Epigos:
         base_url: str = BASE_API,
         timeout: float = 15.0,
         retries: int = 3,
+        storage_options: typing.Optional[typings.StorageOptions] = None,
+        concurrency: typing.Optional[typings.ConcurrencyOptions] = None,
+        retry_options: typing.Optional[typings.RetryOptions] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        url_validation: typings.UrlValidation = typings.UrlValidation.cached,
+        transport: typings.PredictTransport = typings.PredictTransport.json,
     ):
         self._api_key = api_key
-        self.client = httpx.Client(
+        self._options = _ClientOptions(
             base_url=httpx.URL(base_url),
             timeout=httpx.Timeout(timeout=timeout),
-            headers={
-                "Content-Type": "application/json",
-                "X-Api-Key": self._api_key,
-                "X-Client-Sdk": f"Epigos-SDK/Python; Version: {__version__}",
-            },
+            storage={**DEFAULT_STORAGE_OPTIONS, **(storage_options or {})},
+            concurrency=(
+                {**DEFAULT_CONCURRENCY_OPTIONS, **concurrency}
+                if concurrency is not None
+                else None
+            ),
+            retry=retry_options or {},
+            url_validation=typings.UrlValidation(url_validation),
+            transport=typings.PredictTransport(transport),
         )
         self.retry_max_attempts = retries
         self._retry: typing.Optional[tenacity.RetryCallState] = None
+        self.retry_budget = retry_budget or RetryBudget()
+        self.url_cache = image_utils.UrlCache()
+        self._multipart_supported: typing.Optional[bool] = None
+
+    def concurrent_requests(self, num_workers: int) -> int:
+        """
+        Number of requests to run at a time for the given number of workers.
+        With adaptive concurrency, the limiters admit requests up to their
+        current limit, so enough requests run to reach their highest limit.
+        :param num_workers: Number of workers requested
+        :return: int
+        """
+        concurrency = self._options.concurrency
+        if concurrency is None:
+            return num_workers
+        return max(num_workers, concurrency.get("max_limit", num_workers))
+
+    def _headers(self) -> typing.Dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "X-Api-Key": self._api_key,
+            "X-Client-Sdk": f"Epigos-SDK/Python; Version: {__version__}",
+        }
+
+    def _storage_client_kwargs(self) -> typing.Dict[str, typing.Any]:
+        """
+        Settings of the connection pool used for uploads to presigned urls.
+        Storage requests are authorized by the url, so no api headers are sent.
+        """
+        options = self._options.storage
+        return {
+            "limits": httpx.Limits(
+                max_connections=options.get("max_connections"),
+                max_keepalive_connections=options.get("max_keepalive_connections"),
+                keepalive_expiry=options.get("keepalive_expiry"),
+            ),
+            "timeout": httpx.Timeout(timeout=options.get("timeout")),
+            "http2": options.get("http2", False),
+        }
+
+    def _url_checked(self, url: str) -> typing.Optional[bool]:
+        """
+        Result of checking an image url without requesting it,
+        or None if the url has to be requested.
+        """
+        if not image_utils.has_url_scheme(url):
+            return False
+        if self._options.url_validation == typings.UrlValidation.off:
+            return True
+        if (
+            self._options.url_validation == typings.UrlValidation.cached
+            and url in self.url_cache
+        ):
+            return True
+        return None
+
+    def _url_validated(self, url: str, valid: bool) -> bool:
+        if valid and self._options.url_validation == typings.UrlValidation.cached:
+            self.url_cache.add(url)
+        return valid
+
+    def _use_multipart(self) -> bool:
+        if self._options.transport == typings.PredictTransport.multipart:
+            return True
+        return (
+            self._options.transport == typings.PredictTransport.auto
+            and self._multipart_supported is not False
+        )
+
+    def _multipart_accepted(self) -> None:
+        if self._options.transport == typings.PredictTransport.auto:
+            self._multipart_supported = True
+
+    def _multipart_rejected(self, exc: EpigosException) -> bool:
+        """
+        Records a failed multipart request while negotiating the transport.
+        Returns true if the request has to be sent again as JSON.
+        """
+        if (
+            self._options.transport != typings.PredictTransport.auto
+            or self._multipart_supported
+            or exc.status_code not in MULTIPART_UNSUPPORTED_STATUS_CODES
+        ):
+            return False
+        if self._multipart_supported is None:
+            logger.info(
+                "Multipart predictions rejected with status %s, sending JSON",
+                exc.status_code,
+            )
+        self._multipart_supported = False
+        return True
+
+    @staticmethod
+    def _image_post_kwargs(
+        image: typing.Union[str, bytes],
+        fields: typing.Dict[str, typing.Any],
+        multipart: bool,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Request body of an image sent as multipart form data or in a JSON body.
+        """
+        if multipart and isinstance(image, bytes):
+            # the client sends JSON by default, so the multipart content type
+            # is set on the request and httpx encodes the body with its boundary
+            boundary = secrets.token_hex(16)
+            return {
+                "data": {
+                    key: str(value).lower() if isinstance(value, bool) else str(value)
+                    for key, value in fields.items()
+                    if value is not None
+                },
+                "files": {"image": ("image.jpg", image, "image/jpeg")},
+                "headers": {
+                    "Content-Type": f"multipart/form-data; boundary={boundary}"
+                },
+            }
+        if isinstance(image, bytes):
+            image = base64.b64encode(image).decode("ascii")
+        return {"json": {"image": image, **fields}}
+
+    def _retry_kwargs(
+        self, retry: typing.Optional[typings.RetryOptions] = None
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Retry policy shared by the sync and async request loops.
+        Options given for a call override the options of the client.
+        """
+        options: typings.RetryOptions = {**self._options.retry, **(retry or {})}
+        max_wait = options.get("max_wait", DEFAULT_RETRY_MAX_WAIT)
+
+        stops: typing.List[tenacity.stop.stop_base] = [
+            tenacity.stop_after_attempt(
+                options.get("attempts", self.retry_max_attempts)
+            )
+        ]
+        wait: tenacity.wait.wait_base = tenacity.wait_random_exponential(
+            multiplier=1, max=max_wait
+        )
+        if options.get("honor_retry_after", True):
+            stops.append(stop_retry_after_exceeds(max_wait))
+            wait = wait_retry_after(wait, max_wait)
+        if options.get("budget", True):
+            # checked last, so the budget is only spent on retries that happen
+            stops.append(stop_retry_budget(self.retry_budget))
+
+        return {
+            "stop": tenacity.stop_any(*stops),
+            "wait": wait,
+            "reraise": True,
+            "retry": tenacity.retry_if_exception(
+                _retry_on_status_codes(options.get("status_codes", RETRY_STATUS_CODES))
+            ),
+            "before_sleep": tenacity.before_sleep_log(logger, logger.level),
+        }
 
     @staticmethod
     def _deserialize(
@@ -69,9 +305,101 @@ class Epigos:
                 message=json_data.get("message"),
                 details=json_data.get("details") or [],
                 status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
             )
         return json_data
 
+
+class Epigos(_BaseEpigos):
+    """
+    Epigos.
+
+    API client for handling resource request to Epigos API.
+
+    :param api_key: Your epigos.ai workspace api key
+    :param base_url: Base url to the epigos api.
+    :param timeout: HTTP request timeout in seconds. Defaults to 15 seconds.
+    :param retries: Number of times to retry requests. Defaults to 3.
+    :param storage_options: Connection pool settings for image uploads
+    to storage.
+    :param concurrency: If set, the number of requests in flight to the API
+    and to storage adapts to their latency and error rate within these limits.
+    :param retry_options: Default retry policy of API requests.
+    :param retry_budget: Budget limiting retries to a fraction of the requests.
+    Defaults to a budget of 20% of requests.
+    :param url_validation: How image urls are checked before predictions.
+    `cached` checks each url once every few minutes, `pooled` checks it before
+    every prediction and `off` leaves it to the API. Defaults to `cached`.
+    :param transport: How images are sent for predictions. `json` sends them
+    base64 encoded in a JSON body, `multipart` sends the image bytes as
+    multipart form data and `auto` tries multipart and falls back to JSON
+    if the API rejects it. Defaults to `json`.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = BASE_API,
+        timeout: float = 15.0,
+        retries: int = 3,
+        storage_options: typing.Optional[typings.StorageOptions] = None,
+        concurrency: typing.Optional[typings.ConcurrencyOptions] = None,
+        retry_options: typing.Optional[typings.RetryOptions] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        url_validation: typings.UrlValidation = typings.UrlValidation.cached,
+        transport: typings.PredictTransport = typings.PredictTransport.json,
+    ):
+        super().__init__(
+            api_key,
+            base_url=base_url,
+            timeout=timeout,
+            retries=retries,
+            storage_options=storage_options,
+            concurrency=concurrency,
+            retry_options=retry_options,
+            retry_budget=retry_budget,
+            url_validation=url_validation,
+            transport=transport,
+        )
+        self.client = httpx.Client(
+            base_url=self._options.base_url,
+            timeout=self._options.timeout,
+            headers=self._headers(),
+        )
+        self.storage = httpx.Client(**self._storage_client_kwargs())
+        self.limiter: typing.Optional[AdaptiveLimiter] = None
+        self.storage_limiter: typing.Optional[AdaptiveLimiter] = None
+        concurrency = self._options.concurrency
+        if concurrency is not None:
+            self.limiter = AdaptiveLimiter(**concurrency)
+            self.storage_limiter = AdaptiveLimiter(**concurrency)
+
+    def __enter__(self) -> "Epigos":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the underlying HTTP connections.
+        """
+        self.client.close()
+        self.storage.close()
+
+    def check_url(self, url: str) -> bool:
+        """
+        Check whether an image url is valid, following the url validation mode.
+        Urls are requested on the storage connection pool,
+        so no api headers are sent.
+        :param url: URL of image
+        :return: Boolean
+        """
+        checked = self._url_checked(url)
+        if checked is not None:
+            return checked
+        return self._url_validated(url, image_utils.is_url(url, client=self.storage))
+
     def make_request(
         self,
         *,
@@ -79,6 +407,7 @@ class Epigos:
         method: str,
         json: typing.Optional[typing.Any] = None,
         params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        retry: typing.Optional[typings.RetryOptions] = None,
         **kwargs: typing.Any,
     ) -> typing.Any:
         """
@@ -88,26 +417,25 @@ class Epigos:
         :param method: HTTP Method to call
         :param json: Request body
         :param params: Query parameters in the url
+        :param retry: Retry policy of this request,
+        overriding the retry options of the client.
         :returns: Returns the response data from the api
         """
-        retryer = tenacity.Retrying(
-            stop=tenacity.stop_after_attempt(self.retry_max_attempts),
-            wait=tenacity.wait_random_exponential(multiplier=1, max=15),
-            reraise=True,
-            retry=tenacity.retry_if_exception(_retry_on_status_codes),
-            before_sleep=tenacity.before_sleep_log(logger, logger.level),
-        )
+        self.retry_budget.deposit()
+        retryer = tenacity.Retrying(**self._retry_kwargs(retry))
         for attempt in retryer:
             with attempt:
                 attempt.retry_state.fn = self.make_request  # type: ignore[assignment]
                 self._retry = attempt.retry_state
-                response = self.client.request(
-                    method,
-                    path,
-                    params=httpx.QueryParams(params),
-                    json=json,
-                    **kwargs,
-                )
+                with limited(self.limiter) as slot:
+                    response = self.client.request(
+                        method,
+                        path,
+                        params=httpx.QueryParams(params),
+                        json=json,
+                        **kwargs,
+                    )
+                    slot.report(response.status_code)
                 return self._deserialize(response)
 
     def make_post(
@@ -130,6 +458,38 @@ class Epigos:
             path=path, method="POST", json=json, params=params, **kwargs
         )
 
+    def make_image_post(
+        self,
+        path: str,
+        *,
+        image: typing.Union[str, bytes],
+        fields: typing.Dict[str, typing.Any],
+    ) -> typing.Any:
+        """
+        Makes the HTTP POST request of an image and returns deserialized data.
+        Image bytes are sent following the transport of the client,
+        image urls are always sent in a JSON body.
+
+        :param path: Path to method endpoint
+        :param image: Encoded image bytes or url of image
+        :param fields: Other fields of the request body
+        :returns: Returns the response data from the api
+        """
+        if isinstance(image, bytes) and self._use_multipart():
+            try:
+                res = self.make_post(
+                    path, **self._image_post_kwargs(image, fields, multipart=True)
+                )
+            except EpigosException as exc:
+                if not self._multipart_rejected(exc):
+                    raise
+            else:
+                self._multipart_accepted()
+                return res
+        return self.make_post(
+            path, **self._image_post_kwargs(image, fields, multipart=False)
+        )
+
     def make_get(
         self,
         path: str,
@@ -146,32 +506,287 @@ class Epigos:
         """
         return self.make_request(path=path, method="GET", params=params, **kwargs)
 
-    def project(self, project_id: str) -> Project:
+    def project(
+        self,
+        project_id: str,
+        labels_path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None,
+    ) -> Project:
         """
         Creates an instance of project using the given project_id
         :param project_id: ID of project to load
+        :param labels_path: Path to a JSON file persisting the label IDs
+        of the project between runs.
         :return: Project
         """
         if project_id is None:
             raise ValueError("project_id is required")
-        return Project(self, project_id)
+        return Project(self, project_id, labels_path=labels_path)
 
-    def classification(self, model_id: str) -> ClassificationModel:
+    def classification(
+        self, model_id: str, cache: typing.Optional[PredictionCache] = None
+    ) -> ClassificationModel:
         """
         Creates an instance of classification model using the given model ID
         :param model_id: Model to load
+        :param cache: Cache answering repeated predictions of the same image.
         :return: ClassificationModel
         """
         if model_id is None:
             raise ValueError("model_id is required")
-        return ClassificationModel(self, model_id)
+        return ClassificationModel(self, model_id, cache=cache)
 
-    def object_detection(self, model_id: str) -> ObjectDetectionModel:
+    def object_detection(
+        self, model_id: str, cache: typing.Optional[PredictionCache] = None
+    ) -> ObjectDetectionModel:
         """
         Creates an instance of object detection model using the given model ID
         :param model_id: Model to load
+        :param cache: Cache answering repeated predictions of the same image.
         :return: ObjectDetectionModel
         """
         if model_id is None:
             raise ValueError("model_id is required")
-        return ObjectDetectionModel(self, model_id)
+        return ObjectDetectionModel(self, model_id, cache=cache)
+
+
+class AsyncEpigos(_BaseEpigos):
+    """
+    Async Epigos.
+
+    Asyncio API client for handling resource request to Epigos API.
+    It mirrors `Epigos` but every network call is a coroutine, so a single
+    event loop can keep many requests in flight.
+
+    :param api_key: Your epigos.ai workspace api key
+    :param base_url: Base url to the epigos api.
+    :param timeout: HTTP request timeout in seconds. Defaults to 15 seconds.
+    :param retries: Number of times to retry requests. Defaults to 3.
+    :param storage_options: Connection pool settings for image uploads
+    to storage.
+    :param concurrency: If set, the number of requests in flight to the API
+    and to storage adapts to their latency and error rate within these limits.
+    :param retry_options: Default retry policy of API requests.
+    :param retry_budget: Budget limiting retries to a fraction of the requests.
+    Defaults to a budget of 20% of requests.
+    :param url_validation: How image urls are checked before predictions.
+    `cached` checks each url once every few minutes, `pooled` checks it before
+    every prediction and `off` leaves it to the API. Defaults to `cached`.
+    :param transport: How images are sent for predictions. `json` sends them
+    base64 encoded in a JSON body, `multipart` sends the image bytes as
+    multipart form data and `auto` tries multipart and falls back to JSON
+    if the API rejects it. Defaults to `json`.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = BASE_API,
+        timeout: float = 15.0,
+        retries: int = 3,
+        storage_options: typing.Optional[typings.StorageOptions] = None,
+        concurrency: typing.Optional[typings.ConcurrencyOptions] = None,
+        retry_options: typing.Optional[typings.RetryOptions] = None,
+        retry_budget: typing.Optional[RetryBudget] = None,
+        url_validation: typings.UrlValidation = typings.UrlValidation.cached,
+        transport: typings.PredictTransport = typings.PredictTransport.json,
+    ):
+        super().__init__(
+            api_key,
+            base_url=base_url,
+            timeout=timeout,
+            retries=retries,
+            storage_options=storage_options,
+            concurrency=concurrency,
+            retry_options=retry_options,
+            retry_budget=retry_budget,
+            url_validation=url_validation,
+            transport=transport,
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self._options.base_url,
+            timeout=self._options.timeout,
+            headers=self._headers(),
+        )
+        self.storage = httpx.AsyncClient(**self._storage_client_kwargs())
+        self.limiter: typing.Optional[AsyncAdaptiveLimiter] = None
+        self.storage_limiter: typing.Optional[AsyncAdaptiveLimiter] = None
+        concurrency = self._options.concurrency
+        if concurrency is not None:
+            self.limiter = AsyncAdaptiveLimiter(**concurrency)
+            self.storage_limiter = AsyncAdaptiveLimiter(**concurrency)
+
+    async def __aenter__(self) -> "AsyncEpigos":
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the underlying HTTP connections.
+        """
+        await self.client.aclose()
+        await self.storage.aclose()
+
+    async def check_url(self, url: str) -> bool:
+        """
+        Check whether an image url is valid, following the url validation mode.
+        Urls are requested on the storage connection pool,
+        so no api headers are sent.
+        :param url: URL of image
+        :return: Boolean
+        """
+        checked = self._url_checked(url)
+        if checked is not None:
+            return checked
+        return self._url_validated(
+            url, await image_utils.ais_url(url, client=self.storage)
+        )
+
+    async def make_request(
+        self,
+        *,
+        path: str,
+        method: str,
+        json: typing.Optional[typing.Any] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        retry: typing.Optional[typings.RetryOptions] = None,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        """
+        Makes the HTTP request and returns deserialized data
+
+        :param path: Path to method endpoint
+        :param method: HTTP Method to call
+        :param json: Request body
+        :param params: Query parameters in the url
+        :param retry: Retry policy of this request,
+        overriding the retry options of the client.
+        :returns: Returns the response data from the api
+        """
+        self.retry_budget.deposit()
+        retryer = tenacity.AsyncRetrying(**self._retry_kwargs(retry))
+        async for attempt in retryer:
+            with attempt:
+                attempt.retry_state.fn = self.make_request  # type: ignore[assignment]
+                self._retry = attempt.retry_state
+                async with alimited(self.limiter) as slot:
+                    response = await self.client.request(
+                        method,
+                        path,
+                        params=httpx.QueryParams(params),
+                        json=json,
+                        **kwargs,
+                    )
+                    slot.report(response.status_code)
+                return self._deserialize(response)
+
+    async def make_post(
+        self,
+        path: str,
+        *,
+        json: typing.Optional[typing.Any] = None,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        """
+        Makes the HTTP POST request and returns deserialized data
+
+        :param path: Path to method endpoint
+        :param json: Request body
+        :param params: Query parameters in the url
+        :returns: Returns the response data from the api
+        """
+        return await self.make_request(
+            path=path, method="POST", json=json, params=params, **kwargs
+        )
+
+    async def make_image_post(
+        self,
+        path: str,
+        *,
+        image: typing.Union[str, bytes],
+        fields: typing.Dict[str, typing.Any],
+    ) -> typing.Any:
+        """
+        Makes the HTTP POST request of an image and returns deserialized data.
+        Image bytes are sent following the transport of the client,
+        image urls are always sent in a JSON body.
+
+        :param path: Path to method endpoint
+        :param image: Encoded image bytes or url of image
+        :param fields: Other fields of the request body
+        :returns: Returns the response data from the api
+        """
+        if isinstance(image, bytes) and self._use_multipart():
+            try:
+                res = await self.make_post(
+                    path, **self._image_post_kwargs(image, fields, multipart=True)
+                )
+            except EpigosException as exc:
+                if not self._multipart_rejected(exc):
+                    raise
+            else:
+                self._multipart_accepted()
+                return res
+        return await self.make_post(
+            path, **self._image_post_kwargs(image, fields, multipart=False)
+        )
+
+    async def make_get(
+        self,
+        path: str,
+        *,
+        params: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        """
+        Makes the HTTP GET request and returns deserialized data
+
+        :param path: Path to method endpoint
+        :param params: Query parameters in the url
+        :returns: Returns the response data from the api
+        """
+        return await self.make_request(path=path, method="GET", params=params, **kwargs)
+
+    async def project(
+        self,
+        project_id: str,
+        labels_path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None,
+    ) -> AsyncProject:
+        """
+        Loads the project with the given project_id
+        :param project_id: ID of project to load
+        :param labels_path: Path to a JSON file persisting the label IDs
+        of the project between runs.
+        :return: AsyncProject
+        """
+        if project_id is None:
+            raise ValueError("project_id is required")
+        return await AsyncProject.load(self, project_id, labels_path=labels_path)
+
+    def classification(
+        self, model_id: str, cache: typing.Optional[PredictionCache] = None
+    ) -> AsyncClassificationModel:
+        """
+        Creates an instance of async classification model using the given model ID
+        :param model_id: Model to load
+        :param cache: Cache answering repeated predictions of the same image.
+        :return: AsyncClassificationModel
+        """
+        if model_id is None:
+            raise ValueError("model_id is required")
+        return AsyncClassificationModel(self, model_id, cache=cache)
+
+    def object_detection(
+        self, model_id: str, cache: typing.Optional[PredictionCache] = None
+    ) -> AsyncObjectDetectionModel:
+        """
+        Creates an instance of async object detection model using the given model ID
+        :param model_id: Model to load
+        :param cache: Cache answering repeated predictions of the same image.
+        :return: AsyncObjectDetectionModel
+        """
+        if model_id is None:
+            raise ValueError("model_id is required")
+        return AsyncObjectDetectionModel(self, model_id, cache=cache)
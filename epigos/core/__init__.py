@@ -1,5 +1,12 @@
-from .classification import ClassificationModel
-from .object_detection import ObjectDetectionModel
-from .project import Project
+from .classification import AsyncClassificationModel, ClassificationModel
+from .object_detection import AsyncObjectDetectionModel, ObjectDetectionModel
+from .project import AsyncProject, Project
 
-__all__ = ("ClassificationModel", "ObjectDetectionModel", "Project")
+__all__ = (
+    "AsyncClassificationModel",
+    "AsyncObjectDetectionModel",
+    "AsyncProject",
+    "ClassificationModel",
+    "ObjectDetectionModel",
+    "Project",
+)
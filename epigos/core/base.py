@@ -1,15 +1,105 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import os
+import typing
 from typing import TYPE_CHECKING
 
+import httpx
+
+from epigos import typings
+from epigos.data_classes.prediction import BatchPrediction
+from epigos.exceptions import EpigosException
 from epigos.utils import image as image_utils
+from epigos.utils.concurrency import abounded_map, bounded_map
+
+from .cache import PredictionCache
 
 if TYPE_CHECKING:
-    from epigos.client import Epigos
+    from epigos.client import AsyncEpigos, Epigos
+
+PredictionT = typing.TypeVar("PredictionT")
+# factors mapping x and y coordinates of the sent image to the original image
+ImageScale = typing.Tuple[float, float]
+
+DEFAULT_BATCH_WORKERS = 8
+
+# errors reported per image in batch predictions instead of aborting the batch
+BATCH_ITEM_ERRORS = (EpigosException, httpx.HTTPError, ValueError, OSError)
+
+
+class BasePredictionModel(abc.ABC):
+    """
+    Base Prediction Model.
+
+    Request building shared by the sync and async model inferences.
+    """
+
+    _model_id: str
+
+    @abc.abstractmethod
+    def _build_url(self) -> str:
+        raise NotImplementedError()
+
+    @staticmethod
+    def _encode_image(
+        image: typing.Union[str, bytes], max_side: typing.Optional[int] = None
+    ) -> typing.Optional[typing.Tuple[bytes, ImageScale]]:
+        """
+        Encodes a local image as JPEG
+        :param image: Local path, remote url or encoded image bytes
+        :param max_side: Maximum width and height of the encoded image
+        :return: encoded image and its scale, or None if the image is not local
+        """
+        if isinstance(image, bytes) or image_utils.is_path(image):
+            return image_utils.downscale_image(image, max_side)
+        return None
+
+    @staticmethod
+    def _fields(
+        build_payload: typing.Callable[[str], typing.Dict[str, typing.Any]],
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Fields of the request body besides the image
+        """
+        fields = build_payload("")
+        fields.pop("image")
+        return fields
+
+    @staticmethod
+    def _rescale(
+        res: typing.Dict[str, typing.Any], _scale: ImageScale
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Maps a prediction response of a downscaled image to the original image.
+        Responses without coordinates, e.g. classifications, are returned as they are.
+        :param res: Prediction response
+        :param _scale: Scale of the sent image
+        :return: Prediction response
+        """
+        return res
+
+    def _cache_key(
+        self,
+        image_path: typing.Union[str, bytes],
+        build_payload: typing.Callable[[str], typing.Dict[str, typing.Any]],
+        max_side: typing.Optional[int] = None,
+    ) -> str:
+        options = self._fields(build_payload)
+        if max_side is not None:
+            options["max_side"] = max_side
+        return PredictionCache.key(self._build_url(), image_path, options)
+
+    @staticmethod
+    def _batch_item(
+        index: int, image: typings.ImageSource
+    ) -> BatchPrediction[typing.Any]:
+        name = os.fspath(image) if isinstance(image, (str, os.PathLike)) else None
+        return BatchPrediction(index=index, image=name)
 
 
-class PredictionModel(abc.ABC):
+class PredictionModel(BasePredictionModel):
     """
     Prediction Model.
 
@@ -17,22 +107,183 @@ class PredictionModel(abc.ABC):
 
     :param client: Client to use for interaction with the Epigos server
     :param model_id: Unique internal reference from the Epigos platform for the model
+    :param cache: Cache answering repeated predictions of the same image.
     """
 
-    def __init__(self, client: "Epigos", model_id: str) -> None:
+    def __init__(
+        self,
+        client: "Epigos",
+        model_id: str,
+        cache: typing.Optional[PredictionCache] = None,
+    ) -> None:
         self._client = client
         self._model_id = model_id
+        self.cache = cache
+
+    def _prepare_image(
+        self, image_path: typings.ImageSource, max_side: typing.Optional[int] = None
+    ) -> typing.Tuple[typing.Union[str, bytes], ImageScale]:
+        image = image_utils.load_image(image_path)
+        encoded = self._encode_image(image, max_side)
+        if encoded is not None:
+            return encoded
+        if isinstance(image, str) and self._client.check_url(image):
+            # remote images are fetched by the API at full resolution
+            return image, (1.0, 1.0)
+        raise ValueError(f"Image does not exist at {image!r}!")
+
+    def _post_prediction(
+        self,
+        image_path: typings.ImageSource,
+        build_payload: typing.Callable[[str], typing.Dict[str, typing.Any]],
+        max_side: typing.Optional[int] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Sends the prediction request of an image, unless its response is cached
+        :param image_path: Image (path, url, bytes, file object, PIL image or array).
+        :param build_payload: Builds the request body from the encoded image
+        :param max_side: Maximum width and height of the image sent
+        :return: Prediction response in the coordinates of the original image
+        """
+        image = image_utils.load_image(image_path)
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(image, build_payload, max_side)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        encoded, scale = self._prepare_image(image, max_side)
+        res: typing.Dict[str, typing.Any] = self._client.make_image_post(
+            self._build_url(), image=encoded, fields=self._fields(build_payload)
+        )
+        res = self._rescale(res, scale)
+        if self.cache is not None and key is not None:
+            self.cache.set(key, res)
+        return res
 
     @abc.abstractmethod
     def _build_url(self) -> str:
         raise NotImplementedError()
 
-    @staticmethod
-    def _prepare_image(image_path: str) -> str:
-        if image_utils.is_path(image_path):
-            image = image_utils.image_to_b64(image_path)
-        elif image_utils.is_url(image_path):
-            image = image_path
-        else:
-            raise ValueError(f"Image does not exist at {image_path}!")
-        return image
+    def _run_batch(
+        self,
+        fn: typing.Callable[[typings.ImageSource], PredictionT],
+        images: typing.Iterable[typings.ImageSource],
+        num_workers: int,
+    ) -> typing.List[BatchPrediction[PredictionT]]:
+        def _predict(
+            item: typing.Tuple[int, typings.ImageSource],
+        ) -> BatchPrediction[PredictionT]:
+            result = self._batch_item(*item)
+            try:
+                result.prediction = fn(item[1])
+            except BATCH_ITEM_ERRORS as exc:
+                result.error = exc
+            return result
+
+        return list(
+            bounded_map(
+                _predict,
+                enumerate(images),
+                max_workers=self._client.concurrent_requests(num_workers),
+            )
+        )
+
+
+class AsyncPredictionModel(BasePredictionModel):
+    """
+    Async Prediction Model.
+
+    A generic class to represent model inferences made with the async client
+
+    :param client: Async client to use for interaction with the Epigos server
+    :param model_id: Unique internal reference from the Epigos platform for the model
+    :param cache: Cache answering repeated predictions of the same image.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncEpigos",
+        model_id: str,
+        cache: typing.Optional[PredictionCache] = None,
+    ) -> None:
+        self._client = client
+        self._model_id = model_id
+        self.cache = cache
+
+    @abc.abstractmethod
+    def _build_url(self) -> str:
+        raise NotImplementedError()
+
+    async def _aprepare_image(
+        self, image_path: typings.ImageSource, max_side: typing.Optional[int] = None
+    ) -> typing.Tuple[typing.Union[str, bytes], ImageScale]:
+        # image loading and encoding are blocking, keep them off the loop
+        image = await asyncio.to_thread(image_utils.load_image, image_path)
+        encoded = await asyncio.to_thread(self._encode_image, image, max_side)
+        if encoded is not None:
+            return encoded
+        if isinstance(image, str) and await self._client.check_url(image):
+            # remote images are fetched by the API at full resolution
+            return image, (1.0, 1.0)
+        raise ValueError(f"Image does not exist at {image!r}!")
+
+    async def _post_prediction(
+        self,
+        image_path: typings.ImageSource,
+        build_payload: typing.Callable[[str], typing.Dict[str, typing.Any]],
+        max_side: typing.Optional[int] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Sends the prediction request of an image, unless its response is cached
+        :param image_path: Image (path, url, bytes, file object, PIL image or array).
+        :param build_payload: Builds the request body from the encoded image
+        :param max_side: Maximum width and height of the image sent
+        :return: Prediction response in the coordinates of the original image
+        """
+        # reading files and encoding in-memory images are blocking
+        image = await asyncio.to_thread(image_utils.load_image, image_path)
+        key = None
+        if self.cache is not None:
+            # hashing the image and the disk tier are blocking
+            key = await asyncio.to_thread(
+                self._cache_key, image, build_payload, max_side
+            )
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        encoded, scale = await self._aprepare_image(image, max_side)
+        res: typing.Dict[str, typing.Any] = await self._client.make_image_post(
+            self._build_url(), image=encoded, fields=self._fields(build_payload)
+        )
+        res = self._rescale(res, scale)
+        if self.cache is not None and key is not None:
+            await asyncio.to_thread(self.cache.set, key, res)
+        return res
+
+    async def _arun_batch(
+        self,
+        fn: typing.Callable[[typings.ImageSource], typing.Awaitable[PredictionT]],
+        images: typing.Iterable[typings.ImageSource],
+        num_workers: int,
+    ) -> typing.List[BatchPrediction[PredictionT]]:
+        async def _predict(
+            item: typing.Tuple[int, typings.ImageSource],
+        ) -> BatchPrediction[PredictionT]:
+            result = self._batch_item(*item)
+            try:
+                result.prediction = await fn(item[1])
+            except BATCH_ITEM_ERRORS as exc:
+                result.error = exc
+            return result
+
+        return [
+            result
+            async for result in abounded_map(
+                _predict,
+                enumerate(images),
+                limit=self._client.concurrent_requests(num_workers),
+            )
+        ]
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import collections
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+from epigos.utils import image as image_utils
+
+from .dedup import file_digest
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS predictions_accessed ON predictions (accessed);
+"""
+
+
+def image_digest(image: typing.Union[str, "os.PathLike[str]", bytes]) -> str:
+    """
+    Returns a digest identifying an image by its content.
+    Remote images are identified by their url.
+    :param image: Local path, remote url or encoded image bytes
+    :return: hex digest
+    """
+    if isinstance(image, bytes):
+        return hashlib.sha256(image).hexdigest()
+    path = os.fspath(image)
+    if image_utils.is_path(path):
+        return file_digest(path)
+    return hashlib.sha256(path.encode("utf-8")).hexdigest()
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """
+    Dataclass containing the hit and miss counters of a prediction cache
+    """
+
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+
+
+def _expired(created: float, now: float, ttl: typing.Optional[float]) -> bool:
+    return ttl is not None and now - created > ttl
+
+
+class _MemoryTier:
+    """
+    Least recently used serialized predictions kept in memory,
+    bounded by their number and total size.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: typing.OrderedDict[str, typing.Tuple[float, str]] = (
+            collections.OrderedDict()
+        )
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> typing.Optional[typing.Tuple[float, str]]:
+        """
+        Returns the creation time and content of a prediction
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def pop(self, key: str) -> None:
+        """
+        Removes a prediction
+        """
+        _, content = self._entries.pop(key)
+        self._bytes -= len(content)
+
+    def set(self, key: str, created: float, content: str) -> int:
+        """
+        Stores a prediction and returns the number of evicted predictions
+        """
+        if key in self._entries:
+            self.pop(key)
+        if len(content) > self.max_bytes:
+            return 0
+        self._entries[key] = (created, content)
+        self._bytes += len(content)
+        evicted = 0
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self.pop(next(iter(self._entries)))
+            evicted += 1
+        return evicted
+
+
+class _DiskTier:
+    """
+    Serialized predictions kept in a SQLite database,
+    bounded by their total size.
+    """
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM predictions"
+            ).fetchone()
+        self._bytes = int(row[0])
+
+    def close(self) -> None:
+        """
+        Close the database
+        """
+        self._conn.close()
+
+    def get(
+        self, key: str, now: float, ttl: typing.Optional[float]
+    ) -> typing.Optional[typing.Tuple[float, str]]:
+        """
+        Returns the creation time and content of a prediction,
+        removing it if it expired
+        """
+        row = self._conn.execute(
+            "SELECT value, size, created FROM predictions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            if _expired(row[2], now, ttl):
+                self._conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                self._bytes -= row[1]
+                return None
+            self._conn.execute(
+                "UPDATE predictions SET accessed = ? WHERE key = ?", (now, key)
+            )
+        return row[2], row[0]
+
+    def set(self, key: str, now: float, content: str) -> int:
+        """
+        Stores a prediction and returns the number of evicted predictions
+        """
+        size = len(content)
+        if size > self.max_bytes:
+            return 0
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT size FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+            self._bytes += size - (row[0] if row else 0)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO predictions "
+                "(key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, content, size, now, now),
+            )
+            return self._evict()
+
+    def _evict(self) -> int:
+        if self._bytes <= self.max_bytes:
+            return 0
+        rows = self._conn.execute("SELECT key, size FROM predictions ORDER BY accessed")
+        evicted = []
+        for key, size in rows:
+            if self._bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM predictions WHERE key = ?", evicted)
+        return len(evicted)
+
+
+class PredictionCache:
+    """
+    Prediction cache stores model predictions by image content,
+    so scoring the same image again does not encode and send it.
+
+    Predictions are kept in a least recently used in-memory tier and,
+    if `path` is set, in a SQLite database on disk shared between runs.
+    Both tiers store predictions serialized, so cached responses
+    are copies callers can modify.
+    The cache can be shared by many models, predictions are keyed by model,
+    image content hash, confidence and prediction options.
+
+    :param max_entries: Maximum number of predictions kept in memory.
+    :param path: Path to the database file of the disk tier.
+    It is created if missing. If not set, predictions are only kept in memory.
+    :param max_bytes: Maximum size of the predictions kept on disk.
+    Least recently used predictions are evicted first.
+    :param ttl: Seconds a prediction is valid for. Defaults to no expiry.
+    :param max_memory_bytes: Maximum size of the predictions kept in memory.
+    Detections include the annotated image, so their size adds up quickly.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: typing.Optional[float] = None,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._memory = _MemoryTier(max_entries, max_memory_bytes)
+        self._disk: typing.Optional[_DiskTier] = None
+        if self.path:
+            self._disk = _DiskTier(self.path, max_bytes)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def close(self) -> None:
+        """
+        Close the disk tier database
+        """
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    @staticmethod
+    def key(
+        model: str,
+        image: typing.Union[str, "os.PathLike[str]", bytes],
+        options: typing.Dict[str, typing.Any],
+    ) -> str:
+        """
+        Returns the cache key of a prediction
+        :param model: Model the prediction is made with
+        :param image: Local path, remote url or encoded image bytes
+        :param options: Confidence and options of the prediction
+        :return: cache key
+        """
+        content = json.dumps(
+            [model, image_digest(image), options], sort_keys=True, default=str
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Returns a cached prediction response
+        :param key: Cache key
+        :return: Prediction response or None if it is not cached
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and not _expired(cached[0], now, self.ttl):
+                self.stats.hits += 1
+                content = cached[1]
+            else:
+                if cached is not None:
+                    self._memory.pop(key)
+                stored = self._disk.get(key, now, self.ttl) if self._disk else None
+                if stored is None:
+                    self.stats.misses += 1
+                    return None
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                self.stats.evictions += self._memory.set(key, *stored)
+                content = stored[1]
+        value: typing.Dict[str, typing.Any] = json.loads(content)
+        return value
+
+    def set(self, key: str, value: typing.Dict[str, typing.Any]) -> None:
+        """
+        Caches a prediction response
+        :param key: Cache key
+        :param value: Prediction response
+        """
+        now = time.time()
+        content = json.dumps(value)
+        with self._lock:
+            self.stats.evictions += self._memory.set(key, now, content)
+            if self._disk is not None:
+                self.stats.evictions += self._disk.set(key, now, content)
@@ -1,33 +1,145 @@
-from epigos.core.base import PredictionModel
-from epigos.data_classes.prediction import Classification
+import typing
 
+from epigos import typings
+from epigos.core.base import (
+    DEFAULT_BATCH_WORKERS,
+    AsyncPredictionModel,
+    BasePredictionModel,
+    PredictionModel,
+)
+from epigos.data_classes.prediction import BatchPrediction, Classification
 
-class ClassificationModel(PredictionModel):
+
+class _ClassificationMixin(BasePredictionModel):
+    """
+    Request and response handling shared by the classification models
+    """
+
+    def _build_url(self) -> str:
+        return f"/predict/classify/{self._model_id}/"
+
+    @staticmethod
+    def _build_payload(image: str, confidence: float) -> typing.Dict[str, typing.Any]:
+        return {"image": image, "confidence": confidence}
+
+    @staticmethod
+    def _to_prediction(res: typing.Dict[str, typing.Any]) -> Classification:
+        return Classification(
+            category=res["category"],
+            confidence=res["confidence"],
+            predictions=res["predictions"],
+        )
+
+
+class ClassificationModel(_ClassificationMixin, PredictionModel):
     """
     Classification Model.
 
     Manages the model inferences for classification models trained in the platform
     """
 
-    def _build_url(self) -> str:
-        return f"/predict/classify/{self._model_id}/"
+    def predict(
+        self,
+        image_path: typings.ImageSource,
+        confidence: float = 0.7,
+        *,
+        max_side: typing.Optional[int] = None,
+    ) -> Classification:
+        """
+        Makes classifcation prediction for the given image.
 
-    def predict(self, image_path: str, confidence: float = 0.7) -> Classification:
+        :param image_path: Image (path, url, bytes, file object, PIL image or array).
+        :param confidence: Prediction confidence
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent.
+        :return: Prediction object
+        """
+        res = self._post_prediction(
+            image_path,
+            lambda image: self._build_payload(image, confidence),
+            max_side=max_side,
+        )
+
+        return self._to_prediction(res)
+
+    def predict_batch(
+        self,
+        images: typing.Iterable[typings.ImageSource],
+        confidence: float = 0.7,
+        num_workers: int = DEFAULT_BATCH_WORKERS,
+        *,
+        max_side: typing.Optional[int] = None,
+    ) -> typing.List[BatchPrediction[Classification]]:
+        """
+        Makes classifcation predictions for many images concurrently.
+        Failed images are reported on their result instead of aborting the batch.
+
+        :param images: Images (paths, urls, bytes, file objects, PIL images or arrays).
+        :param confidence: Prediction confidence
+        :param num_workers: Maximum number of requests in flight.
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent.
+        :return: Batch predictions in the order of the images
+        """
+        return self._run_batch(
+            lambda image: self.predict(image, confidence=confidence, max_side=max_side),
+            images,
+            num_workers=num_workers,
+        )
+
+
+class AsyncClassificationModel(_ClassificationMixin, AsyncPredictionModel):
+    """
+    Async Classification Model.
+
+    Manages the model inferences for classification models using the async client
+    """
+
+    async def predict(
+        self,
+        image_path: typings.ImageSource,
+        confidence: float = 0.7,
+        *,
+        max_side: typing.Optional[int] = None,
+    ) -> Classification:
         """
         Makes classifcation prediction for the given image.
 
-        :param image_path: Path to image (can be local file or remote url).
+        :param image_path: Image (path, url, bytes, file object, PIL image or array).
         :param confidence: Prediction confidence
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent.
         :return: Prediction object
         """
-        image = self._prepare_image(image_path)
+        res = await self._post_prediction(
+            image_path,
+            lambda image: self._build_payload(image, confidence),
+            max_side=max_side,
+        )
 
-        data = {"image": image, "confidence": confidence}
-        url = self._build_url()
-        res = self._client.make_post(path=url, json=data)
+        return self._to_prediction(res)
 
-        return Classification(
-            category=res["category"],
-            confidence=res["confidence"],
-            predictions=res["predictions"],
+    async def predict_batch(
+        self,
+        images: typing.Iterable[typings.ImageSource],
+        confidence: float = 0.7,
+        num_workers: int = DEFAULT_BATCH_WORKERS,
+        *,
+        max_side: typing.Optional[int] = None,
+    ) -> typing.List[BatchPrediction[Classification]]:
+        """
+        Makes classifcation predictions for many images concurrently.
+        Failed images are reported on their result instead of aborting the batch.
+
+        :param images: Images (paths, urls, bytes, file objects, PIL images or arrays).
+        :param confidence: Prediction confidence
+        :param num_workers: Maximum number of requests in flight.
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent.
+        :return: Batch predictions in the order of the images
+        """
+        return await self._arun_batch(
+            lambda image: self.predict(image, confidence=confidence, max_side=max_side),
+            images,
+            num_workers=num_workers,
         )
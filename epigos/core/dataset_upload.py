@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+from concurrent.futures import Executor
+from pathlib import Path
+
+import httpx
+from tqdm import tqdm
+from typing_extensions import Unpack
+
+from epigos import typings
+from epigos.dataset import BaseDataset
+from epigos.typings import BoxFormat
+from epigos.utils import logger
+from epigos.utils.concurrency import (
+    abounded_map,
+    bounded_map,
+    pipeline_map,
+    start_process_pool,
+)
+
+from .dedup import DedupIndex
+from .journal import UploadJournal
+from .sync import SyncAction, SyncItem, SyncManifest
+from .uploader import AsyncUploader, Uploader, UploadTask
+
+Record = typing.Dict[str, typing.Any]
+
+
+class _BaseDatasetUpload:
+    """
+    Dataset upload state shared by the sync and async dataset uploads.
+
+    :param ds: Dataset to upload
+    :param batch_id: ID of batch to upload to
+    :param box_format: Format of the annotations of the dataset
+    :param labels_map: Class ID of label in Epigos AI to class name mapping.
+    :param journal: Journal recording the upload progress
+    :param dedup_index: Index of the image hashes, to skip duplicate images
+    """
+
+    def __init__(
+        self,
+        ds: BaseDataset,
+        batch_id: str,
+        *,
+        box_format: BoxFormat,
+        labels_map: typing.Optional[typing.Dict[str, str]],
+        journal: typing.Optional[UploadJournal],
+        dedup_index: typing.Optional[DedupIndex],
+    ) -> None:
+        self.ds = ds
+        self.batch_id = batch_id
+        self.box_format = box_format
+        self.labels_map = labels_map
+        self.journal = journal
+        self.dedup_index = dedup_index
+        self.executor: typing.Optional[Executor] = None
+
+    def _start(self, process_workers: typing.Optional[int]) -> None:
+        if process_workers:
+            self.executor = start_process_pool(process_workers)
+
+    def _close(self) -> None:
+        if self.journal:
+            self.journal.close()
+        if self.dedup_index:
+            self.dedup_index.close()
+            stats = self.dedup_index.stats
+            logger.info(
+                "Skipped %d duplicate images, saving %d bytes and %d requests",
+                stats.duplicates,
+                stats.bytes_saved,
+                stats.requests_saved,
+            )
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    def _duplicate(self, img_path: Path) -> typing.Optional[Path]:
+        if self.dedup_index is None:
+            return None
+        duplicate_of = self.dedup_index.check(img_path)
+        if duplicate_of is not None:
+            logger.info("Skipping duplicate file: %s", img_path)
+        return duplicate_of
+
+    def _finish(self, img_path: Path, uploaded: bool) -> None:
+        if self.dedup_index is None:
+            return
+        if uploaded:
+            self.dedup_index.commit(img_path)
+        else:
+            self.dedup_index.release(img_path)
+
+    @staticmethod
+    def _log_error(img_path: Path) -> None:
+        logger.exception(
+            "Error occured while uploading file: %s", img_path, exc_info=True
+        )
+
+
+class DatasetUpload(_BaseDatasetUpload):
+    """
+    Uploads the images of a dataset on threads, either one worker running
+    all steps of an image or a pipeline of steps.
+    Takes the same arguments as `_BaseDatasetUpload` after the uploader.
+
+    :param uploader: Uploader of the project
+    """
+
+    def __init__(
+        self, uploader: Uploader, ds: BaseDataset, batch_id: str, **kwargs: typing.Any
+    ) -> None:
+        super().__init__(ds, batch_id, **kwargs)
+        self.uploader = uploader
+
+    def upload_file(self, image_name: str, img_path: Path) -> Record:
+        """
+        Upload an image of the dataset with its annotations
+        :param image_name: File name of the image in the dataset
+        :param img_path: Path to image
+        :return: Upload result
+        """
+        record: Record = {"img_path": img_path}
+        duplicate_of = self._duplicate(img_path)
+        if duplicate_of is not None:
+            record["duplicate_of"] = duplicate_of
+            return record
+        try:
+            record["response"] = self.uploader.upload(
+                self.batch_id,
+                img_path,
+                annotations=self.ds.read_annotations(image_name),
+                box_format=self.box_format,
+                labels_map=self.labels_map,
+                label_names=self.ds.classes,
+                journal=self.journal,
+                executor=self.executor,
+            )
+        except httpx.HTTPError:
+            self._log_error(img_path)
+        finally:
+            self._finish(img_path, "response" in record)
+        return record
+
+    def _stage(
+        self, fn: typing.Callable[[UploadTask], UploadTask]
+    ) -> typing.Callable[[UploadTask], UploadTask]:
+        def _run(task: UploadTask) -> UploadTask:
+            if task.error is not None:
+                return task
+            try:
+                return fn(task)
+            except httpx.HTTPError as exc:
+                self._log_error(task.image_path)
+                task.error = exc
+                return task
+            except BaseException:
+                self._finish(task.image_path, False)
+                raise
+
+        return _run
+
+    def _preprocess(self, item: typing.Tuple[str, Path]) -> UploadTask:
+        image_name, img_path = item
+        task = self.uploader.start_task(self.batch_id, img_path, self.journal)
+        task.duplicate_of = self._duplicate(img_path)
+        if task.duplicate_of is not None:
+            return task
+        try:
+            return self.uploader.prepare_task(
+                task,
+                annotations=self.ds.read_annotations(image_name),
+                box_format=self.box_format,
+                executor=self.executor,
+            )
+        except BaseException:
+            self._finish(img_path, False)
+            raise
+
+    def _annotate(self, task: UploadTask) -> UploadTask:
+        return self.uploader.annotate_task(
+            task, label_names=self.ds.classes, labels_map=self.labels_map
+        )
+
+    def _to_result(self, task: UploadTask) -> Record:
+        record: Record = {"img_path": task.image_path}
+        if task.duplicate_of is not None:
+            record["duplicate_of"] = task.duplicate_of
+            return record
+        if task.error is None:
+            record["response"] = task.record
+        self._finish(task.image_path, task.error is None)
+        return record
+
+    def _run_pipeline(
+        self, pipeline: typings.PipelineOptions, num_workers: int, ordered: bool
+    ) -> typing.Iterator[Record]:
+        stages: typing.List[
+            typing.Tuple[typing.Callable[[typing.Any], UploadTask], int]
+        ] = [
+            (self._preprocess, pipeline.get("preprocess", num_workers)),
+            (
+                self._stage(self.uploader.presign_task),
+                pipeline.get("presign", num_workers),
+            ),
+            (self._stage(self.uploader.put_task), pipeline.get("put", num_workers)),
+            (
+                self._stage(self.uploader.record_task),
+                pipeline.get("record", num_workers),
+            ),
+            (self._stage(self._annotate), pipeline.get("annotate", num_workers)),
+        ]
+        return map(
+            self._to_result,
+            pipeline_map(
+                self.ds.images.items(),
+                stages,
+                window=pipeline.get("queue_size"),
+                ordered=ordered,
+            ),
+        )
+
+    def run(
+        self, num_workers: int, **options: Unpack[typings.UploadOptions]
+    ) -> typing.Iterator[Record]:
+        """
+        Upload the images of the dataset and yield their results
+        :param num_workers: Number of threads uploading images.
+        :param options: Options to tune the upload.
+        :return: Upload results
+        """
+        ordered = options.get("ordered", True)
+        pipeline = options.get("pipeline")
+        results: typing.Iterator[Record]
+        if pipeline is not None:
+            results = self._run_pipeline(pipeline, num_workers, ordered)
+        else:
+            results = bounded_map(
+                lambda p: self.upload_file(*p),
+                self.ds.images.items(),
+                max_workers=num_workers,
+                window=options.get("max_in_flight") or num_workers * 2,
+                ordered=ordered,
+            )
+
+        self._start(options.get("process_workers"))
+        try:
+            with tqdm(
+                total=len(self.ds), desc="Uploading datasets", colour="green"
+            ) as pbar:
+                for result in results:
+                    pbar.update()
+                    yield result
+        finally:
+            self._close()
+
+
+class AsyncDatasetUpload(_BaseDatasetUpload):
+    """
+    Uploads the images of a dataset concurrently on the event loop.
+    The steps of concurrent uploads already overlap, so there is no pipeline.
+    Takes the same arguments as `_BaseDatasetUpload` after the uploader.
+
+    :param uploader: Async uploader of the project
+    """
+
+    def __init__(
+        self,
+        uploader: AsyncUploader,
+        ds: BaseDataset,
+        batch_id: str,
+        **kwargs: typing.Any,
+    ) -> None:
+        super().__init__(ds, batch_id, **kwargs)
+        self.uploader = uploader
+
+    async def upload_file(
+        self, image_name: str, img_path: Path, lazy: bool = False
+    ) -> Record:
+        """
+        Upload an image of the dataset with its annotations
+        :param image_name: File name of the image in the dataset
+        :param img_path: Path to image
+        :param lazy: If True, annotations are parsed off the event loop.
+        :return: Upload result
+        """
+        record: Record = {"img_path": img_path}
+        if self.dedup_index:
+            duplicate_of = await asyncio.to_thread(self._duplicate, img_path)
+            if duplicate_of is not None:
+                record["duplicate_of"] = duplicate_of
+                return record
+        try:
+            if lazy:
+                annotations = await asyncio.to_thread(
+                    self.ds.read_annotations, image_name
+                )
+            else:
+                annotations = self.ds.read_annotations(image_name)
+            record["response"] = await self.uploader.upload(
+                self.batch_id,
+                img_path,
+                annotations=annotations,
+                box_format=self.box_format,
+                labels_map=self.labels_map,
+                label_names=self.ds.classes,
+                journal=self.journal,
+                executor=self.executor,
+            )
+        except httpx.HTTPError:
+            self._log_error(img_path)
+        finally:
+            self._finish(img_path, "response" in record)
+        return record
+
+    async def run(
+        self, num_workers: int, **options: Unpack[typings.UploadOptions]
+    ) -> typing.AsyncIterator[Record]:
+        """
+        Upload the images of the dataset and yield their results
+        :param num_workers: Number of concurrent uploads.
+        :param options: Options to tune the upload.
+        :return: Upload results
+        """
+        lazy = options.get("lazy", False)
+        self._start(options.get("process_workers"))
+        try:
+            with tqdm(
+                total=len(self.ds), desc="Uploading datasets", colour="green"
+            ) as pbar:
+                async for result in abounded_map(
+                    lambda p: self.upload_file(*p, lazy=lazy),
+                    self.ds.images.items(),
+                    limit=options.get("max_in_flight") or num_workers,
+                    ordered=options.get("ordered", True),
+                ):
+                    pbar.update()
+                    yield result
+        finally:
+            self._close()
+
+
+class _BaseDatasetSync:
+    """
+    Dataset sync state shared by the sync and async dataset syncs.
+
+    :param manifest: Manifest of the synced images
+    :param ds: Dataset to sync
+    :param batch_id: ID of batch to upload new images to
+    :param labels_map: Class ID of label in Epigos AI to class name mapping.
+    """
+
+    def __init__(
+        self,
+        manifest: SyncManifest,
+        ds: BaseDataset,
+        batch_id: str,
+        labels_map: typing.Optional[typing.Dict[str, str]],
+    ) -> None:
+        self.manifest = manifest
+        self.ds = ds
+        self.batch_id = batch_id
+        self.labels_map = labels_map
+
+    @staticmethod
+    def log_counts(counts: typing.Dict[SyncAction, int], removed: int) -> None:
+        """
+        Logs the number of images of a dataset per sync action
+        :param counts: Number of images per sync action
+        :param removed: Number of images removed from the dataset
+        """
+        logger.info(
+            "Syncing dataset: %d new, %d changed, %d with changed annotations, "
+            "%d unchanged and %d removed images",
+            counts[SyncAction.new],
+            counts[SyncAction.changed],
+            counts[SyncAction.annotations],
+            counts[SyncAction.unchanged],
+            removed,
+        )
+
+    def _synced(self, item: SyncItem, resp: typing.Dict[str, typing.Any]) -> Record:
+        """
+        Points the manifest entry of a synced image to its new record
+        and reports the record it replaces.
+        """
+        record: Record = {"img_path": item.image_path, "action": item.action}
+        record_id = str(resp["id"])
+        previous = item.entry.record_id
+        if previous and previous != record_id:
+            logger.warning(
+                "Synced %s as record %s, previous record %s remains in the project",
+                item.image_path,
+                record_id,
+                previous,
+            )
+            record["replaces"] = previous
+        item.entry.record_id = record_id
+        record["response"] = resp
+        self.manifest.update(item.image_path, item.entry)
+        return record
+
+    @staticmethod
+    def _failed(item: SyncItem) -> Record:
+        logger.exception(
+            "Error occured while syncing file: %s", item.image_path, exc_info=True
+        )
+        return {"img_path": item.image_path, "action": item.action}
+
+
+class DatasetSync(_BaseDatasetSync):
+    """
+    Uploads the new and changed images of a dataset sync on threads.
+    Takes the same arguments as `_BaseDatasetSync` after the uploader.
+
+    :param uploader: Uploader of the project
+    """
+
+    def __init__(self, uploader: Uploader, *args: typing.Any) -> None:
+        super().__init__(*args)
+        self.uploader = uploader
+
+    def sync_item(self, item: SyncItem) -> Record:
+        """
+        Upload a new or changed image of the dataset with its annotations
+        :param item: Image to sync
+        :return: Sync result
+        """
+        try:
+            resp = self.uploader.upload(
+                self.batch_id,
+                item.image_path,
+                annotations=item.annotations,
+                label_names=self.ds.classes,
+                labels_map=self.labels_map,
+            )
+        except httpx.HTTPError:
+            return self._failed(item)
+        return self._synced(item, resp)
+
+    def run(
+        self,
+        items: typing.List[SyncItem],
+        num_workers: int,
+        **options: Unpack[typings.UploadOptions],
+    ) -> typing.Iterator[Record]:
+        """
+        Sync the images of the dataset and yield their results
+        :param items: Images to sync
+        :param num_workers: Number of threads uploading images.
+        :param options: Options to tune the upload.
+        :return: Sync results
+        """
+        with tqdm(total=len(items), desc="Syncing dataset", colour="green") as pbar:
+            for result in bounded_map(
+                self.sync_item,
+                items,
+                max_workers=num_workers,
+                window=options.get("max_in_flight") or num_workers * 2,
+                ordered=options.get("ordered", True),
+            ):
+                pbar.update()
+                yield result
+
+
+class AsyncDatasetSync(_BaseDatasetSync):
+    """
+    Uploads the new and changed images of a dataset sync on the event loop.
+    Takes the same arguments as `_BaseDatasetSync` after the uploader.
+
+    :param uploader: Async uploader of the project
+    """
+
+    def __init__(self, uploader: AsyncUploader, *args: typing.Any) -> None:
+        super().__init__(*args)
+        self.uploader = uploader
+
+    async def sync_item(self, item: SyncItem) -> Record:
+        """
+        Upload a new or changed image of the dataset with its annotations
+        :param item: Image to sync
+        :return: Sync result
+        """
+        try:
+            resp = await self.uploader.upload(
+                self.batch_id,
+                item.image_path,
+                annotations=item.annotations,
+                label_names=self.ds.classes,
+                labels_map=self.labels_map,
+            )
+        except httpx.HTTPError:
+            return self._failed(item)
+        return self._synced(item, resp)
+
+    async def run(
+        self,
+        items: typing.List[SyncItem],
+        num_workers: int,
+        **options: Unpack[typings.UploadOptions],
+    ) -> typing.AsyncIterator[Record]:
+        """
+        Sync the images of the dataset and yield their results
+        :param items: Images to sync
+        :param num_workers: Number of concurrent uploads.
+        :param options: Options to tune the upload.
+        :return: Sync results
+        """
+        with tqdm(total=len(items), desc="Syncing dataset", colour="green") as pbar:
+            async for result in abounded_map(
+                self.sync_item,
+                items,
+                limit=options.get("max_in_flight") or num_workers,
+                ordered=options.get("ordered", True),
+            ):
+                pbar.update()
+                yield result
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+import sqlite3
+import threading
+import typing
+from pathlib import Path
+
+HASH_CHUNK_SIZE = 1 << 20
+# presign, storage upload and record creation
+REQUESTS_PER_UPLOAD = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    project_id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (project_id, digest)
+);
+"""
+
+
+def file_digest(
+    path: typing.Union[str, "os.PathLike[str]"], chunk_size: int = HASH_CHUNK_SIZE
+) -> str:
+    """
+    Returns the SHA-256 hex digest of a file, reading it in chunks
+    :param path: Path to file
+    :param chunk_size: Number of bytes read at a time
+    :return: hex digest
+    """
+    digest = hashlib.sha256()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as fp:
+        while True:
+            size = fp.readinto(view)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()
+
+
+@dataclasses.dataclass
+class DedupStats:
+    """
+    Dataclass containing what deduplication saved during an upload
+    """
+
+    images: int = 0
+    duplicates: int = 0
+    bytes_saved: int = 0
+    requests_saved: int = 0
+
+
+class DedupIndex:
+    """
+    Dedup index skips uploading images whose contents were already uploaded,
+    either earlier in the same run or, with a manifest, in previous runs.
+
+    Images are identified by the SHA-256 digest of their file contents.
+    The manifest is a SQLite database of the digests uploaded to each project,
+    digests are only added to it once their upload succeeded.
+
+    :param project_id: ID of project the images are uploaded to
+    :param path: Path to the manifest database file. It is created if missing.
+    If not set, duplicates are only detected within the run.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None,
+    ) -> None:
+        self.project_id = project_id
+        self.path = Path(path) if path else None
+        self.stats = DedupStats()
+        self._lock = threading.Lock()
+        self._seen: typing.Dict[str, Path] = {}
+        self._digests: typing.Dict[Path, str] = {}
+        self._conn: typing.Optional[sqlite3.Connection] = None
+        if self.path:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> DedupIndex:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the manifest database
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _uploaded(self, digest: str) -> typing.Optional[Path]:
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT path FROM hashes WHERE project_id = ? AND digest = ?",
+            (self.project_id, digest),
+        ).fetchone()
+        return Path(row[0]) if row else None
+
+    def check(self, image_path: typing.Union[str, Path]) -> typing.Optional[Path]:
+        """
+        Hashes an image and returns the path of an earlier upload with the same
+        contents. Otherwise, the image is claimed as the first of its contents.
+        :param image_path: Path to image
+        :return: Path of the duplicated image or None if the image has to be uploaded
+        """
+        image_path = Path(image_path)
+        digest = file_digest(image_path)
+        with self._lock:
+            self.stats.images += 1
+            original = self._seen.get(digest) or self._uploaded(digest)
+            if original is None:
+                self._seen[digest] = image_path
+                self._digests[image_path] = digest
+                return None
+            self.stats.duplicates += 1
+            self.stats.bytes_saved += image_path.stat().st_size
+            self.stats.requests_saved += REQUESTS_PER_UPLOAD
+            return original
+
+    def release(self, image_path: typing.Union[str, Path]) -> None:
+        """
+        Drops the claim of an image whose upload failed,
+        so later images with the same contents are uploaded instead
+        :param image_path: Path to image
+        """
+        with self._lock:
+            digest = self._digests.pop(Path(image_path), None)
+            if digest is not None and self._seen.get(digest) == Path(image_path):
+                del self._seen[digest]
+
+    def commit(self, image_path: typing.Union[str, Path]) -> None:
+        """
+        Records in the manifest that a claimed image was uploaded
+        :param image_path: Path to image
+        """
+        with self._lock:
+            digest = self._digests.pop(Path(image_path), None)
+            if digest is None or self._conn is None:
+                return
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hashes (project_id, digest, path) "
+                    "VALUES (?, ?, ?)",
+                    (self.project_id, digest, str(Path(image_path).resolve())),
+                )
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import dataclasses
+import enum
+import json
+import os
+import sqlite3
+import threading
+import typing
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    name TEXT PRIMARY KEY,
+    batch_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    state TEXT NOT NULL,
+    presigned TEXT,
+    record TEXT
+);
+"""
+
+
+class UploadState(str, enum.Enum):
+    """
+    Upload state
+
+    Enums for the steps of an image upload recorded in the journal.
+    `pending` is the state of an upload with no completed step,
+    it is never recorded.
+    """
+
+    pending = "pending"
+    presigned = "presigned"
+    uploaded = "uploaded"
+    recorded = "recorded"
+    annotated = "annotated"
+
+
+_STATE_ORDER = list(UploadState)
+
+
+@dataclasses.dataclass
+class JournalEntry:
+    """
+    Dataclass containing the journaled upload progress of an image
+    """
+
+    state: UploadState
+    presigned: typing.Optional[typing.Dict[str, typing.Any]] = None
+    record: typing.Optional[typing.Dict[str, typing.Any]] = None
+
+    def reached(self, state: UploadState) -> bool:
+        """
+        Returns true if the upload has completed the given step
+        :param state: Upload step to check
+        :return: bool
+        """
+        return _STATE_ORDER.index(self.state) >= _STATE_ORDER.index(state)
+
+
+class UploadJournal:
+    """
+    Upload journal persists the progress of dataset uploads in a SQLite database,
+    so an interrupted upload can be resumed without uploading duplicates.
+
+    Images are identified by their resolved path and restarted from scratch
+    if their size or modification time changed since they were journaled.
+
+    :param path: Path to the journal database file. It is created if missing.
+    """
+
+    def __init__(self, path: typing.Union[str, "os.PathLike[str]"]) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> UploadJournal:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the journal database
+        """
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _key(image_path: typing.Union[str, Path]) -> str:
+        return str(Path(image_path).resolve())
+
+    @staticmethod
+    def _fingerprint(image_path: typing.Union[str, Path]) -> str:
+        stat = os.stat(image_path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def get_batch(self, batch_name: str) -> typing.Optional[str]:
+        """
+        Returns the batch ID previously created for a batch name
+        :param batch_name: Name of batch
+        :return: batch ID
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT batch_id FROM batches WHERE name = ?", (batch_name,)
+            ).fetchone()
+        return str(row[0]) if row else None
+
+    def set_batch(self, batch_name: str, batch_id: str) -> None:
+        """
+        Records the batch ID created for a batch name
+        :param batch_name: Name of batch
+        :param batch_id: ID of batch
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO batches (name, batch_id) VALUES (?, ?)",
+                (batch_name, batch_id),
+            )
+
+    def get(self, image_path: typing.Union[str, Path]) -> typing.Optional[JournalEntry]:
+        """
+        Returns the journaled progress of an image upload
+        :param image_path: Path to image
+        :return: JournalEntry or None if the image has to be uploaded from scratch
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, state, presigned, record FROM images "
+                "WHERE path = ?",
+                (self._key(image_path),),
+            ).fetchone()
+
+        if row is None or row[0] != self._fingerprint(image_path):
+            return None
+
+        return JournalEntry(
+            state=UploadState(row[1]),
+            presigned=json.loads(row[2]) if row[2] else None,
+            record=json.loads(row[3]) if row[3] else None,
+        )
+
+    def update(
+        self,
+        image_path: typing.Union[str, Path],
+        state: UploadState,
+        *,
+        presigned: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        record: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    ) -> None:
+        """
+        Records that an image upload completed a step
+        :param image_path: Path to image
+        :param state: Completed upload step
+        :param presigned: Presigned upload details
+        :param record: Dataset record of the image
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images "
+                "(path, fingerprint, state, presigned, record) VALUES (?, ?, ?, ?, ?)",
+                (
+                    self._key(image_path),
+                    self._fingerprint(image_path),
+                    state.value,
+                    json.dumps(presigned) if presigned is not None else None,
+                    json.dumps(record) if record is not None else None,
+                ),
+            )
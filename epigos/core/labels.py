@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import typing
+from pathlib import Path
+
+
+class LabelRegistry:
+    """
+    Label registry caches the IDs of the annotation labels of a project,
+    so labels are only created once instead of on every upload.
+
+    Unknown labels are created in bulk and the registry is safe to share
+    between upload threads. It can be persisted to a JSON file,
+    so later runs start with the labels already known.
+
+    :param path: Path to a JSON file persisting the registry.
+    It is read if it exists and written whenever labels are added.
+    """
+
+    def __init__(
+        self, path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None
+    ) -> None:
+        self.path = Path(path) if path else None
+        self._labels: typing.Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._async_create_lock: typing.Optional[asyncio.Lock] = None
+
+        if self.path and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as fp:
+                self._labels = dict(json.load(fp))
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._labels
+
+    def missing(self, names: typing.Iterable[str]) -> typing.List[str]:
+        """
+        Returns the names that are not in the registry, without duplicates
+        :param names: Label names
+        :return:
+        """
+        with self._lock:
+            return list(dict.fromkeys(n for n in names if n not in self._labels))
+
+    def lookup(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        """
+        Returns the label name to ID mapping of the known names
+        :param names: Label names
+        :return:
+        """
+        with self._lock:
+            return {n: self._labels[n] for n in names if n in self._labels}
+
+    def update(self, labels: typing.Dict[str, str]) -> None:
+        """
+        Adds labels to the registry
+        :param labels: Label name to ID mapping
+        """
+        if not labels:
+            return
+        with self._lock:
+            self._labels.update(labels)
+            if self.path:
+                self._save()
+
+    def _save(self) -> None:
+        assert self.path is not None
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(self._labels, fp)
+        os.replace(tmp_path, self.path)
+
+    def resolve(
+        self,
+        names: typing.Iterable[str],
+        create: typing.Callable[[typing.List[str]], typing.Dict[str, str]],
+    ) -> typing.Dict[str, str]:
+        """
+        Returns the label name to ID mapping of the given names,
+        creating the unknown labels with a single call to `create`
+        :param names: Label names
+        :param create: Function creating labels and returning their IDs
+        :return:
+        """
+        names = list(names)
+        if self.missing(names):
+            with self._create_lock:
+                missing = self.missing(names)
+                if missing:
+                    self.update(create(missing))
+        return self.lookup(names)
+
+    async def aresolve(
+        self,
+        names: typing.Iterable[str],
+        create: typing.Callable[
+            [typing.List[str]], typing.Awaitable[typing.Dict[str, str]]
+        ],
+    ) -> typing.Dict[str, str]:
+        """
+        Async counterpart of `resolve`
+        :param names: Label names
+        :param create: Coroutine function creating labels and returning their IDs
+        :return:
+        """
+        names = list(names)
+        if self.missing(names):
+            if self._async_create_lock is None:
+                self._async_create_lock = asyncio.Lock()
+            async with self._async_create_lock:
+                missing = self.missing(names)
+                if missing:
+                    self.update(await create(missing))
+        return self.lookup(names)
@@ -1,50 +1,191 @@
+import typing
+
 from typing_extensions import Unpack
 
 from epigos import typings
-from epigos.core.base import PredictionModel
-from epigos.data_classes.prediction import ObjectDetection
+from epigos.core.base import (
+    DEFAULT_BATCH_WORKERS,
+    AsyncPredictionModel,
+    BasePredictionModel,
+    ImageScale,
+    PredictionModel,
+)
+from epigos.data_classes.prediction import BatchPrediction, ObjectDetection
 
 
-class ObjectDetectionModel(PredictionModel):
+class _ObjectDetectionMixin(BasePredictionModel):
     """
-    Object Detection Model.
-
-    Manages the model inferences for object detection models trained in the platform
+    Request and response handling shared by the object detection models
     """
 
     def _build_url(self) -> str:
         return f"/predict/detect/{self._model_id}/"
 
+    @staticmethod
+    def _build_payload(
+        image: str, confidence: float, options: typings.DetectOptions
+    ) -> typing.Dict[str, typing.Any]:
+        annotate = options.get("annotate") or True
+        stroke_width = options.get("stroke_width")
+        show_prob = options.get("show_prob") or True
+
+        return {
+            "image": image,
+            "confidence": confidence,
+            "annotate": annotate,
+            "stroke_width": stroke_width,
+            "show_prob": show_prob,
+        }
+
+    @staticmethod
+    def _rescale(
+        res: typing.Dict[str, typing.Any], scale: ImageScale
+    ) -> typing.Dict[str, typing.Any]:
+        scale_x, scale_y = scale
+        if scale_x == 1.0 and scale_y == 1.0:
+            return res
+        detections = [
+            {
+                **detection,
+                "x": detection["x"] * scale_x,
+                "y": detection["y"] * scale_y,
+                "width": detection["width"] * scale_x,
+                "height": detection["height"] * scale_y,
+            }
+            for detection in res["detections"]
+        ]
+        return {**res, "detections": detections}
+
+    @staticmethod
+    def _to_prediction(res: typing.Dict[str, typing.Any]) -> ObjectDetection:
+        return ObjectDetection(
+            detections=res["detections"], base64_image=res.get("image")
+        )
+
+
+class ObjectDetectionModel(_ObjectDetectionMixin, PredictionModel):
+    """
+    Object Detection Model.
+
+    Manages the model inferences for object detection models trained in the platform
+    """
+
     def detect(
         self,
-        image_path: str,
+        image_path: typings.ImageSource,
         confidence: float = 0.7,
+        *,
+        max_side: typing.Optional[int] = None,
         **kwargs: Unpack[typings.DetectOptions],
     ) -> ObjectDetection:
         """
         Infers detections based on image from specified model and image path.
 
-        :param image_path: Path to image (can be local file or remote url).
+        :param image_path: Image (path, url, bytes, file object, PIL image or array).
         :param confidence: Prediction confidence.
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent. Detections are
+        mapped back to the original image, the annotated image is downscaled.
         :param kwargs: Annotation options for the prediction
         :return: ObjectDetection object
         """
-        annotate = kwargs.get("annotate") or True
-        stroke_width = kwargs.get("stroke_width")
-        show_prob = kwargs.get("show_prob") or True
+        res = self._post_prediction(
+            image_path,
+            lambda image: self._build_payload(image, confidence, kwargs),
+            max_side=max_side,
+        )
 
-        image = self._prepare_image(image_path)
+        return self._to_prediction(res)
 
-        data = {
-            "image": image,
-            "confidence": confidence,
-            "annotate": annotate,
-            "stroke_width": stroke_width,
-            "show_prob": show_prob,
-        }
-        url = self._build_url()
-        res = self._client.make_post(path=url, json=data)
+    def detect_batch(
+        self,
+        images: typing.Iterable[typings.ImageSource],
+        confidence: float = 0.7,
+        num_workers: int = DEFAULT_BATCH_WORKERS,
+        *,
+        max_side: typing.Optional[int] = None,
+        **kwargs: Unpack[typings.DetectOptions],
+    ) -> typing.List[BatchPrediction[ObjectDetection]]:
+        """
+        Infers detections for many images concurrently.
+        Failed images are reported on their result instead of aborting the batch.
 
-        return ObjectDetection(
-            detections=res["detections"], base64_image=res.get("image")
+        :param images: Images (paths, urls, bytes, file objects, PIL images or arrays).
+        :param confidence: Prediction confidence.
+        :param num_workers: Maximum number of requests in flight.
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent.
+        :param kwargs: Annotation options for the prediction
+        :return: Batch predictions in the order of the images
+        """
+        return self._run_batch(
+            lambda image: self.detect(
+                image, confidence=confidence, max_side=max_side, **kwargs
+            ),
+            images,
+            num_workers=num_workers,
+        )
+
+
+class AsyncObjectDetectionModel(_ObjectDetectionMixin, AsyncPredictionModel):
+    """
+    Async Object Detection Model.
+
+    Manages the model inferences for object detection models using the async client
+    """
+
+    async def detect(
+        self,
+        image_path: typings.ImageSource,
+        confidence: float = 0.7,
+        *,
+        max_side: typing.Optional[int] = None,
+        **kwargs: Unpack[typings.DetectOptions],
+    ) -> ObjectDetection:
+        """
+        Infers detections based on image from specified model and image path.
+
+        :param image_path: Image (path, url, bytes, file object, PIL image or array).
+        :param confidence: Prediction confidence.
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent. Detections are
+        mapped back to the original image, the annotated image is downscaled.
+        :param kwargs: Annotation options for the prediction
+        :return: ObjectDetection object
+        """
+        res = await self._post_prediction(
+            image_path,
+            lambda image: self._build_payload(image, confidence, kwargs),
+            max_side=max_side,
+        )
+
+        return self._to_prediction(res)
+
+    async def detect_batch(
+        self,
+        images: typing.Iterable[typings.ImageSource],
+        confidence: float = 0.7,
+        num_workers: int = DEFAULT_BATCH_WORKERS,
+        *,
+        max_side: typing.Optional[int] = None,
+        **kwargs: Unpack[typings.DetectOptions],
+    ) -> typing.List[BatchPrediction[ObjectDetection]]:
+        """
+        Infers detections for many images concurrently.
+        Failed images are reported on their result instead of aborting the batch.
+
+        :param images: Images (paths, urls, bytes, file objects, PIL images or arrays).
+        :param confidence: Prediction confidence.
+        :param num_workers: Maximum number of requests in flight.
+        :param max_side: If set, local images are downscaled so that their longest
+        side is at most `max_side` pixels before they are sent.
+        :param kwargs: Annotation options for the prediction
+        :return: Batch predictions in the order of the images
+        """
+        return await self._arun_batch(
+            lambda image: self.detect(
+                image, confidence=confidence, max_side=max_side, **kwargs
+            ),
+            images,
+            num_workers=num_workers,
         )
@@ -1,44 +1,46 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import typing
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-import httpx
-from tqdm import tqdm
-from typing_extensions import deprecated
+from typing_extensions import Unpack, deprecated
 
 from epigos import typings
 from epigos.data_classes import project as project_data_class
 from epigos.dataset import BaseDataset, ClassificationDataset, DetectionDataset
 from epigos.typings import BoxFormat
 from epigos.utils import image as img_utils
-from epigos.utils import logger
 
-from .uploader import Uploader
+from .dataset_upload import (
+    AsyncDatasetSync,
+    AsyncDatasetUpload,
+    DatasetSync,
+    DatasetUpload,
+)
+from .dedup import DedupIndex
+from .journal import UploadJournal
+from .labels import LabelRegistry
+from .session import AsyncUploadSession, UploadSession
+from .sync import SyncManifest, diff_dataset
+from .uploader import AsyncUploader, Uploader
 
 if TYPE_CHECKING:
-    from epigos.client import Epigos
+    from epigos.client import AsyncEpigos, Epigos
 
 ACCEPTED_IMAGE_FORMATS = ("JPEG", "PNG")
 IMAGE_SIZE = (1024, 640)
 
 
-class Project:
+class BaseProject:
     """
-    Project class represents a Project in the Epigos AI.
+    Project attributes and dataset reading shared by the sync and async projects.
     """
 
-    def __init__(self, client: "Epigos", project_id: str):
-        self._client = client
-        self.project_id = project_id
-
-        project = self.get()
-        self.name = project.name
-        self.project_type = project.project_type
-        self.workspace_id = project.workspace_id
-        self._uploader = Uploader(self._client, self.project_id, self.project_type)
+    project_id: str
+    project_type: typings.ProjectType
 
     @property
     def is_classification(self) -> bool:
@@ -56,6 +58,73 @@ class Project:
         """
         return self.project_type == typings.ProjectType.object_detection
 
+    @staticmethod
+    def _to_project(res: typing.Dict[str, Any]) -> project_data_class.Project:
+        return project_data_class.Project(
+            id=res["id"],
+            name=res["name"],
+            workspace_id=res["workspaceId"],
+            project_type=res["projectType"],
+        )
+
+    def _read_dataset_directory(
+        self,
+        data_dir: Path,
+        *,
+        annotations_directory_path: Path,
+        data_yaml_path: Path,
+        box_format: BoxFormat,
+        num_workers: int = 1,
+        lazy: bool = False,
+    ) -> BaseDataset:
+        """
+        Reads dataset directory and returns a mapping for image files
+        and its corresponding annotations file.
+        """
+        if self.is_object_detection:
+            return DetectionDataset.from_format(
+                box_format=box_format,
+                images_directory_path=data_dir,
+                annotations_directory_path=annotations_directory_path,
+                data_yaml_path=data_yaml_path,
+                num_workers=num_workers,
+                lazy=lazy,
+            )
+
+        return ClassificationDataset.from_folder(data_dir, num_workers=num_workers)
+
+    def _dedup_index(
+        self, options: typings.UploadOptions
+    ) -> typing.Optional[DedupIndex]:
+        dedup_path = options.get("dedup_path")
+        if options.get("dedup") or dedup_path:
+            return DedupIndex(self.project_id, dedup_path)
+        return None
+
+
+class Project(BaseProject):
+    """
+    Project class represents a Project in the Epigos AI.
+    """
+
+    def __init__(
+        self,
+        client: "Epigos",
+        project_id: str,
+        labels_path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None,
+    ):
+        self._client = client
+        self.project_id = project_id
+
+        project = self.get()
+        self.name = project.name
+        self.project_type = project.project_type
+        self.workspace_id = project.workspace_id
+        self.labels = LabelRegistry(labels_path)
+        self._uploader = Uploader(
+            self._client, self.project_id, self.project_type, labels=self.labels
+        )
+
     def get(self) -> project_data_class.Project:
         """
         Returns Project object from Epigos AI
@@ -63,12 +132,7 @@ class Project:
         """
         url = f"/projects/{self.project_id}/"
         res = self._client.make_get(path=url)
-        return project_data_class.Project(
-            id=res["id"],
-            name=res["name"],
-            workspace_id=res["workspaceId"],
-            project_type=res["projectType"],
-        )
+        return self._to_project(res)
 
     def upload(
         self,
@@ -115,11 +179,35 @@ class Project:
         )
         return record
 
+    def session(
+        self,
+        batch_name: str = "sdk-upload",
+        *,
+        rotate_every: typing.Optional[int] = None,
+        max_workers: int = 4,
+    ) -> UploadSession:
+        """
+        Returns an upload session for uploading many images one at a time.
+        The batch is created with the first upload and shared by the session.
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param rotate_every: If set, a new batch is created every `rotate_every` images.
+        :param max_workers: Number of threads running submitted uploads.
+        :return:
+        """
+        return UploadSession(
+            self._uploader,
+            batch_name=batch_name,
+            rotate_every=rotate_every,
+            max_workers=max_workers,
+        )
+
     def upload_classification_dataset(
         self,
         images_directory: typing.Union[str, Path],
         batch_name: str = "sdk-upload",
         num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
     ) -> typing.Iterator[dict[str, Any]]:
         """
         Upload dataset containing image classification dataset.
@@ -128,12 +216,14 @@ class Project:
         :param batch_name: name of batch to upload to within project.
         Defaults to `sdk-upload`.
         :param num_workers: Number of cpu workers to use for uploading.
+        :param kwargs: Options to tune the upload.
         :return:
         """
         return self._upload_dataset(
             images_directory,
             batch_name=batch_name,
             num_workers=num_workers,
+            **kwargs,
         )
 
     def upload_coco_dataset(
@@ -143,6 +233,7 @@ class Project:
         batch_name: str = "sdk-upload",
         labels_map: typing.Optional[typing.Dict[str, str]] = None,
         num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
     ) -> typing.Iterator[dict[str, Any]]:
         """
         Upload dataset containing COCO annotations and images.
@@ -152,6 +243,7 @@ class Project:
         Defaults to `sdk-upload`.
         :param labels_map: Class ID of label in Epigos AI to class name mapping.
         :param num_workers: Number of cpu workers to use for uploading.
+        :param kwargs: Options to tune the upload.
         :return:
         """
         return self._upload_dataset(
@@ -161,6 +253,7 @@ class Project:
             batch_name=batch_name,
             labels_map=labels_map,
             num_workers=num_workers,
+            **kwargs,
         )
 
     def upload_pascal_voc_dataset(
@@ -170,6 +263,7 @@ class Project:
         batch_name: str = "sdk-upload",
         labels_map: typing.Optional[typing.Dict[str, str]] = None,
         num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
     ) -> typing.Iterator[dict[str, Any]]:
         """
         Upload dataset containing PASCAL VOC annotations and images.
@@ -180,6 +274,7 @@ class Project:
         Defaults to `sdk-upload`.
         :param labels_map: Class ID of label in Epigos AI to class name mapping.
         :param num_workers: Number of cpu workers to use for uploading.
+        :param kwargs: Options to tune the upload.
         :return:
         """
         return self._upload_dataset(
@@ -189,6 +284,7 @@ class Project:
             batch_name=batch_name,
             labels_map=labels_map,
             num_workers=num_workers,
+            **kwargs,
         )
 
     def upload_yolo_dataset(
@@ -199,6 +295,7 @@ class Project:
         batch_name: str = "sdk-upload",
         labels_map: typing.Optional[typing.Dict[str, str]] = None,
         num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
     ) -> typing.Iterator[dict[str, Any]]:
         """
         Upload dataset containing YOLO annotations and images.
@@ -209,6 +306,7 @@ class Project:
         Defaults to `sdk-upload`.
         :param labels_map: Class ID of label in Epigos AI to class name mapping.
         :param num_workers: Number of cpu workers to use for uploading.
+        :param kwargs: Options to tune the upload.
         :return:
         """
         return self._upload_dataset(
@@ -219,8 +317,58 @@ class Project:
             batch_name=batch_name,
             labels_map=labels_map,
             num_workers=num_workers,
+            **kwargs,
         )
 
+    def sync_dataset(
+        self,
+        ds: BaseDataset,
+        manifest_path: typing.Union[str, "os.PathLike[str]"],
+        *,
+        batch_name: str = "sdk-sync",
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        num_workers: int = 4,
+        max_in_flight: typing.Optional[int] = None,
+        ordered: bool = True,
+    ) -> typing.Iterator[dict[str, Any]]:
+        """
+        Sync a local dataset to the project, uploading only the images and
+        annotations that are new or changed since the last sync.
+        The synced state of every image, its size, modification time,
+        content hash and annotations, is kept in a manifest file.
+        Images with changed contents or annotations are uploaded as new records.
+        The API cannot replace the annotations of a record, so the previous
+        record of a changed image remains in the project, its ID is returned
+        as `replaces` for removing it on the platform.
+        :param ds: Dataset to sync
+        :param manifest_path: Path to the manifest file of the dataset.
+        It is created by the first sync.
+        :param batch_name: name of batch to upload new images to within project.
+        Defaults to `sdk-sync`.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param num_workers: Number of workers hashing and uploading images.
+        :param max_in_flight: Maximum number of pending uploads.
+        Defaults to twice `num_workers`.
+        :param ordered: If True, results are yielded in dataset order,
+        otherwise in the order uploads complete.
+        :return: Results of the images that were uploaded or annotated
+        """
+        with SyncManifest(self.project_id, manifest_path) as manifest:
+            items, counts = diff_dataset(manifest, ds, num_workers=num_workers)
+            DatasetSync.log_counts(counts, manifest.prune(ds.images.values()))
+            if not items:
+                return
+
+            batch_id = self._uploader.create_batch(batch_name)
+            yield from DatasetSync(
+                self._uploader, manifest, ds, batch_id, labels_map
+            ).run(
+                items,
+                self._client.concurrent_requests(num_workers),
+                max_in_flight=max_in_flight,
+                ordered=ordered,
+            )
+
     @deprecated(
         "Use `upload_coco_dataset`, `upload_yolo_dataset`, `upload_pascal_voc_dataset` "
         "or `upload_classification_dataset` instead."
@@ -235,6 +383,7 @@ class Project:
         batch_name: str = "sdk-upload",
         labels_map: typing.Optional[typing.Dict[str, str]] = None,
         num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
     ) -> typing.Iterator[dict[str, Any]]:
         """
         Upload an entire dataset to Epigos API.
@@ -248,6 +397,7 @@ class Project:
         :param data_yaml_path: Path to YOLO data configuration file.
         :param labels_map: Class ID of label in Epigos AI to class name mapping.
         :param num_workers: Number of cpu workers to use for uploading.
+        :param kwargs: Options to tune the upload.
         :return:
         """
         return self._upload_dataset(
@@ -258,6 +408,7 @@ class Project:
             batch_name=batch_name,
             labels_map=labels_map,
             num_workers=num_workers,
+            **kwargs,
         )
 
     def _upload_dataset(  # pylint: disable=too-many-arguments
@@ -270,9 +421,12 @@ class Project:
         batch_name: str = "sdk-upload",
         labels_map: typing.Optional[typing.Dict[str, str]] = None,
         num_workers: int = 4,
+        **options: Unpack[typings.UploadOptions],
     ) -> typing.Iterator[dict[str, Any]]:
         """
         Upload an entire dataset to Epigos API.
+        Images are read from the dataset only while fewer than `max_in_flight`
+        uploads are pending, so memory stays bounded on large datasets.
         :param data_dir: Path to directory containing images and annotations to upload.
         :param annotations_directory: Path to directory containing
         annotations to upload.
@@ -283,6 +437,7 @@ class Project:
         :param data_yaml_path: Path to YOLO data configuration file.
         :param labels_map: Class ID of label in Epigos AI to class name mapping.
         :param num_workers: Number of cpu workers to use for uploading.
+        :param options: Options to tune the upload.
         :return:
         """
         if not img_utils.is_path(str(data_dir)):
@@ -297,6 +452,8 @@ class Project:
                 annotations_directory or data_dir / "labels"
             ),
             data_yaml_path=Path(data_yaml_path or data_dir / "data.yaml"),
+            num_workers=num_workers,
+            lazy=options.get("lazy", False),
         )
         num_images = len(ds)
 
@@ -305,61 +462,389 @@ class Project:
                 "Could not read any images or annotations in the directory provided"
             )
 
-        batch_id = self._uploader.create_batch(batch_name)
+        journal_path = options.get("journal_path")
+        journal = UploadJournal(journal_path) if journal_path else None
+        batch_id = journal.get_batch(batch_name) if journal else None
+        if batch_id is None:
+            batch_id = self._uploader.create_batch(batch_name)
+            if journal:
+                journal.set_batch(batch_name, batch_id)
 
         if not labels_map and ds.classes:
-            labels_map = self._uploader.create_labels(ds.classes)
-
-        def _upload_file(
-            img_path: Path, img_annotations: typing.List[typing.Any]
-        ) -> typing.Dict[str, typing.Any]:
-
-            record: typing.Dict[str, typing.Any] = {
-                "img_path": img_path,
-            }
-            try:
-                resp = self._uploader.upload(
-                    batch_id,
-                    img_path,
-                    annotations=img_annotations,
-                    box_format=box_format,
-                    labels_map=labels_map,
-                    label_names=ds.classes,
-                )
-                record["response"] = resp
-            except httpx.HTTPError:
-                logger.exception(
-                    "Error occured while uploading file: %s", img_path, exc_info=True
-                )
-            return record
-
-        with tqdm(total=num_images, desc="Uploading datasets", colour="green") as pbar:
-            with ThreadPoolExecutor(max_workers=num_workers) as executor:
-                for result in executor.map(
-                    lambda p: _upload_file(*p),
-                    ds,
-                ):
-                    pbar.update()
-                    yield result
+            labels_map = self.labels.resolve(ds.classes, self._uploader.create_labels)
 
-    def _read_dataset_directory(
+        yield from DatasetUpload(
+            self._uploader,
+            ds,
+            batch_id,
+            box_format=box_format,
+            labels_map=labels_map,
+            journal=journal,
+            dedup_index=self._dedup_index(options),
+        ).run(self._client.concurrent_requests(num_workers), **options)
+
+
+class AsyncProject(BaseProject):
+    """
+    AsyncProject represents a Project in the Epigos AI for the async client.
+    Use `AsyncEpigos.project` or `AsyncProject.load` to create an instance.
+    """
+
+    def __init__(
         self,
-        data_dir: Path,
+        client: "AsyncEpigos",
+        project: project_data_class.Project,
+        labels_path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None,
+    ) -> None:
+        self._client = client
+        self.project_id = project.id
+        self.name = project.name
+        self.project_type = project.project_type
+        self.workspace_id = project.workspace_id
+        self.labels = LabelRegistry(labels_path)
+        self._uploader = AsyncUploader(
+            self._client, self.project_id, self.project_type, labels=self.labels
+        )
+
+    @classmethod
+    async def load(
+        cls,
+        client: "AsyncEpigos",
+        project_id: str,
+        labels_path: typing.Optional[typing.Union[str, "os.PathLike[str]"]] = None,
+    ) -> AsyncProject:
+        """
+        Loads the project from Epigos AI
+        :param client: Async client to use for interaction with the Epigos server
+        :param project_id: ID of project to load
+        :param labels_path: Path to a JSON file persisting the label IDs
+        of the project between runs.
+        :return: AsyncProject
+        """
+        res = await client.make_get(path=f"/projects/{project_id}/")
+        project = cls._to_project(res)
+        project.id = project_id
+        return cls(client, project, labels_path=labels_path)
+
+    async def get(self) -> project_data_class.Project:
+        """
+        Returns Project object from Epigos AI
+        :return:
+        """
+        url = f"/projects/{self.project_id}/"
+        res = await self._client.make_get(path=url)
+        return self._to_project(res)
+
+    async def upload(
+        self,
+        image_path: typing.Union[str, Path],
         *,
-        annotations_directory_path: Path,
-        data_yaml_path: Path,
-        box_format: BoxFormat,
-    ) -> BaseDataset:
+        annotation_path: typing.Optional[typing.Union[str, Path]] = None,
+        box_format: BoxFormat = BoxFormat.pascal_voc,
+        batch_name: str = "sdk-upload",
+        batch_id: typing.Optional[str] = None,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        use_folder_as_class_name: bool = False,
+        yolo_labels_map: typing.Optional[typing.Dict[int, str]] = None,
+    ) -> typing.Dict[str, typing.Any]:
         """
-        Reads dataset directory and returns a mapping for image files
-        and its corresponding annotations file.
+        Upload an image and with or without annotations to the Epigos API.
+        :param image_path: Path or directory to images to upload.
+        :param annotation_path: Path to annotation file to annotate the image
+        :param box_format: Format of annotation to upload.
+        Defaults to `pascal_voc`.
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param batch_id: ID of batch to upload to within project.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param use_folder_as_class_name: Use containing folder of image as class name.
+        Only used for classification projects.
+        :param yolo_labels_map: Class ID to label name mapping for YOLO annotation.
+        :return:
         """
-        if self.is_object_detection:
-            return DetectionDataset.from_format(
-                box_format=box_format,
-                images_directory_path=data_dir,
-                annotations_directory_path=annotations_directory_path,
-                data_yaml_path=data_yaml_path,
+        is_file = img_utils.is_path(str(image_path))
+        if not is_file:
+            raise RuntimeError(f"Provided path does not exist at {image_path}!")
+
+        if batch_id is None:
+            batch_id = await self._uploader.create_batch(batch_name)
+
+        record = await self._uploader.upload(
+            batch_id,
+            image_path,
+            annotation_path=annotation_path,
+            use_folder_as_class_name=use_folder_as_class_name,
+            box_format=box_format,
+            labels_map=labels_map,
+            yolo_labels_map=yolo_labels_map,
+        )
+        return record
+
+    def session(
+        self,
+        batch_name: str = "sdk-upload",
+        *,
+        rotate_every: typing.Optional[int] = None,
+        max_workers: int = 4,
+    ) -> AsyncUploadSession:
+        """
+        Returns an upload session for uploading many images one at a time.
+        The batch is created with the first upload and shared by the session.
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param rotate_every: If set, a new batch is created every `rotate_every` images.
+        :param max_workers: Maximum number of submitted uploads in flight.
+        :return:
+        """
+        return AsyncUploadSession(
+            self._uploader,
+            batch_name=batch_name,
+            rotate_every=rotate_every,
+            max_workers=max_workers,
+        )
+
+    def upload_classification_dataset(
+        self,
+        images_directory: typing.Union[str, Path],
+        batch_name: str = "sdk-upload",
+        num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
+    ) -> typing.AsyncIterator[dict[str, Any]]:
+        """
+        Upload dataset containing image classification dataset.
+        Image folder names will be used as class names for the images.
+        :param images_directory: Path to folder containing images
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param num_workers: Number of concurrent uploads.
+        :param kwargs: Options to tune the upload.
+        :return:
+        """
+        return self._upload_dataset(
+            images_directory,
+            batch_name=batch_name,
+            num_workers=num_workers,
+            **kwargs,
+        )
+
+    def upload_coco_dataset(
+        self,
+        images_directory: typing.Union[str, Path],
+        annotations_path: typing.Union[str, Path],
+        batch_name: str = "sdk-upload",
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
+    ) -> typing.AsyncIterator[dict[str, Any]]:
+        """
+        Upload dataset containing COCO annotations and images.
+        :param images_directory: Path to folder containing images
+        :param annotations_path: Path to the singel file containing the COCO annotations
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param num_workers: Number of concurrent uploads.
+        :param kwargs: Options to tune the upload.
+        :return:
+        """
+        return self._upload_dataset(
+            images_directory,
+            annotations_directory=annotations_path,
+            box_format=BoxFormat.coco,
+            batch_name=batch_name,
+            labels_map=labels_map,
+            num_workers=num_workers,
+            **kwargs,
+        )
+
+    def upload_pascal_voc_dataset(
+        self,
+        images_directory: typing.Union[str, Path],
+        annotations_directory: typing.Union[str, Path],
+        batch_name: str = "sdk-upload",
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
+    ) -> typing.AsyncIterator[dict[str, Any]]:
+        """
+        Upload dataset containing PASCAL VOC annotations and images.
+        :param images_directory: Path to folder containing images.
+        :param annotations_directory: Path to directory containing
+        Pascal VOC annotations.
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param num_workers: Number of concurrent uploads.
+        :param kwargs: Options to tune the upload.
+        :return:
+        """
+        return self._upload_dataset(
+            images_directory,
+            annotations_directory=annotations_directory,
+            box_format=BoxFormat.pascal_voc,
+            batch_name=batch_name,
+            labels_map=labels_map,
+            num_workers=num_workers,
+            **kwargs,
+        )
+
+    def upload_yolo_dataset(
+        self,
+        images_directory: typing.Union[str, Path],
+        annotations_directory: typing.Union[str, Path],
+        data_yaml_path: typing.Optional[typing.Union[str, Path]] = None,
+        batch_name: str = "sdk-upload",
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        num_workers: int = 4,
+        **kwargs: Unpack[typings.UploadOptions],
+    ) -> typing.AsyncIterator[dict[str, Any]]:
+        """
+        Upload dataset containing YOLO annotations and images.
+        :param images_directory: Path to folder containing images
+        :param annotations_directory: Path to directory containing YOLO annotations
+        :param data_yaml_path: Path to YOLO data configuration file.
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param num_workers: Number of concurrent uploads.
+        :param kwargs: Options to tune the upload.
+        :return:
+        """
+        return self._upload_dataset(
+            images_directory,
+            annotations_directory=annotations_directory,
+            data_yaml_path=data_yaml_path,
+            box_format=BoxFormat.yolo,
+            batch_name=batch_name,
+            labels_map=labels_map,
+            num_workers=num_workers,
+            **kwargs,
+        )
+
+    async def sync_dataset(
+        self,
+        ds: BaseDataset,
+        manifest_path: typing.Union[str, "os.PathLike[str]"],
+        *,
+        batch_name: str = "sdk-sync",
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        num_workers: int = 4,
+        max_in_flight: typing.Optional[int] = None,
+        ordered: bool = True,
+    ) -> typing.AsyncIterator[dict[str, Any]]:
+        """
+        Sync a local dataset to the project, uploading only the images and
+        annotations that are new or changed since the last sync.
+        The synced state of every image, its size, modification time,
+        content hash and annotations, is kept in a manifest file.
+        Images with changed contents or annotations are uploaded as new records.
+        The API cannot replace the annotations of a record, so the previous
+        record of a changed image remains in the project, its ID is returned
+        as `replaces` for removing it on the platform.
+        :param ds: Dataset to sync
+        :param manifest_path: Path to the manifest file of the dataset.
+        It is created by the first sync.
+        :param batch_name: name of batch to upload new images to within project.
+        Defaults to `sdk-sync`.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param num_workers: Number of workers hashing and uploading images.
+        :param max_in_flight: Maximum number of pending uploads.
+        Defaults to `num_workers`.
+        :param ordered: If True, results are yielded in dataset order,
+        otherwise in the order uploads complete.
+        :return: Results of the images that were uploaded or annotated
+        """
+        with SyncManifest(self.project_id, manifest_path) as manifest:
+            items, counts = await asyncio.to_thread(
+                diff_dataset, manifest, ds, num_workers
+            )
+            DatasetSync.log_counts(counts, manifest.prune(ds.images.values()))
+            if not items:
+                return
+
+            batch_id = await self._uploader.create_batch(batch_name)
+            async for result in AsyncDatasetSync(
+                self._uploader, manifest, ds, batch_id, labels_map
+            ).run(
+                items,
+                self._client.concurrent_requests(num_workers),
+                max_in_flight=max_in_flight,
+                ordered=ordered,
+            ):
+                yield result
+
+    async def _upload_dataset(  # pylint: disable=too-many-arguments
+        self,
+        data_dir: typing.Union[str, Path],
+        *,
+        annotations_directory: typing.Optional[typing.Union[str, Path]] = None,
+        box_format: BoxFormat = BoxFormat.pascal_voc,
+        data_yaml_path: typing.Optional[typing.Union[str, Path]] = None,
+        batch_name: str = "sdk-upload",
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        num_workers: int = 4,
+        **options: Unpack[typings.UploadOptions],
+    ) -> typing.AsyncIterator[dict[str, Any]]:
+        """
+        Upload an entire dataset to Epigos API.
+        At most `max_in_flight` uploads, by default `num_workers`,
+        are in flight at any time.
+        :param data_dir: Path to directory containing images and annotations to upload.
+        :param annotations_directory: Path to directory containing
+        annotations to upload.
+        :param batch_name: name of batch to upload to within project.
+        Defaults to `sdk-upload`.
+        :param box_format: Format of annotation to upload.
+        Defaults to `pascal_voc` and only used for object detection projects.
+        :param data_yaml_path: Path to YOLO data configuration file.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param num_workers: Number of concurrent uploads.
+        :param options: Options to tune the upload.
+        :return:
+        """
+        if not img_utils.is_path(str(data_dir)):
+            raise RuntimeError(f"Provided path does not exist at {data_dir}!")
+
+        data_dir = Path(data_dir)
+
+        ds = await asyncio.to_thread(
+            self._read_dataset_directory,
+            data_dir,
+            box_format=box_format,
+            annotations_directory_path=Path(
+                annotations_directory or data_dir / "labels"
+            ),
+            data_yaml_path=Path(data_yaml_path or data_dir / "data.yaml"),
+            num_workers=num_workers,
+            lazy=options.get("lazy", False),
+        )
+        num_images = len(ds)
+
+        if not num_images > 0:
+            raise RuntimeError(
+                "Could not read any images or annotations in the directory provided"
+            )
+
+        journal_path = options.get("journal_path")
+        journal = UploadJournal(journal_path) if journal_path else None
+        batch_id = journal.get_batch(batch_name) if journal else None
+        if batch_id is None:
+            batch_id = await self._uploader.create_batch(batch_name)
+            if journal:
+                journal.set_batch(batch_name, batch_id)
+
+        if not labels_map and ds.classes:
+            labels_map = await self.labels.aresolve(
+                ds.classes, self._uploader.create_labels
             )
 
-        return ClassificationDataset.from_folder(data_dir)
+        async for result in AsyncDatasetUpload(
+            self._uploader,
+            ds,
+            batch_id,
+            box_format=box_format,
+            labels_map=labels_map,
+            journal=journal,
+            dedup_index=self._dedup_index(options),
+        ).run(self._client.concurrent_requests(num_workers), **options):
+            yield result
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from epigos.typings import BoxFormat
+from epigos.utils import image as img_utils
+from epigos.utils import logger
+
+from .uploader import AsyncUploader, Uploader
+
+
+def _raise_failed(
+    failed: typing.Sequence[
+        typing.Union[Future[typing.Any], asyncio.Future[typing.Any]]
+    ],
+) -> None:
+    for future in failed[1:]:
+        logger.error("Submitted upload failed", exc_info=future.exception())
+    if failed:
+        raise typing.cast(BaseException, failed[0].exception())
+
+
+BatchT = typing.TypeVar("BatchT")
+
+
+class _BatchRotation(typing.Generic[BatchT]):
+    """
+    Hands out the batch name to use for each upload of a session,
+    switching to a new batch every `rotate_every` images.
+    The creation of each batch is kept by its index.
+    """
+
+    def __init__(self, batch_name: str, rotate_every: typing.Optional[int]) -> None:
+        if rotate_every is not None and rotate_every < 1:
+            raise ValueError("rotate_every must be a positive number")
+        self.batch_name = batch_name
+        self.rotate_every = rotate_every
+        self.batches: typing.Dict[int, BatchT] = {}
+        self._count = 0
+
+    def next(self) -> typing.Tuple[int, str]:
+        """
+        Counts an upload and returns the index and name of its batch
+        """
+        index = self._count // self.rotate_every if self.rotate_every else 0
+        self._count += 1
+        name = self.batch_name if index == 0 else f"{self.batch_name}-{index + 1}"
+        return index, name
+
+    @property
+    def count(self) -> int:
+        """
+        Number of uploads in the session
+        """
+        return self._count
+
+
+class UploadSession:
+    """
+    Upload session uploads many images to a project while sharing
+    the setup between them. The batch is created with the first upload,
+    labels are created once and uploads reuse the client connections.
+
+    Use it as a context manager, pending uploads are flushed on exit
+    and the error of a failed submitted upload is raised:
+
+        with project.session(rotate_every=1000) as session:
+            session.submit("image.jpg", annotation_path="image.xml")
+
+    :param uploader: Uploader of the project
+    :param batch_name: Name of the batch to upload to.
+    :param rotate_every: If set, a new batch is created every `rotate_every` images.
+    :param max_workers: Number of threads running submitted uploads.
+    """
+
+    def __init__(
+        self,
+        uploader: Uploader,
+        batch_name: str = "sdk-upload",
+        rotate_every: typing.Optional[int] = None,
+        max_workers: int = 4,
+    ) -> None:
+        self._uploader = uploader
+        self._rotation: _BatchRotation[Future[str]] = _BatchRotation(
+            batch_name, rotate_every
+        )
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+        self._pending: typing.Set[Future[typing.Dict[str, typing.Any]]] = set()
+        self._failed: typing.List[Future[typing.Dict[str, typing.Any]]] = []
+
+    def __enter__(self) -> UploadSession:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    @property
+    def batch_ids(self) -> typing.List[str]:
+        """
+        IDs of the batches created by the session
+        """
+        with self._lock:
+            return [
+                future.result()
+                for _, future in sorted(self._rotation.batches.items())
+                if future.done()
+            ]
+
+    @property
+    def count(self) -> int:
+        """
+        Number of images uploaded or submitted in the session
+        """
+        return self._rotation.count
+
+    def _batch_id(self) -> str:
+        with self._lock:
+            index, name = self._rotation.next()
+            existing = self._rotation.batches.get(index)
+            if existing is None:
+                future: Future[str] = Future()
+                self._rotation.batches[index] = future
+        if existing is not None:
+            return existing.result()
+
+        # created outside the lock, so uploads to existing batches go on
+        # while uploads to this batch wait for its future
+        try:
+            batch_id = self._uploader.create_batch(name)
+        except BaseException as exc:
+            with self._lock:
+                # the next upload to the batch creates it again
+                del self._rotation.batches[index]
+            future.set_exception(exc)
+            raise
+        future.set_result(batch_id)
+        return batch_id
+
+    def upload(
+        self,
+        image_path: typing.Union[str, Path],
+        *,
+        annotation_path: typing.Optional[typing.Union[str, Path]] = None,
+        box_format: BoxFormat = BoxFormat.pascal_voc,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        use_folder_as_class_name: bool = False,
+        yolo_labels_map: typing.Optional[typing.Dict[int, str]] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Upload an image and with or without annotations in the session batch.
+        :param image_path: Path to image to upload.
+        :param annotation_path: Path to annotation file to annotate the image
+        :param box_format: Format of annotation to upload.
+        Defaults to `pascal_voc`.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param use_folder_as_class_name: Use containing folder of image as class name.
+        Only used for classification projects.
+        :param yolo_labels_map: Class ID to label name mapping for YOLO annotation.
+        :return:
+        """
+        if not img_utils.is_path(str(image_path)):
+            raise RuntimeError(f"Provided path does not exist at {image_path}!")
+
+        return self._uploader.upload(
+            self._batch_id(),
+            image_path,
+            annotation_path=annotation_path,
+            box_format=box_format,
+            labels_map=labels_map,
+            use_folder_as_class_name=use_folder_as_class_name,
+            yolo_labels_map=yolo_labels_map,
+        )
+
+    def submit(
+        self, image_path: typing.Union[str, Path], **kwargs: typing.Any
+    ) -> Future[typing.Dict[str, typing.Any]]:
+        """
+        Upload an image in the background.
+        Takes the same arguments as `upload`.
+        :param image_path: Path to image to upload.
+        :return: Future of the uploaded record
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+            future = self._executor.submit(self.upload, image_path, **kwargs)
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future[typing.Dict[str, typing.Any]]) -> None:
+        with self._lock:
+            self._pending.discard(future)
+            if not future.cancelled() and future.exception() is not None:
+                self._failed.append(future)
+
+    def flush(self) -> None:
+        """
+        Wait for all submitted uploads to complete.
+        Raises the error of the first submitted upload that failed since
+        the last flush, the other failures are logged.
+        """
+        wait(list(self._pending))
+        with self._lock:
+            failed, self._failed = self._failed, []
+        _raise_failed(failed)
+
+    def close(self) -> None:
+        """
+        Flush submitted uploads and release the session threads
+        """
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                if self._executor is not None:
+                    self._executor.shutdown()
+                    self._executor = None
+
+
+class AsyncUploadSession:
+    """
+    Async counterpart of `UploadSession`.
+
+        async with project.session(rotate_every=1000) as session:
+            session.submit("image.jpg", annotation_path="image.xml")
+
+    :param uploader: Async uploader of the project
+    :param batch_name: Name of the batch to upload to.
+    :param rotate_every: If set, a new batch is created every `rotate_every` images.
+    :param max_workers: Maximum number of submitted uploads in flight.
+    """
+
+    def __init__(
+        self,
+        uploader: AsyncUploader,
+        batch_name: str = "sdk-upload",
+        rotate_every: typing.Optional[int] = None,
+        max_workers: int = 4,
+    ) -> None:
+        self._uploader = uploader
+        self._rotation: _BatchRotation[asyncio.Task[str]] = _BatchRotation(
+            batch_name, rotate_every
+        )
+        self._max_workers = max_workers
+        self._limit: typing.Optional[asyncio.Semaphore] = None
+        self._pending: typing.Set[asyncio.Task[typing.Dict[str, typing.Any]]] = set()
+        self._failed: typing.List[asyncio.Task[typing.Dict[str, typing.Any]]] = []
+
+    async def __aenter__(self) -> AsyncUploadSession:
+        return self
+
+    async def __aexit__(self, *args: typing.Any) -> None:
+        await self.flush()
+
+    @property
+    def batch_ids(self) -> typing.List[str]:
+        """
+        IDs of the batches created by the session
+        """
+        return [
+            task.result()
+            for _, task in sorted(self._rotation.batches.items())
+            if task.done() and not task.cancelled() and task.exception() is None
+        ]
+
+    @property
+    def count(self) -> int:
+        """
+        Number of images uploaded or submitted in the session
+        """
+        return self._rotation.count
+
+    def _batch_done(self, index: int, task: asyncio.Task[str]) -> None:
+        if task.cancelled() or task.exception() is not None:
+            if self._rotation.batches.get(index) is task:
+                # the next upload to the batch creates it again
+                del self._rotation.batches[index]
+
+    async def _batch_id(self) -> str:
+        index, name = self._rotation.next()
+        task = self._rotation.batches.get(index)
+        if task is None:
+            task = asyncio.ensure_future(self._uploader.create_batch(name))
+            task.add_done_callback(functools.partial(self._batch_done, index))
+            self._rotation.batches[index] = task
+        # uploads waiting for the batch are cancelled without cancelling
+        # its creation, which other uploads may wait for
+        return await asyncio.shield(task)
+
+    async def upload(
+        self,
+        image_path: typing.Union[str, Path],
+        *,
+        annotation_path: typing.Optional[typing.Union[str, Path]] = None,
+        box_format: BoxFormat = BoxFormat.pascal_voc,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        use_folder_as_class_name: bool = False,
+        yolo_labels_map: typing.Optional[typing.Dict[int, str]] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Upload an image and with or without annotations in the session batch.
+        :param image_path: Path to image to upload.
+        :param annotation_path: Path to annotation file to annotate the image
+        :param box_format: Format of annotation to upload.
+        Defaults to `pascal_voc`.
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param use_folder_as_class_name: Use containing folder of image as class name.
+        Only used for classification projects.
+        :param yolo_labels_map: Class ID to label name mapping for YOLO annotation.
+        :return:
+        """
+        if not img_utils.is_path(str(image_path)):
+            raise RuntimeError(f"Provided path does not exist at {image_path}!")
+
+        return await self._uploader.upload(
+            await self._batch_id(),
+            image_path,
+            annotation_path=annotation_path,
+            box_format=box_format,
+            labels_map=labels_map,
+            use_folder_as_class_name=use_folder_as_class_name,
+            yolo_labels_map=yolo_labels_map,
+        )
+
+    def submit(
+        self, image_path: typing.Union[str, Path], **kwargs: typing.Any
+    ) -> asyncio.Task[typing.Dict[str, typing.Any]]:
+        """
+        Upload an image in the background.
+        Takes the same arguments as `upload`.
+        :param image_path: Path to image to upload.
+        :return: Task of the uploaded record
+        """
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self._max_workers)
+        limit = self._limit
+
+        async def _upload() -> typing.Dict[str, typing.Any]:
+            async with limit:
+                return await self.upload(image_path, **kwargs)
+
+        task = asyncio.ensure_future(_upload())
+        self._pending.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task[typing.Dict[str, typing.Any]]) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._failed.append(task)
+
+    async def flush(self) -> None:
+        """
+        Wait for all submitted uploads to complete.
+        Raises the error of the first submitted upload that failed since
+        the last flush, the other failures are logged.
+        """
+        if self._pending:
+            await asyncio.wait(list(self._pending))
+        failed, self._failed = self._failed, []
+        _raise_failed(failed)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import dataclasses
+import enum
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import typing
+from pathlib import Path
+
+from epigos.data_classes.dataset import Classification, Detection
+from epigos.dataset import BaseDataset
+from epigos.utils.concurrency import bounded_map
+
+from .dedup import file_digest
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    project_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    annotations TEXT NOT NULL,
+    record_id TEXT,
+    PRIMARY KEY (project_id, path)
+);
+"""
+
+
+class SyncAction(str, enum.Enum):
+    """
+    Sync action
+
+    Enums for what a dataset sync does with an image
+    """
+
+    new = "new"
+    changed = "changed"
+    annotations = "annotations"
+    unchanged = "unchanged"
+
+
+@dataclasses.dataclass
+class ManifestEntry:
+    """
+    Dataclass containing the synced state of an image
+    """
+
+    size: int
+    mtime_ns: int
+    digest: str
+    annotations: str
+    record_id: typing.Optional[str] = None
+
+
+@dataclasses.dataclass
+class SyncItem:
+    """
+    Dataclass containing an image of a dataset and what a sync has to do with it
+    """
+
+    image_name: str
+    image_path: Path
+    action: SyncAction
+    entry: ManifestEntry
+    annotations: typing.Union[typing.List[Classification], typing.List[Detection]]
+
+
+def annotations_fingerprint(
+    annotations: typing.Union[typing.List[Classification], typing.List[Detection]],
+) -> str:
+    """
+    Returns a digest identifying the annotations of an image
+    :param annotations: Annotations of an image
+    :return: hex digest
+    """
+    content = json.dumps(
+        [dataclasses.asdict(annot) for annot in annotations], sort_keys=True
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class SyncManifest:
+    """
+    Sync manifest records the images of a local dataset synced to a project
+    in a SQLite database, so later syncs only upload what changed.
+
+    Images are identified by their resolved path. Their content hash is only
+    computed again if their size or modification time changed.
+
+    :param project_id: ID of project the dataset is synced to
+    :param path: Path to the manifest database file. It is created if missing.
+    """
+
+    def __init__(
+        self, project_id: str, path: typing.Union[str, "os.PathLike[str]"]
+    ) -> None:
+        self.project_id = project_id
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> SyncManifest:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the manifest database
+        """
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _key(image_path: typing.Union[str, Path]) -> str:
+        return str(Path(image_path).resolve())
+
+    def get(
+        self, image_path: typing.Union[str, Path]
+    ) -> typing.Optional[ManifestEntry]:
+        """
+        Returns the synced state of an image
+        :param image_path: Path to image
+        :return: ManifestEntry or None if the image was never synced
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest, annotations, record_id FROM files "
+                "WHERE project_id = ? AND path = ?",
+                (self.project_id, self._key(image_path)),
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def update(self, image_path: typing.Union[str, Path], entry: ManifestEntry) -> None:
+        """
+        Records the synced state of an image
+        :param image_path: Path to image
+        :param entry: Synced state
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (project_id, path, size, mtime_ns, "
+                "digest, annotations, record_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.project_id,
+                    self._key(image_path),
+                    entry.size,
+                    entry.mtime_ns,
+                    entry.digest,
+                    entry.annotations,
+                    entry.record_id,
+                ),
+            )
+
+    def prune(self, image_paths: typing.Iterable[typing.Union[str, Path]]) -> int:
+        """
+        Removes the images that are not in `image_paths` from the manifest
+        :param image_paths: Paths to the images of the dataset
+        :return: Number of removed images
+        """
+        keep = {self._key(p) for p in image_paths}
+        with self._lock, self._conn:
+            synced = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT path FROM files WHERE project_id = ?", (self.project_id,)
+                )
+            ]
+            removed = [(self.project_id, p) for p in synced if p not in keep]
+            self._conn.executemany(
+                "DELETE FROM files WHERE project_id = ? AND path = ?", removed
+            )
+        return len(removed)
+
+    def diff(
+        self,
+        image_name: str,
+        image_path: Path,
+        annotations: typing.Union[typing.List[Classification], typing.List[Detection]],
+    ) -> SyncItem:
+        """
+        Compares an image and its annotations with their synced state
+        :param image_name: File name of the image in the dataset
+        :param image_path: Path to image
+        :param annotations: Annotations of the image
+        :return: SyncItem
+        """
+        stat = os.stat(image_path)
+        synced = self.get(image_path)
+        if (
+            synced is not None
+            and synced.size == stat.st_size
+            and synced.mtime_ns == stat.st_mtime_ns
+        ):
+            digest = synced.digest
+        else:
+            digest = file_digest(image_path)
+
+        entry = ManifestEntry(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            digest=digest,
+            annotations=annotations_fingerprint(annotations),
+            record_id=synced.record_id if synced else None,
+        )
+        if synced is None:
+            action = SyncAction.new
+        elif synced.digest != entry.digest or not synced.record_id:
+            action = SyncAction.changed
+        elif synced.annotations != entry.annotations:
+            action = SyncAction.annotations
+        else:
+            action = SyncAction.unchanged
+            if synced != entry:
+                # touched without changes, remember the new modification time
+                self.update(image_path, entry)
+
+        return SyncItem(
+            image_name=image_name,
+            image_path=image_path,
+            action=action,
+            entry=entry,
+            annotations=annotations,
+        )
+
+
+def diff_dataset(
+    manifest: SyncManifest, ds: BaseDataset, num_workers: int = 4
+) -> typing.Tuple[typing.List[SyncItem], typing.Dict[SyncAction, int]]:
+    """
+    Compares the images of a dataset with their synced state.
+    Images are hashed on `num_workers` threads.
+    :param manifest: Sync manifest of the project
+    :param ds: Dataset to sync
+    :param num_workers: Number of threads to use
+    :return: Images to upload or annotate and the number of images of each action
+    """
+    items = []
+    counts = {action: 0 for action in SyncAction}
+    for item in bounded_map(
+        lambda p: manifest.diff(p[0], p[1], ds.read_annotations(p[0])),
+        ds.images.items(),
+        max_workers=num_workers,
+        window=num_workers * 2,
+    ):
+        counts[item.action] += 1
+        if item.action != SyncAction.unchanged:
+            items.append(item)
+    return items, counts
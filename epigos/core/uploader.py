@@ -1,10 +1,13 @@
+import asyncio
+import dataclasses
 import io
 import mimetypes
+import os
 import typing
+from concurrent.futures import Executor
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import httpx
 from PIL import Image, ImageOps
 
 from epigos import typings
@@ -13,29 +16,205 @@ from epigos.dataset import utils as dataset_utils
 from epigos.typings import BoxFormat
 from epigos.utils import image as img_utils
 from epigos.utils import logger
+from epigos.utils.limiter import alimited, limited
+
+from .journal import JournalEntry, UploadJournal, UploadState
+from .labels import LabelRegistry
 
 if TYPE_CHECKING:
-    from epigos.client import Epigos
+    from epigos.client import AsyncEpigos, Epigos
 
 ACCEPTED_IMAGE_FORMATS = ("JPEG", "PNG")
 DEFAULT_IMAGE_SIZE = (1024, 1024)
+UPLOAD_CHUNK_SIZE = 1 << 16
+JPEG_DRAFT_REDUCING_GAP = 2.0
+EXIF_ORIENTATION_TAG = 0x0112
 
 
-class Uploader:
+@dataclasses.dataclass
+class PreparedImage:
     """
-    Uploader is responsible for uploading images and annotations to Epigos AI
+    Dataclass containing an encoded image and its annotations ready for upload
+    """
+
+    image_path: Path
+    content: bytes
+    content_type: str
+    size: typing.Tuple[int, int]
+    orig_size: typing.Tuple[int, int]
+    annotations: typing.Union[typing.List[Classification], typing.List[Detection]] = (
+        dataclasses.field(default_factory=list)
+    )
+    source: typing.Optional[Path] = None
+
+    @property
+    def content_size(self) -> int:
+        """
+        Size in bytes of the image uploaded to storage
+        """
+        if self.source is not None:
+            return os.path.getsize(self.source)
+        return len(self.content)
+
+
+@dataclasses.dataclass
+class UploadTask:
+    """
+    Dataclass containing the progress of an image upload,
+    passed between the stages of an upload pipeline.
+    The completed steps are tracked in its journal entry.
+    """
+
+    batch_id: str
+    image_path: Path
+    entry: JournalEntry
+    journal: typing.Optional[UploadJournal] = None
+    prepared: typing.Optional[PreparedImage] = None
+    error: typing.Optional[BaseException] = None
+    duplicate_of: typing.Optional[Path] = None
+
+    @property
+    def done(self) -> bool:
+        """
+        Returns true if all steps of the upload completed,
+        or the image is skipped as a duplicate
+        """
+        if self.duplicate_of is not None:
+            return True
+        return self.record is not None and self.entry.reached(UploadState.annotated)
+
+    @property
+    def uploaded(self) -> bool:
+        """
+        Returns true if the image was uploaded to storage
+        """
+        return self.entry.reached(UploadState.uploaded)
+
+    @property
+    def record(self) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Dataset record of the task, available after the record stage
+        """
+        if self.entry.reached(UploadState.recorded):
+            return self.entry.record
+        return None
+
+    @property
+    def prepared_image(self) -> PreparedImage:
+        """
+        Prepared image of the task, available after the prepare stage
+        """
+        if self.prepared is None:
+            raise RuntimeError(f"Image {self.image_path} has not been prepared")
+        return self.prepared
+
+    @property
+    def presigned_url(self) -> typing.Dict[str, typing.Any]:
+        """
+        Presigned upload details of the task, available after the presign stage
+        """
+        if self.entry.presigned is None:
+            raise RuntimeError(f"Image {self.image_path} has not been presigned")
+        return self.entry.presigned
+
+
+def _can_pass_through(img: Image.Image) -> bool:
+    """
+    Returns true if the original file of an opened image
+    can be uploaded without decoding and re-encoding it.
+    Only the image header is read.
+    """
+    return (
+        img.format == "JPEG"
+        and img.width <= DEFAULT_IMAGE_SIZE[0]
+        and img.height <= DEFAULT_IMAGE_SIZE[1]
+        and img.getexif().get(EXIF_ORIENTATION_TAG, 1) == 1
+    )
+
+
+def _downscale(img: Image.Image, size: typing.Tuple[int, int]) -> Image.Image:
+    """
+    Resizes an image to fit in `size`, keeping its aspect ratio.
+    JPEG images are decoded at a reduced scale first, which is much faster
+    than decoding the full resolution. The reduced image is kept at least
+    `JPEG_DRAFT_REDUCING_GAP` times larger than the target size,
+    so the final resize quality is not affected.
+    """
+    if img.format == "JPEG":
+        ratio = min(size[0] / img.width, size[1] / img.height)
+        img.draft(
+            img.mode,
+            (
+                int(img.width * ratio * JPEG_DRAFT_REDUCING_GAP),
+                int(img.height * ratio * JPEG_DRAFT_REDUCING_GAP),
+            ),
+        )
+    return ImageOps.contain(img, size)
+
+
+def preprocess_image(image_path: Path) -> PreparedImage:
+    """
+    Reads, resizes and encodes an image for upload, without its annotations.
+    It is a module level function so it can run in a process pool.
+    :param image_path: Path to image
+    :return: PreparedImage
+    """
+    with Image.open(image_path) as img:
+        content_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+        orig_image_size = img.size
+
+        if img.format not in ACCEPTED_IMAGE_FORMATS:
+            raise RuntimeError(f"Image format {img.format} not supported.")
+
+        if _can_pass_through(img):
+            return PreparedImage(
+                image_path=image_path,
+                content=b"",
+                content_type="image/jpeg",
+                size=img.size,
+                orig_size=orig_image_size,
+                source=image_path,
+            )
+
+        if img.width > DEFAULT_IMAGE_SIZE[0] or img.height > DEFAULT_IMAGE_SIZE[1]:
+            img = _downscale(img, DEFAULT_IMAGE_SIZE)
+
+        with io.BytesIO() as fp:
+            img.save(fp, format="JPEG")
+            content = fp.getvalue()
+
+        return PreparedImage(
+            image_path=image_path,
+            content=content,
+            content_type=content_type,
+            size=img.size,
+            orig_size=orig_image_size,
+        )
+
+
+async def _aiter_file(path: Path) -> typing.AsyncIterator[bytes]:
+    with open(path, "rb") as fp:
+        while chunk := await asyncio.to_thread(fp.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+
+class BaseUploader:
+    """
+    Image preparation and payload building shared by the sync and async uploaders
     """
 
     def __init__(
-        self, client: "Epigos", project_id: str, project_type: typings.ProjectType
+        self,
+        project_id: str,
+        project_type: typings.ProjectType,
+        labels: typing.Optional[LabelRegistry] = None,
     ) -> None:
-        self._client = client
         self._project_id = project_id
         self._project_type = project_type
+        self.labels = labels if labels is not None else LabelRegistry()
 
-    def upload(
+    def prepare(
         self,
-        batch_id: str,
         image_path: typing.Union[str, Path],
         annotation_path: typing.Optional[typing.Union[str, Path]] = None,
         annotations: typing.Optional[
@@ -43,26 +222,25 @@ class Uploader:
         ] = None,
         use_folder_as_class_name: bool = False,
         box_format: BoxFormat = BoxFormat.pascal_voc,
-        label_names: typing.Optional[typing.List[str]] = None,
-        labels_map: typing.Optional[typing.Dict[str, str]] = None,
         yolo_labels_map: typing.Optional[typing.Dict[int, str]] = None,
-    ) -> typing.Dict[str, typing.Any]:
+        executor: typing.Optional[Executor] = None,
+    ) -> PreparedImage:
         """
-        Upload an image and with or without annotation to the Epigos API.
-        :param image_path: Path or directory to images to upload
+        Reads, resizes and encodes an image and reads its annotations.
+        This step does not make any network calls.
+        :param image_path: Path to image to upload
         :param annotation_path: Path to annotation file to annotate the image
         :param annotations: List of annotations to annotate the image.
-        :param batch_id: ID of batch to upload to within project.
         :param use_folder_as_class_name: Use containing folder of image as class name.
         Only used for classification projects.
         :param box_format: Format of annotation to upload.
-        Defaults to `pascal_voc`
-        :param label_names: List of class names of annotations
-        :param labels_map: Class ID of label in Epigos AI to class name mapping.
         :param yolo_labels_map: Class ID to label name mapping for YOLO annotation
-        :return:
+        :param executor: Executor running `preprocess_image`,
+        e.g. a process pool so encoding scales across cores.
+        Defaults to the calling thread.
+        :return: PreparedImage. JPEG images that do not need resizing
+        are not re-encoded, their file is uploaded as is.
         """
-
         image_path = Path(image_path)
 
         if not img_utils.is_path(str(image_path)):
@@ -73,136 +251,137 @@ class Uploader:
                 image_path.parent.name if use_folder_as_class_name else annotation_path
             )
 
-        with Image.open(image_path) as img:
-            content_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
-            orig_image_size = img.size
-
-            if img.format not in ACCEPTED_IMAGE_FORMATS:
-                raise RuntimeError(f"Image format {img.format} not supported.")
-
-            if img.width > DEFAULT_IMAGE_SIZE[0] or img.height > DEFAULT_IMAGE_SIZE[1]:
-                img = ImageOps.contain(img, DEFAULT_IMAGE_SIZE)
-
-            if annotation_path and not annotations:
-                annotations = self._read_annotations(
-                    image_name=image_path.name,
-                    annotation_path=str(annotation_path),
-                    orig_image_size=orig_image_size,
-                    box_format=box_format,
-                    yolo_labels_map=yolo_labels_map,
-                )
-            record = self._upload_image(
-                img, image_path, batch_id=batch_id, content_type=content_type
-            )
-
-        if annotations:
-            processed_annotations = self._prepare_annotations(
-                orig_image_size=orig_image_size,
-                resize_img_size=img.size,
-                annotations=annotations,
-            )
-            if not label_names:
-                label_names = list({d.class_name for d in annotations})
-
-            record["annotations"] = self._create_annotation(
-                record_id=record["id"],
-                annotations=processed_annotations,
-                label_names=label_names,
-                labels_map=labels_map,
-            )
+        if executor is None:
+            prepared = preprocess_image(image_path)
         else:
-            record["annotations"] = []
-
-        return record
-
-    def create_batch(self, batch_name: str) -> str:
-        """
-        Create a batch for uploading images to Epigos AI
-        :param batch_name:
-        :return: batch ID
-        """
-        batch = self._client.make_post(
-            path=f"/projects/{self._project_id}/batches/",
-            json={"name": batch_name},
+            prepared = executor.submit(preprocess_image, image_path).result()
+
+        if annotation_path and not annotations:
+            annotations = self._read_annotations(
+                image_name=image_path.name,
+                annotation_path=str(annotation_path),
+                orig_image_size=prepared.orig_size,
+                box_format=box_format,
+                yolo_labels_map=yolo_labels_map,
+            )
+        prepared.annotations = annotations or []
+        return prepared
+
+    @staticmethod
+    def _resume(
+        journal: typing.Optional[UploadJournal], image_path: typing.Union[str, Path]
+    ) -> JournalEntry:
+        entry = (
+            journal.get(image_path) if journal and Path(image_path).exists() else None
         )
-        return str(batch["id"])
+        return entry or JournalEntry(state=UploadState.pending)
 
-    def create_labels(self, names: typing.List[str]) -> typing.Dict[str, str]:
+    def start_task(
+        self,
+        batch_id: str,
+        image_path: typing.Union[str, Path],
+        journal: typing.Optional[UploadJournal] = None,
+    ) -> UploadTask:
         """
-        Creates annotation labels for the given names
-        :param names: Label names to create
-        :return:
+        Creates the upload task of an image, resuming the progress
+        recorded in the journal
+        :param batch_id: ID of batch to upload to within project.
+        :param image_path: Path to image to upload
+        :param journal: Journal recording the upload progress.
+        :return: UploadTask
         """
-        labels_payload = [{"name": name} for name in names]
-
-        labels = self._client.make_post(
-            path=f"/projects/{self._project_id}/annotations/labels/",
-            json=labels_payload,
+        task = UploadTask(
+            batch_id=batch_id,
+            image_path=Path(image_path),
+            entry=self._resume(journal, image_path),
+            journal=journal,
         )
-        return {label["name"]: label["id"] for label in labels}
+        if task.done:
+            logger.info("Skipping already uploaded file: %s", image_path)
+        return task
+
+    @staticmethod
+    def _journal_task(task: UploadTask, state: UploadState) -> None:
+        task.entry.state = state
+        if task.journal:
+            task.journal.update(
+                task.prepared_image.image_path,
+                state,
+                presigned=task.presigned_url,
+                record=task.entry.record,
+            )
 
-    def _upload_image(
-        self, img: Image.Image, image_path: Path, batch_id: str, content_type: str
-    ) -> typing.Dict[str, typing.Any]:
-        presigned = self._client.make_post(
-            path=f"/projects/{self._project_id}/upload/",
-            json={"name": image_path.name, "content_type": content_type},
-        )
+    @staticmethod
+    def _put_headers(prepared: PreparedImage) -> typing.Dict[str, str]:
+        return {
+            "Content-Type": prepared.content_type,
+            "Content-Length": str(prepared.content_size),
+        }
 
-        with io.BytesIO() as fp:
-            img.save(fp, format="JPEG")
-            content = fp.getvalue()
-            img_size = len(content)
+    def _presign_request(self, prepared: PreparedImage) -> typing.Dict[str, typing.Any]:
+        return {
+            "path": f"/projects/{self._project_id}/upload/",
+            "json": {
+                "name": prepared.image_path.name,
+                "content_type": prepared.content_type,
+            },
+        }
 
-            upload_response = httpx.put(
-                presigned["uploadUrl"],
-                content=content,
-                headers={
-                    "Content-Type": content_type,
-                },
-            )
-            upload_response.raise_for_status()
-
-        record_payload = {
-            "name": image_path.name,
-            "batchId": batch_id,
-            "height": img.height,
-            "width": img.width,
-            "contentType": content_type,
-            "size": img_size,
-            "source": presigned["uri"],
+    def _record_request(
+        self,
+        prepared: PreparedImage,
+        batch_id: str,
+        presigned: typing.Dict[str, typing.Any],
+    ) -> typing.Dict[str, typing.Any]:
+        return {
+            "path": f"/projects/{self._project_id}/datasets/records/",
+            "json": {
+                "name": prepared.image_path.name,
+                "batchId": batch_id,
+                "height": prepared.size[1],
+                "width": prepared.size[0],
+                "contentType": prepared.content_type,
+                "size": prepared.content_size,
+                "source": presigned["uri"],
+            },
         }
-        record = self._client.make_post(
-            path=f"/projects/{self._project_id}/datasets/records/",
-            json=record_payload,
-        )
-        return dict(record)
 
-    def _create_annotation(
+    def _annotation_request(
         self,
-        *,
         record_id: str,
         annotations: typing.List[typing.Dict[str, typing.Any]],
-        label_names: typing.List[str],
-        labels_map: typing.Optional[typing.Dict[str, str]] = None,
-    ) -> typing.Optional[typing.List[typing.Any]]:
+        labels_map: typing.Dict[str, str],
+    ) -> typing.Dict[str, typing.Any]:
+        for annotation in annotations:
+            annotation["label_id"] = labels_map[annotation["label_id"]]
 
-        payload: dict[str, typing.Any] = {
-            "dataset_record_id": record_id,
-            "annotations": annotations,
+        return {
+            "path": f"/projects/{self._project_id}/annotations/",
+            "json": {
+                "dataset_record_id": record_id,
+                "annotations": annotations,
+            },
         }
 
-        if not labels_map:
-            labels_map = self.create_labels(label_names)
+    def _labels_request(self, names: typing.List[str]) -> typing.Dict[str, typing.Any]:
+        return {
+            "path": f"/projects/{self._project_id}/annotations/labels/",
+            "json": [{"name": name} for name in names],
+        }
 
-        for annotation in payload["annotations"]:
-            annotation["label_id"] = labels_map[annotation["label_id"]]
+    def _batch_request(self, batch_name: str) -> typing.Dict[str, typing.Any]:
+        return {
+            "path": f"/projects/{self._project_id}/batches/",
+            "json": {"name": batch_name},
+        }
 
-        annotation_resp = self._client.make_post(
-            path=f"/projects/{self._project_id}/annotations/",
-            json=payload,
-        )
-        return list(annotation_resp)
+    @staticmethod
+    def _label_names(
+        prepared: PreparedImage, label_names: typing.Optional[typing.List[str]]
+    ) -> typing.List[str]:
+        if label_names:
+            return label_names
+        return list({d.class_name for d in prepared.annotations})
 
     def _read_annotations(
         self,
@@ -295,3 +474,497 @@ class Uploader:
                 )
 
         return output
+
+
+class Uploader(BaseUploader):
+    """
+    Uploader is responsible for uploading images and annotations to Epigos AI
+    """
+
+    def __init__(
+        self,
+        client: "Epigos",
+        project_id: str,
+        project_type: typings.ProjectType,
+        labels: typing.Optional[LabelRegistry] = None,
+    ) -> None:
+        super().__init__(project_id, project_type, labels=labels)
+        self._client = client
+
+    def upload(
+        self,
+        batch_id: str,
+        image_path: typing.Union[str, Path],
+        annotation_path: typing.Optional[typing.Union[str, Path]] = None,
+        annotations: typing.Optional[
+            typing.Union[typing.List[Classification], typing.List[Detection]]
+        ] = None,
+        use_folder_as_class_name: bool = False,
+        box_format: BoxFormat = BoxFormat.pascal_voc,
+        label_names: typing.Optional[typing.List[str]] = None,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        yolo_labels_map: typing.Optional[typing.Dict[int, str]] = None,
+        journal: typing.Optional[UploadJournal] = None,
+        executor: typing.Optional[Executor] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Upload an image and with or without annotation to the Epigos API.
+        :param image_path: Path or directory to images to upload
+        :param annotation_path: Path to annotation file to annotate the image
+        :param annotations: List of annotations to annotate the image.
+        :param batch_id: ID of batch to upload to within project.
+        :param use_folder_as_class_name: Use containing folder of image as class name.
+        Only used for classification projects.
+        :param box_format: Format of annotation to upload.
+        Defaults to `pascal_voc`
+        :param label_names: List of class names of annotations
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param yolo_labels_map: Class ID to label name mapping for YOLO annotation
+        :param journal: Journal recording the upload progress. Steps already
+        completed for the image in the journal are skipped.
+        :param executor: Executor used to read, resize and encode the image.
+        :return:
+        """
+        task = self.start_task(batch_id, image_path, journal)
+        if task.done:
+            return task.record or {}
+
+        self.prepare_task(
+            task,
+            annotation_path=annotation_path,
+            annotations=annotations,
+            use_folder_as_class_name=use_folder_as_class_name,
+            box_format=box_format,
+            yolo_labels_map=yolo_labels_map,
+            executor=executor,
+        )
+        self.presign_task(task)
+        self.put_task(task)
+        self.record_task(task)
+        self.annotate_task(task, label_names=label_names, labels_map=labels_map)
+        return task.record or {}
+
+    def prepare_task(self, task: UploadTask, **kwargs: typing.Any) -> UploadTask:
+        """
+        Pipeline stage reading, resizing and encoding the image of an upload task
+        :param task: Upload task
+        :param kwargs: Arguments passed to `prepare`
+        :return: UploadTask
+        """
+        if not task.done:
+            task.prepared = self.prepare(task.image_path, **kwargs)
+        return task
+
+    def presign_task(self, task: UploadTask) -> UploadTask:
+        """
+        Pipeline stage requesting the presigned storage url of an upload task
+        :param task: Upload task
+        :return: UploadTask
+        """
+        if task.done or task.uploaded:
+            return task
+        task.entry.presigned = self.presign(task.prepared_image)
+        self._journal_task(task, UploadState.presigned)
+        return task
+
+    def put_task(self, task: UploadTask) -> UploadTask:
+        """
+        Pipeline stage uploading the image of an upload task to storage
+        :param task: Upload task
+        :return: UploadTask
+        """
+        if task.done or task.uploaded:
+            return task
+        self.put(task.prepared_image, task.presigned_url)
+        self._journal_task(task, UploadState.uploaded)
+        return task
+
+    def record_task(self, task: UploadTask) -> UploadTask:
+        """
+        Pipeline stage creating the dataset record of an upload task
+        :param task: Upload task
+        :return: UploadTask
+        """
+        if task.done or task.record is not None:
+            return task
+        task.entry.record = self.create_record(
+            task.prepared_image, task.batch_id, task.presigned_url
+        )
+        self._journal_task(task, UploadState.recorded)
+        return task
+
+    def annotate_task(
+        self,
+        task: UploadTask,
+        label_names: typing.Optional[typing.List[str]] = None,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> UploadTask:
+        """
+        Pipeline stage creating the annotations of an upload task
+        :param task: Upload task
+        :param label_names: List of class names of annotations
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :return: UploadTask
+        """
+        if task.done or task.record is None:
+            return task
+        task.record["annotations"] = self.annotate(
+            task.record["id"],
+            task.prepared_image,
+            label_names=label_names,
+            labels_map=labels_map,
+        )
+        self._journal_task(task, UploadState.annotated)
+        return task
+
+    def create_batch(self, batch_name: str) -> str:
+        """
+        Create a batch for uploading images to Epigos AI
+        :param batch_name:
+        :return: batch ID
+        """
+        batch = self._client.make_post(**self._batch_request(batch_name))
+        return str(batch["id"])
+
+    def create_labels(self, names: typing.List[str]) -> typing.Dict[str, str]:
+        """
+        Creates annotation labels for the given names
+        :param names: Label names to create
+        :return:
+        """
+        labels = self._client.make_post(**self._labels_request(names))
+        labels_map = {label["name"]: label["id"] for label in labels}
+        self.labels.update(labels_map)
+        return labels_map
+
+    def presign(self, prepared: PreparedImage) -> typing.Dict[str, typing.Any]:
+        """
+        Requests a presigned storage url for the prepared image
+        :param prepared: Prepared image to upload
+        :return: Presigned upload details
+        """
+        return dict(self._client.make_post(**self._presign_request(prepared)))
+
+    def put(
+        self, prepared: PreparedImage, presigned: typing.Dict[str, typing.Any]
+    ) -> None:
+        """
+        Uploads the image content to the presigned storage url
+        over the pooled storage connections of the client
+        :param prepared: Prepared image to upload
+        :param presigned: Presigned upload details
+        :return:
+        """
+        with limited(self._client.storage_limiter) as slot:
+            if prepared.source is None:
+                upload_response = self._client.storage.put(
+                    presigned["uploadUrl"],
+                    content=prepared.content,
+                    headers=self._put_headers(prepared),
+                )
+            else:
+                with open(prepared.source, "rb") as fp:
+                    upload_response = self._client.storage.put(
+                        presigned["uploadUrl"],
+                        content=fp,
+                        headers=self._put_headers(prepared),
+                    )
+            slot.report(upload_response.status_code)
+        upload_response.raise_for_status()
+
+    def create_record(
+        self,
+        prepared: PreparedImage,
+        batch_id: str,
+        presigned: typing.Dict[str, typing.Any],
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Creates the dataset record for an image uploaded to storage
+        :param prepared: Prepared image that was uploaded
+        :param batch_id: ID of batch to upload to within project.
+        :param presigned: Presigned upload details
+        :return: Dataset record
+        """
+        record = self._client.make_post(
+            **self._record_request(prepared, batch_id, presigned)
+        )
+        return dict(record)
+
+    def annotate(
+        self,
+        record_id: str,
+        prepared: PreparedImage,
+        label_names: typing.Optional[typing.List[str]] = None,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> typing.List[typing.Any]:
+        """
+        Creates the annotations of a prepared image on its dataset record
+        :param record_id: ID of the dataset record
+        :param prepared: Prepared image containing the annotations
+        :param label_names: List of class names of annotations
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :return: Created annotations
+        """
+        if not prepared.annotations:
+            return []
+
+        annotations = self._prepare_annotations(
+            orig_image_size=prepared.orig_size,
+            resize_img_size=prepared.size,
+            annotations=prepared.annotations,
+        )
+        if not labels_map:
+            labels_map = self.labels.resolve(
+                self._label_names(prepared, label_names), self.create_labels
+            )
+
+        annotation_resp = self._client.make_post(
+            **self._annotation_request(record_id, annotations, labels_map)
+        )
+        return list(annotation_resp)
+
+
+class AsyncUploader(BaseUploader):
+    """
+    AsyncUploader uploads images and annotations to Epigos AI using the async client
+    """
+
+    def __init__(
+        self,
+        client: "AsyncEpigos",
+        project_id: str,
+        project_type: typings.ProjectType,
+        labels: typing.Optional[LabelRegistry] = None,
+    ) -> None:
+        super().__init__(project_id, project_type, labels=labels)
+        self._client = client
+
+    async def upload(
+        self,
+        batch_id: str,
+        image_path: typing.Union[str, Path],
+        annotation_path: typing.Optional[typing.Union[str, Path]] = None,
+        annotations: typing.Optional[
+            typing.Union[typing.List[Classification], typing.List[Detection]]
+        ] = None,
+        use_folder_as_class_name: bool = False,
+        box_format: BoxFormat = BoxFormat.pascal_voc,
+        label_names: typing.Optional[typing.List[str]] = None,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+        yolo_labels_map: typing.Optional[typing.Dict[int, str]] = None,
+        journal: typing.Optional[UploadJournal] = None,
+        executor: typing.Optional[Executor] = None,
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Upload an image and with or without annotation to the Epigos API.
+        :param image_path: Path or directory to images to upload
+        :param annotation_path: Path to annotation file to annotate the image
+        :param annotations: List of annotations to annotate the image.
+        :param batch_id: ID of batch to upload to within project.
+        :param use_folder_as_class_name: Use containing folder of image as class name.
+        Only used for classification projects.
+        :param box_format: Format of annotation to upload.
+        Defaults to `pascal_voc`
+        :param label_names: List of class names of annotations
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :param yolo_labels_map: Class ID to label name mapping for YOLO annotation
+        :param journal: Journal recording the upload progress. Steps already
+        completed for the image in the journal are skipped.
+        :param executor: Executor used to read, resize and encode the image.
+        :return:
+        """
+        task = self.start_task(batch_id, image_path, journal)
+        if task.done:
+            return task.record or {}
+
+        await self.prepare_task(
+            task,
+            annotation_path=annotation_path,
+            annotations=annotations,
+            use_folder_as_class_name=use_folder_as_class_name,
+            box_format=box_format,
+            yolo_labels_map=yolo_labels_map,
+            executor=executor,
+        )
+        await self.presign_task(task)
+        await self.put_task(task)
+        await self.record_task(task)
+        await self.annotate_task(task, label_names=label_names, labels_map=labels_map)
+        return task.record or {}
+
+    async def prepare_task(self, task: UploadTask, **kwargs: typing.Any) -> UploadTask:
+        """
+        Reads, resizes and encodes the image of an upload task off the event loop
+        :param task: Upload task
+        :param kwargs: Arguments passed to `prepare`
+        :return: UploadTask
+        """
+        if not task.done:
+            task.prepared = await asyncio.to_thread(
+                self.prepare, task.image_path, **kwargs
+            )
+        return task
+
+    async def presign_task(self, task: UploadTask) -> UploadTask:
+        """
+        Requests the presigned storage url of an upload task
+        :param task: Upload task
+        :return: UploadTask
+        """
+        if task.done or task.uploaded:
+            return task
+        task.entry.presigned = await self.presign(task.prepared_image)
+        self._journal_task(task, UploadState.presigned)
+        return task
+
+    async def put_task(self, task: UploadTask) -> UploadTask:
+        """
+        Uploads the image of an upload task to storage
+        :param task: Upload task
+        :return: UploadTask
+        """
+        if task.done or task.uploaded:
+            return task
+        await self.put(task.prepared_image, task.presigned_url)
+        self._journal_task(task, UploadState.uploaded)
+        return task
+
+    async def record_task(self, task: UploadTask) -> UploadTask:
+        """
+        Creates the dataset record of an upload task
+        :param task: Upload task
+        :return: UploadTask
+        """
+        if task.done or task.record is not None:
+            return task
+        task.entry.record = await self.create_record(
+            task.prepared_image, task.batch_id, task.presigned_url
+        )
+        self._journal_task(task, UploadState.recorded)
+        return task
+
+    async def annotate_task(
+        self,
+        task: UploadTask,
+        label_names: typing.Optional[typing.List[str]] = None,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> UploadTask:
+        """
+        Creates the annotations of an upload task
+        :param task: Upload task
+        :param label_names: List of class names of annotations
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :return: UploadTask
+        """
+        if task.done or task.record is None:
+            return task
+        task.record["annotations"] = await self.annotate(
+            task.record["id"],
+            task.prepared_image,
+            label_names=label_names,
+            labels_map=labels_map,
+        )
+        self._journal_task(task, UploadState.annotated)
+        return task
+
+    async def create_batch(self, batch_name: str) -> str:
+        """
+        Create a batch for uploading images to Epigos AI
+        :param batch_name:
+        :return: batch ID
+        """
+        batch = await self._client.make_post(**self._batch_request(batch_name))
+        return str(batch["id"])
+
+    async def create_labels(self, names: typing.List[str]) -> typing.Dict[str, str]:
+        """
+        Creates annotation labels for the given names
+        :param names: Label names to create
+        :return:
+        """
+        labels = await self._client.make_post(**self._labels_request(names))
+        labels_map = {label["name"]: label["id"] for label in labels}
+        self.labels.update(labels_map)
+        return labels_map
+
+    async def presign(self, prepared: PreparedImage) -> typing.Dict[str, typing.Any]:
+        """
+        Requests a presigned storage url for the prepared image
+        :param prepared: Prepared image to upload
+        :return: Presigned upload details
+        """
+        return dict(await self._client.make_post(**self._presign_request(prepared)))
+
+    async def put(
+        self, prepared: PreparedImage, presigned: typing.Dict[str, typing.Any]
+    ) -> None:
+        """
+        Uploads the image content to the presigned storage url
+        over the pooled storage connections of the client
+        :param prepared: Prepared image to upload
+        :param presigned: Presigned upload details
+        :return:
+        """
+        content: typing.Union[bytes, typing.AsyncIterator[bytes]] = prepared.content
+        if prepared.source is not None:
+            content = _aiter_file(prepared.source)
+
+        async with alimited(self._client.storage_limiter) as slot:
+            upload_response = await self._client.storage.put(
+                presigned["uploadUrl"],
+                content=content,
+                headers=self._put_headers(prepared),
+            )
+            slot.report(upload_response.status_code)
+        upload_response.raise_for_status()
+
+    async def create_record(
+        self,
+        prepared: PreparedImage,
+        batch_id: str,
+        presigned: typing.Dict[str, typing.Any],
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Creates the dataset record for an image uploaded to storage
+        :param prepared: Prepared image that was uploaded
+        :param batch_id: ID of batch to upload to within project.
+        :param presigned: Presigned upload details
+        :return: Dataset record
+        """
+        record = await self._client.make_post(
+            **self._record_request(prepared, batch_id, presigned)
+        )
+        return dict(record)
+
+    async def annotate(
+        self,
+        record_id: str,
+        prepared: PreparedImage,
+        label_names: typing.Optional[typing.List[str]] = None,
+        labels_map: typing.Optional[typing.Dict[str, str]] = None,
+    ) -> typing.List[typing.Any]:
+        """
+        Creates the annotations of a prepared image on its dataset record
+        :param record_id: ID of the dataset record
+        :param prepared: Prepared image containing the annotations
+        :param label_names: List of class names of annotations
+        :param labels_map: Class ID of label in Epigos AI to class name mapping.
+        :return: Created annotations
+        """
+        if not prepared.annotations:
+            return []
+
+        annotations = self._prepare_annotations(
+            orig_image_size=prepared.orig_size,
+            resize_img_size=prepared.size,
+            annotations=prepared.annotations,
+        )
+        if not labels_map:
+            labels_map = await self.labels.aresolve(
+                self._label_names(prepared, label_names), self.create_labels
+            )
+
+        annotation_resp = await self._client.make_post(
+            **self._annotation_request(record_id, annotations, labels_map)
+        )
+        return list(annotation_resp)
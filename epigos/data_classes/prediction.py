@@ -5,6 +5,8 @@ from PIL import Image
 
 from epigos.utils.image import b64_to_image
 
+PredictionT = typing.TypeVar("PredictionT")
+
 
 @dataclasses.dataclass
 class PredictedClass:
@@ -92,3 +94,27 @@ class ObjectDetection:
         :return: dicts
         """
         return dataclasses.asdict(self)
+
+
+@dataclasses.dataclass
+class BatchPrediction(typing.Generic[PredictionT]):
+    """
+    Batch Prediction.
+
+    Represents the outcome of one image in a batch prediction.
+    Exactly one of `prediction` and `error` is set.
+    `image` holds the input path or url, it is not set for image bytes.
+    """
+
+    index: int
+    image: typing.Optional[str] = None
+    prediction: typing.Optional[PredictionT] = None
+    error: typing.Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns true if the prediction succeeded
+        :return: bool
+        """
+        return self.error is None
@@ -0,0 +1,308 @@
+"""
+Streaming reader for large COCO annotation files.
+
+The top-level `images`, `categories` and `annotations` arrays are decoded one
+element at a time, so the whole document is never held in memory, and
+annotations are kept in compact integer arrays until they are requested.
+"""
+
+import array
+import json
+import re
+import typing
+from pathlib import Path
+
+from epigos.data_classes.dataset import Detection
+from epigos.dataset.utils import IMAGE_FILE_EXTENSIONS
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+COCO_SECTIONS = ("images", "categories", "annotations")
+_WHITESPACE = " \t\n\r"
+# characters that change the nesting of a value, and that end a string or a scalar
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[\s,\]}]")
+
+
+class _ValueScanner:
+    """
+    Finds the end of a JSON value by tracking its nesting and strings,
+    without decoding it. The value may arrive in several chunks.
+    """
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+
+    def _string_end(self, buf: str, i: int) -> int:
+        while True:
+            match = _STRING_SPECIAL.search(buf, i)
+            if match is None:
+                return len(buf)
+            i = match.start()
+            if buf[i] == '"':
+                self.in_string = False
+                return i + 1
+            if i + 1 == len(buf):
+                # the escaped character is in the next chunk
+                return i
+            i += 2
+
+    def _nesting_end(self, buf: str, i: int) -> int:
+        match = _STRUCTURAL.search(buf, i)
+        if match is None:
+            return len(buf)
+        char = match.group()
+        if char == '"':
+            self.in_string = True
+        elif char in "{[":
+            self.depth += 1
+        else:
+            self.depth -= 1
+        return match.end()
+
+    def scan(self, buf: str, i: int) -> typing.Tuple[int, bool]:
+        """
+        Scans the buffer from `i`
+        :param buf: Buffer containing the value
+        :param i: Position of the value, or to resume scanning from
+        :return: End of the value and true, or the position to resume from
+        and false if the value continues after the buffer
+        """
+        while i < len(buf):
+            if self.in_string:
+                i = self._string_end(buf, i)
+                if self.in_string:
+                    return i, False
+            elif self.depth == 0 and buf[i] not in '{["':
+                match = _SCALAR_END.search(buf, i)
+                if match is None:
+                    return len(buf), False
+                return match.start(), True
+            else:
+                i = self._nesting_end(buf, i)
+            if self.depth == 0 and not self.in_string:
+                return i, True
+        return i, False
+
+
+class _JsonStream:
+    """
+    Incremental decoder reading JSON values from a text file in chunks.
+    """
+
+    def __init__(self, fp: typing.TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # values spanning many chunks grow the reads, so the buffer is
+        # copied a logarithmic number of times
+        chunk = self._fp.read(max(self._chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Returns the next non-whitespace character without consuming it
+        """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str) -> None:
+        """
+        Consumes the next non-whitespace character, which must be `char`
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON document, found {found!r}")
+        self._pos += 1
+
+    def _value_end(self) -> int:
+        """
+        Reads until the next JSON value is in the buffer and returns its end
+        """
+        self.peek()
+        scanner = _ValueScanner()
+        i = self._pos
+        while True:
+            i, complete = scanner.scan(self._buf, i)
+            if complete:
+                return i
+            offset = i - self._pos
+            if not self._fill():
+                if scanner.depth == 0 and not scanner.in_string:
+                    # a scalar at the end of the document
+                    return len(self._buf)
+                raise ValueError("Unexpected end of JSON document")
+            i = self._pos + offset
+
+    def value(self) -> typing.Any:
+        """
+        Decodes the next JSON value
+        """
+        self._value_end()
+        obj, self._pos = self._decoder.raw_decode(self._buf, self._pos)
+        return obj
+
+    def skip(self) -> None:
+        """
+        Skips the next JSON value without decoding it
+        """
+        self._pos = self._value_end()
+
+
+def iter_json_arrays(
+    fp: typing.TextIO,
+    keys: typing.Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+    """
+    Iterate over the elements of arrays stored under the given keys
+    of a top-level JSON object, in file order, without loading the document.
+    Values of other keys are skipped.
+    :param fp: Text file containing a JSON object
+    :param keys: Keys of the arrays to iterate
+    :param chunk_size: Number of characters read at a time
+    :return: Iterator of (key, element) tuples
+    """
+    keys = set(keys)
+    stream = _JsonStream(fp, chunk_size=chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key in keys and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() != "]":
+                while True:
+                    yield key, stream.value()
+                    if stream.peek() != ",":
+                        break
+                    stream.expect(",")
+            stream.expect("]")
+        else:
+            stream.skip()
+
+        if stream.peek() != ",":
+            break
+        stream.expect(",")
+    stream.expect("}")
+
+
+class CocoAnnotationStore(typing.Mapping[str, typing.List[Detection]]):
+    """
+    Read-only mapping of image file name to COCO detections.
+
+    Annotations are stored in compact integer arrays grouped by image,
+    `Detection` objects are only created when an image is looked up.
+
+    :param categories: Category ID to label name mapping
+    :param file_names: Image file name to image ID mapping
+    :param annotations: Image ID to the indices of its annotations
+    :param category_ids: Category ID of every annotation
+    :param boxes: Flattened (x, y, width, height) of every annotation
+    """
+
+    def __init__(
+        self,
+        categories: typing.Dict[int, str],
+        file_names: typing.Dict[str, int],
+        annotations: typing.Dict[int, "array.array[int]"],
+        category_ids: "array.array[int]",
+        boxes: "array.array[int]",
+    ) -> None:
+        self._categories = categories
+        self._file_names = file_names
+        self._category_ids = category_ids
+        self._boxes = boxes
+        self._annotations = annotations
+
+    def __getitem__(self, file_name: str) -> typing.List[Detection]:
+        detections = []
+        for ann in self._annotations.get(self._file_names[file_name], ()):
+            category_id = self._category_ids[ann]
+            detections.append(
+                Detection(
+                    bbox=(
+                        self._boxes[ann * 4],
+                        self._boxes[ann * 4 + 1],
+                        self._boxes[ann * 4 + 2],
+                        self._boxes[ann * 4 + 3],
+                    ),
+                    class_name=self._categories[category_id],
+                    class_id=category_id,
+                )
+            )
+        return detections
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._file_names)
+
+    def __len__(self) -> int:
+        return len(self._file_names)
+
+
+def read_coco_directory_streaming(
+    images_directory_path: Path,
+    annotations_path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> typing.Tuple[typing.List[str], typing.Dict[str, Path], CocoAnnotationStore]:
+    """
+    Streaming counterpart of `read_coco_directory` for multi-GB COCO files.
+    :param images_directory_path: Path to directory containing images
+    :param annotations_path: Path to file containing annotations
+    :param chunk_size: Number of characters read at a time
+    :return: classes, images and lazily built annotations
+    """
+    categories: typing.Dict[int, str] = {}
+    image_paths: typing.Dict[int, Path] = {}
+    annotations: typing.Dict[int, "array.array[int]"] = {}
+    category_ids = array.array("q")
+    boxes = array.array("q")
+
+    with open(annotations_path, "r", encoding="utf-8") as fp:
+        for section, item in iter_json_arrays(fp, COCO_SECTIONS, chunk_size):
+            if section == "images":
+                if Path(item["file_name"]).suffix.lower() in IMAGE_FILE_EXTENSIONS:
+                    image_paths[item["id"]] = (
+                        images_directory_path / item["file_name"]
+                    ).resolve()
+            elif section == "categories":
+                categories[item["id"]] = item["name"]
+            elif item["bbox"]:
+                indices = annotations.get(item["image_id"])
+                if indices is None:
+                    indices = annotations[item["image_id"]] = array.array("q")
+                indices.append(len(category_ids))
+                category_ids.append(item["category_id"])
+                boxes.extend(int(v) for v in item["bbox"][:4])
+
+    images = {img_path.name: img_path for img_path in image_paths.values()}
+    file_names = {img_path.name: img_id for img_id, img_path in image_paths.items()}
+    store = CocoAnnotationStore(
+        categories=categories,
+        file_names=file_names,
+        annotations=annotations,
+        category_ids=category_ids,
+        boxes=boxes,
+    )
+    return sorted(categories.values()), images, store
@@ -7,7 +7,7 @@ from pathlib import Path
 
 from epigos import typings
 from epigos.data_classes.dataset import Classification, Detection
-from epigos.dataset import utils
+from epigos.dataset import coco, utils
 from epigos.typings import BoxFormat
 
 
@@ -38,6 +38,18 @@ class BaseDataset(abc.ABC):
     ]:
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def read_annotations(
+        self, image_name: str
+    ) -> typing.Union[typing.List[Classification], typing.List[Detection]]:
+        """
+        Returns the annotations of an image in the dataset.
+        For lazy datasets the annotation file is read on every call.
+        :param image_name: File name of the image
+        :return:
+        """
+        raise NotImplementedError()
+
 
 @dataclasses.dataclass
 class DetectionDataset(BaseDataset):
@@ -45,7 +57,7 @@ class DetectionDataset(BaseDataset):
     Dataclass containing information about object detection dataset
     """
 
-    annotations: typing.Dict[str, typing.List[Detection]]
+    annotations: typing.Mapping[str, typing.List[Detection]]
 
     def __iter__(self) -> typing.Iterator[typing.Tuple[Path, typing.List[Detection]]]:
         """
@@ -53,13 +65,18 @@ class DetectionDataset(BaseDataset):
         :return:
         """
         for image_name, image_path in self.images.items():
-            yield image_path, self.annotations.get(image_name, [])
+            yield image_path, self.read_annotations(image_name)
+
+    def read_annotations(self, image_name: str) -> typing.List[Detection]:
+        return self.annotations.get(image_name, [])
 
     @classmethod
     def from_pascal_voc(
         cls,
         images_directory_path: typing.Union[str, Path],
         annotations_directory_path: typing.Union[str, Path],
+        num_workers: int = 1,
+        lazy: bool = False,
     ) -> DetectionDataset:
         """
         Read directory containing Pascal VOC dataset
@@ -68,13 +85,19 @@ class DetectionDataset(BaseDataset):
 
         :param images_directory_path: Path to directory containing images
         :param annotations_directory_path: Path to directory containing annotations
+        :param num_workers: Number of threads used to parse annotation files.
+        :param lazy: If True, only image paths are read up front and annotation
+        files are parsed while iterating. Classes are left empty.
         :return:
         """
         images_directory_path = Path(images_directory_path)
         annotations_directory_path = Path(annotations_directory_path)
 
         classes, images, pascal_annotations = utils.read_pascal_voc_directory(
-            images_directory_path, annotations_directory_path
+            images_directory_path,
+            annotations_directory_path,
+            num_workers=num_workers,
+            lazy=lazy,
         )
         return cls(classes=classes, images=images, annotations=pascal_annotations)
 
@@ -83,6 +106,8 @@ class DetectionDataset(BaseDataset):
         cls,
         images_directory_path: typing.Union[str, Path],
         annotations_path: typing.Union[str, Path],
+        streaming: bool = False,
+        lazy: bool = False,
     ) -> DetectionDataset:
         """
         Read directory containing COCO dataset
@@ -91,14 +116,25 @@ class DetectionDataset(BaseDataset):
 
         :param images_directory_path: Path to directory containing images
         :param annotations_path: Path to file containing annotations
+        :param streaming: If True, the annotations file is read incrementally
+        and annotations are kept in compact form until iterated.
+        Use it for multi-GB annotation files.
+        :param lazy: If True, detections are only built while iterating.
+        Implies `streaming`.
         :return:
         """
         images_directory_path = Path(images_directory_path)
         annotations_path = Path(annotations_path)
 
-        classes, images, coco_annotations = utils.read_coco_directory(
-            images_directory_path, annotations_path
-        )
+        coco_annotations: typing.Mapping[str, typing.List[Detection]]
+        if streaming or lazy:
+            classes, images, coco_annotations = coco.read_coco_directory_streaming(
+                images_directory_path, annotations_path
+            )
+        else:
+            classes, images, coco_annotations = utils.read_coco_directory(
+                images_directory_path, annotations_path
+            )
         return cls(classes=classes, images=images, annotations=coco_annotations)
 
     @classmethod
@@ -107,6 +143,8 @@ class DetectionDataset(BaseDataset):
         images_directory_path: typing.Union[str, Path],
         annotations_directory_path: typing.Union[str, Path],
         data_yaml_path: typing.Union[str, Path],
+        num_workers: int = 1,
+        lazy: bool = False,
     ) -> DetectionDataset:
         """
         Read directory containing Pascal VOC dataset
@@ -116,6 +154,10 @@ class DetectionDataset(BaseDataset):
         :param images_directory_path: Path to directory containing images
         :param annotations_directory_path: Path to directory containing annotations
         :param data_yaml_path: Path to file containing YOLO data configuration
+        :param num_workers: Number of threads used to parse annotation files
+        and read image sizes.
+        :param lazy: If True, only image paths are read up front and annotation
+        files are parsed while iterating.
         :return:
         """
         images_directory_path = Path(images_directory_path)
@@ -123,7 +165,11 @@ class DetectionDataset(BaseDataset):
         data_yaml_path = Path(data_yaml_path)
 
         classes, images, yolo_annotations = utils.read_yolo_directory(
-            images_directory_path, annotations_directory_path, data_yaml_path
+            images_directory_path,
+            annotations_directory_path,
+            data_yaml_path,
+            num_workers=num_workers,
+            lazy=lazy,
         )
         return cls(classes=classes, images=images, annotations=yolo_annotations)
 
@@ -134,6 +180,8 @@ class DetectionDataset(BaseDataset):
         images_directory_path: typing.Union[str, Path],
         annotations_directory_path: typing.Union[str, Path],
         data_yaml_path: typing.Union[str, Path],
+        num_workers: int = 1,
+        lazy: bool = False,
     ) -> DetectionDataset:
         """
         Reads dataset directory with annotations for a given annotations format
@@ -141,20 +189,32 @@ class DetectionDataset(BaseDataset):
         :param images_directory_path:
         :param annotations_directory_path:
         :param data_yaml_path:
+        :param num_workers: Number of threads used to parse annotation files.
+        Ignored for COCO datasets.
+        :param lazy: If True, annotations are parsed while iterating.
         :return:
         """
         if box_format == BoxFormat.coco:
             return cls.from_coco(
-                images_directory_path, annotations_path=annotations_directory_path
+                images_directory_path,
+                annotations_path=annotations_directory_path,
+                lazy=lazy,
             )
 
         if box_format == BoxFormat.pascal_voc:
             return cls.from_pascal_voc(
-                images_directory_path, annotations_directory_path
+                images_directory_path,
+                annotations_directory_path,
+                num_workers=num_workers,
+                lazy=lazy,
             )
 
         return cls.from_yolo(
-            images_directory_path, annotations_directory_path, data_yaml_path
+            images_directory_path,
+            annotations_directory_path,
+            data_yaml_path,
+            num_workers=num_workers,
+            lazy=lazy,
         )
 
 
@@ -174,19 +234,25 @@ class ClassificationDataset(BaseDataset):
         :return:
         """
         for image_name, image_path in self.images.items():
-            yield image_path, self.annotations.get(image_name, [])
+            yield image_path, self.read_annotations(image_name)
+
+    def read_annotations(self, image_name: str) -> typing.List[Classification]:
+        return self.annotations.get(image_name, [])
 
     @classmethod
     def from_folder(
-        cls, images_directory_path: typing.Union[str, Path]
+        cls, images_directory_path: typing.Union[str, Path], num_workers: int = 1
     ) -> ClassificationDataset:
         """
         Read directory image classification dataset and return
         dictionary of image paths and the class name.
         :param images_directory_path:
+        :param num_workers: Number of threads scanning the class directories.
         :return:
         """
         images_directory_path = Path(images_directory_path)
 
-        classes, images, annotations_ = utils.read_image_folder(images_directory_path)
+        classes, images, annotations_ = utils.read_image_folder(
+            images_directory_path, num_workers=num_workers
+        )
         return cls(classes=classes, images=images, annotations=annotations_)
@@ -1,6 +1,8 @@
 import collections
+import dataclasses
 import json
 import os
+import threading
 import typing
 import xml.etree.ElementTree as ET
 from pathlib import Path
@@ -10,9 +12,13 @@ import yaml
 from pybboxes import BoundingBox
 
 from epigos.data_classes.dataset import Classification, Detection
+from epigos.utils.concurrency import bounded_map
 
 IMAGE_FILE_EXTENSIONS = (".jpg", ".jpeg", ".png")
 
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
 
 def _extract_bbox_from_element(
     bb: ET.Element,
@@ -44,12 +50,98 @@ def _extract_size_from_element(
     return imgs_size[0], imgs_size[1]
 
 
-def _read_images_with_extensions(
-    directory: typing.Union[str, Path], extensions: typing.List[str]
+def _map_files(
+    fn: typing.Callable[[T], R], items: typing.Iterable[T], num_workers: int
+) -> typing.List[R]:
+    """
+    Apply `fn` to every item, on a thread pool when `num_workers` > 1.
+    Results are returned in input order.
+    """
+    if num_workers <= 1:
+        return [fn(item) for item in items]
+    return list(bounded_map(fn, items, max_workers=num_workers, window=num_workers * 4))
+
+
+class LazyAnnotations(typing.Mapping[str, typing.List[Detection]]):
+    """
+    Read-only mapping of image file name to detections
+    that reads the annotation file of an image each time it is looked up.
+
+    :param images: Image file name to image path mapping
+    :param reader: Function reading the annotations of an image path
+    """
+
+    def __init__(
+        self,
+        images: typing.Dict[str, Path],
+        reader: typing.Callable[[Path], typing.List[Detection]],
+    ) -> None:
+        self._images = images
+        self._reader = reader
+
+    def __getitem__(self, image_name: str) -> typing.List[Detection]:
+        return self._reader(self._images[image_name])
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._images)
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+
+def _scan_tree(
+    directory: Path, extensions: typing.Tuple[str, ...]
+) -> typing.Tuple[typing.List[Path], typing.List[Path]]:
+    """
+    List a directory once and return its image files and its subdirectories,
+    both sorted by name.
+    """
+    files: typing.List[Path] = []
+    subdirs: typing.List[Path] = []
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda e: e.name)
+
+    for entry in entries:
+        # symlinked directories are not followed, like `Path.glob("**")`,
+        # so links pointing back up the tree cannot loop
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(directory / entry.name)
+        elif os.path.splitext(entry.name)[1].lower() in extensions:
+            files.append(directory / entry.name)
+    return files, subdirs
+
+
+def _walk_images(
+    directory: Path, extensions: typing.Tuple[str, ...]
+) -> typing.List[Path]:
+    files, subdirs = _scan_tree(directory, extensions)
+    for subdir in subdirs:
+        files.extend(_walk_images(subdir, extensions))
+    return files
+
+
+def scan_images(
+    directory: typing.Union[str, Path],
+    extensions: typing.Iterable[str] = IMAGE_FILE_EXTENSIONS,
+    num_workers: int = 1,
 ) -> typing.Dict[str, Path]:
-    directory = Path(directory)
-    imgs_paths = {p.name: p for ext in extensions for p in directory.glob(f"**/*{ext}")}
-    return imgs_paths
+    """
+    Recursively find image files in a directory in a single pass.
+    Extensions are matched case-insensitively and files are returned
+    in sorted directory order.
+    :param directory: Directory to scan
+    :param extensions: File extensions of images to include
+    :param num_workers: Number of threads walking the top-level
+    subdirectories. Defaults to 1.
+    :return: Image file name to image path mapping
+    """
+    exts = tuple(ext.lower() for ext in extensions)
+    files, subdirs = _scan_tree(Path(directory), exts)
+    for subdir_files in _map_files(
+        lambda subdir: _walk_images(subdir, exts), subdirs, num_workers
+    ):
+        files.extend(subdir_files)
+    return {p.name: p for p in files}
 
 
 def read_pascal_voc_to_coco(
@@ -189,6 +281,7 @@ def read_coco_file(file_name: Path) -> typing.Any:
 
 def read_image_folder(
     root_directory_path: Path,
+    num_workers: int = 1,
 ) -> typing.Tuple[
     typing.List[str],
     typing.Dict[str, Path],
@@ -198,11 +291,11 @@ def read_image_folder(
     Read directory image classification dataset and return
     dictionary of image paths and the class name.
     :param root_directory_path:
+    :param num_workers: Number of threads scanning the class directories.
+    Defaults to 1.
     :return:
     """
-    images = _read_images_with_extensions(
-        root_directory_path, extensions=list(IMAGE_FILE_EXTENSIONS)
-    )
+    images = scan_images(root_directory_path, num_workers=num_workers)
     annotations = {
         p.name: [Classification(class_name=p.parent.name)] for p in images.values()
     }
@@ -218,9 +311,15 @@ def _get_image_size(img_path: Path) -> typing.Tuple[int, int]:
 
 
 def read_yolo_directory(
-    images_directory_path: Path, annotations_directory_path: Path, data_yaml_path: Path
+    images_directory_path: Path,
+    annotations_directory_path: Path,
+    data_yaml_path: Path,
+    num_workers: int = 1,
+    lazy: bool = False,
 ) -> typing.Tuple[
-    typing.List[str], typing.Dict[str, Path], typing.Dict[str, typing.List[Detection]]
+    typing.List[str],
+    typing.Dict[str, Path],
+    typing.Mapping[str, typing.List[Detection]],
 ]:
     """
     Read directory containing YOLO dataset and return dictionary of image paths
@@ -228,6 +327,10 @@ def read_yolo_directory(
     :param images_directory_path:
     :param annotations_directory_path:
     :param data_yaml_path:
+    :param num_workers: Number of threads used to scan the images directory,
+    read annotation files and image sizes. Defaults to 1.
+    :param lazy: If True, annotation files are only read
+    when the annotations of an image are looked up.
     :return:
     """
     yolo_config = read_yolo_config(data_yaml_path)
@@ -239,26 +342,34 @@ def read_yolo_directory(
     elif isinstance(yolo_names, dict):
         idx_to_label = yolo_names
 
-    images = _read_images_with_extensions(
-        images_directory_path, extensions=list(IMAGE_FILE_EXTENSIONS)
-    )
-    yolo_annotations = {
-        p.name: read_yolo_to_coco(
+    images = scan_images(images_directory_path, num_workers=num_workers)
+
+    def _read(p: Path) -> typing.List[Detection]:
+        return read_yolo_to_coco(
             (annotations_directory_path / f"{p.stem}.txt").resolve(),
             _get_image_size(p),
             idx_to_label,
         )
-        for p in images.values()
-    }
+
     classes = list(sorted(list(idx_to_label.values())))
+    if lazy:
+        return classes, images, LazyAnnotations(images, _read)
+
+    yolo_annotations = dict(
+        zip(images.keys(), _map_files(_read, images.values(), num_workers))
+    )
     return classes, images, yolo_annotations
 
 
 def read_pascal_voc_directory(
     images_directory_path: Path,
     annotations_directory_path: Path,
+    num_workers: int = 1,
+    lazy: bool = False,
 ) -> typing.Tuple[
-    typing.List[str], typing.Dict[str, Path], typing.Dict[str, typing.List[Detection]]
+    typing.List[str],
+    typing.Dict[str, Path],
+    typing.Mapping[str, typing.List[Detection]],
 ]:
     """
     Read directory containing Pascal VOC dataset
@@ -267,18 +378,26 @@ def read_pascal_voc_directory(
 
     :param images_directory_path: Path to directory containing images
     :param annotations_directory_path: Path to directory containing annotations
+    :param num_workers: Number of threads used to scan the images directory
+    and read annotation files. Defaults to 1.
+    :param lazy: If True, annotation files are only read
+    when the annotations of an image are looked up.
+    Classes are then unknown until the annotations are read and returned empty.
     :return:
     """
-    images = _read_images_with_extensions(
-        images_directory_path, extensions=list(IMAGE_FILE_EXTENSIONS)
-    )
+    images = scan_images(images_directory_path, num_workers=num_workers)
 
-    pascal_annotations = {
-        p.name: read_pascal_voc_to_coco(
+    def _read(p: Path) -> typing.List[Detection]:
+        return read_pascal_voc_to_coco(
             (annotations_directory_path / f"{p.stem}.xml").resolve()
         )
-        for p in images.values()
-    }
+
+    if lazy:
+        return [], images, LazyAnnotations(images, _read)
+
+    pascal_annotations = dict(
+        zip(images.keys(), _map_files(_read, images.values(), num_workers))
+    )
 
     classes = {
         d.class_name for detections in pascal_annotations.values() for d in detections
@@ -286,53 +405,113 @@ def read_pascal_voc_directory(
     return list(sorted(classes)), images, pascal_annotations
 
 
-def read_single_coco_annotation(
-    image_name: str, annotations_path: typing.Union[str, Path]
-) -> typing.List[Detection]:
+@dataclasses.dataclass
+class CocoIndex:
     """
-    Read a COCO file contaning annotations for a single image.
-    :param image_name:
-    :param annotations_path:
-    :type annotations_path:
-    :return:
-    :rtype:
+    Dataclass containing parsed COCO annotations indexed by image file name
     """
-    dataset = read_coco_file(Path(annotations_path))
-    label_to_idx = {
-        label["name"]: label["id"] for label in dataset.get("categories") or []
-    }
-    idx_to_label = {v: k for k, v in label_to_idx.items()}
 
+    categories: typing.Dict[int, str]
+    annotations: typing.Dict[str, typing.List[Detection]]
+
+
+def _coco_detection(
+    ann: typing.Dict[str, typing.Any], idx_to_label: typing.Dict[int, str]
+) -> Detection:
+    return Detection(
+        bbox=(
+            int(ann["bbox"][0]),
+            int(ann["bbox"][1]),
+            int(ann["bbox"][2]),
+            int(ann["bbox"][3]),
+        ),
+        class_name=idx_to_label[ann["category_id"]],
+        class_id=ann["category_id"],
+    )
+
+
+def build_coco_index(dataset: typing.Dict[str, typing.Any]) -> CocoIndex:
+    """
+    Index a COCO dataset by image file name.
+    :param dataset: Parsed COCO annotations file
+    :return: CocoIndex
+    """
+    idx_to_label = {
+        label["id"]: label["name"] for label in dataset.get("categories") or []
+    }
     filename_to_img_id = {
         img["file_name"]: img["id"] for img in dataset.get("images") or []
     }
 
-    output: typing.List[Detection] = []
-
-    img_id = filename_to_img_id.get(image_name)
-    if img_id is None:
-        return output
-
+    image_id_to_annotations = collections.defaultdict(list)
     for ann in dataset.get("annotations") or []:
         if not ann["bbox"]:
             continue
-        if ann["image_id"] != img_id:
-            continue
-
-        label_name = idx_to_label[ann["category_id"]]
-        output.append(
-            Detection(
-                bbox=(
-                    int(ann["bbox"][0]),
-                    int(ann["bbox"][1]),
-                    int(ann["bbox"][2]),
-                    int(ann["bbox"][3]),
-                ),
-                class_name=label_name,
-                class_id=ann["category_id"],
-            )
+        image_id_to_annotations[ann["image_id"]].append(
+            _coco_detection(ann, idx_to_label)
         )
-    return output
+
+    return CocoIndex(
+        categories=idx_to_label,
+        annotations={
+            file_name: image_id_to_annotations.get(img_id, [])
+            for file_name, img_id in filename_to_img_id.items()
+        },
+    )
+
+
+_COCO_INDEX_CACHE: collections.OrderedDict[
+    str, typing.Tuple[typing.Tuple[int, int], CocoIndex]
+] = collections.OrderedDict()
+_COCO_INDEX_LOCK = threading.Lock()
+COCO_INDEX_CACHE_SIZE = 4
+
+
+def load_coco_index(annotations_path: typing.Union[str, Path]) -> CocoIndex:
+    """
+    Returns the index of a COCO annotations file.
+    Indexes are cached per file and rebuilt when the file modification time
+    or size changes, so repeated lookups do not re-read the file.
+    :param annotations_path: Path to COCO annotations file
+    :return: CocoIndex
+    """
+    key = str(Path(annotations_path).resolve())
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _COCO_INDEX_LOCK:
+        cached = _COCO_INDEX_CACHE.get(key)
+        if cached and cached[0] == signature:
+            _COCO_INDEX_CACHE.move_to_end(key)
+            return cached[1]
+
+        index = build_coco_index(read_coco_file(Path(key)))
+        _COCO_INDEX_CACHE[key] = (signature, index)
+        while len(_COCO_INDEX_CACHE) > COCO_INDEX_CACHE_SIZE:
+            _COCO_INDEX_CACHE.popitem(last=False)
+        return index
+
+
+def clear_coco_index_cache() -> None:
+    """
+    Drop all cached COCO indexes
+    """
+    with _COCO_INDEX_LOCK:
+        _COCO_INDEX_CACHE.clear()
+
+
+def read_single_coco_annotation(
+    image_name: str, annotations_path: typing.Union[str, Path]
+) -> typing.List[Detection]:
+    """
+    Read the annotations of a single image from a COCO file.
+    The parsed file is cached, see `load_coco_index`.
+    :param image_name: File name of the image
+    :param annotations_path: Path to COCO annotations file
+    :return: List of detections of the image
+    """
+    index = load_coco_index(annotations_path)
+    return list(index.annotations.get(image_name, []))
 
 
 def read_coco_directory(
@@ -365,18 +544,8 @@ def read_coco_directory(
     for ann in dataset.get("annotations") or []:
         if not ann["bbox"]:
             continue
-        label_name = idx_to_label[ann["category_id"]]
         image_id_to_annotations[ann["image_id"]].append(
-            Detection(
-                bbox=(
-                    int(ann["bbox"][0]),
-                    int(ann["bbox"][1]),
-                    int(ann["bbox"][2]),
-                    int(ann["bbox"][3]),
-                ),
-                class_name=label_name,
-                class_id=ann["category_id"],
-            )
+            _coco_detection(ann, idx_to_label)
         )
 
     images = {img_path.name: img_path for img_path in imgs_paths.values()}
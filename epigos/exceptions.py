@@ -10,6 +10,8 @@ class EpigosException(Exception):
     :param message: response status message received from api
     :param details: response error details.
     :param status_code: HTTP status code received from request.
+    :param retry_after: Seconds to wait before retrying,
+    if the response had a `Retry-After` header.
     """
 
     def __init__(
@@ -17,6 +19,7 @@ class EpigosException(Exception):
         message: typing.Optional[typing.Any],
         details: typing.Optional[typing.Any],
         status_code: int,
+        retry_after: typing.Optional[float] = None,
     ) -> None:
         super().__init__(
             f"Error Reason: {message} \n Error Details: {details} "
@@ -24,3 +27,4 @@ class EpigosException(Exception):
         )
         self.status_code = status_code
         self.details = details
+        self.retry_after = retry_after
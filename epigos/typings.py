@@ -1,8 +1,35 @@
 from __future__ import annotations
 
 import enum
+import os
 import typing
 
+if typing.TYPE_CHECKING:
+    from PIL import Image
+
+
+class SupportsArrayInterface(typing.Protocol):
+    """
+    Array exposing the NumPy array interface, e.g. a `numpy.ndarray`
+    """
+
+    @property
+    def __array_interface__(self) -> typing.Dict[str, typing.Any]: ...
+
+
+ImageSource = typing.Union[
+    str,
+    "os.PathLike[str]",
+    bytes,
+    typing.BinaryIO,
+    "Image.Image",
+    SupportsArrayInterface,
+]
+"""
+Image accepted for predictions: a local path, a remote url, encoded image bytes,
+a binary file object, a PIL image or a HxWxC uint8 array.
+"""
+
 
 class ProjectType(str, enum.Enum):
     """
@@ -15,6 +42,30 @@ class ProjectType(str, enum.Enum):
     classification = "classification"
 
 
+class UrlValidation(str, enum.Enum):
+    """
+    Url validation
+
+    Enums for how image urls are checked before predictions
+    """
+
+    off = "off"
+    cached = "cached"
+    pooled = "pooled"
+
+
+class PredictTransport(str, enum.Enum):
+    """
+    Predict transport
+
+    Enums for how images are sent for predictions
+    """
+
+    json = "json"
+    multipart = "multipart"
+    auto = "auto"
+
+
 class ModelType(str, enum.Enum):
     """
     Model type.
@@ -52,6 +103,76 @@ class DetectOptions(typing.TypedDict, total=False):
     show_prob: bool
 
 
+class StorageOptions(typing.TypedDict, total=False):
+    """
+    StorageOptions options used to configure the connection pool
+    for uploads to presigned storage urls.
+
+    :param max_connections: Maximum number of open connections.
+        Defaults to 100.
+    :param max_keepalive_connections: Maximum number of idle connections
+        kept alive for reuse. Defaults to 20.
+    :param keepalive_expiry: Seconds an idle connection is kept alive.
+        Defaults to 30 seconds.
+    :param http2: If True, HTTP/2 is used when the storage server supports it.
+        Requires the `h2` package (`pip install httpx[http2]`).
+    :param timeout: Storage request timeout in seconds. Defaults to 60 seconds.
+    """
+
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    http2: bool
+    timeout: float
+
+
+class ConcurrencyOptions(typing.TypedDict, total=False):
+    """
+    ConcurrencyOptions options used to configure the adaptive concurrency
+    limits of requests to the API and to storage.
+
+    :param initial_limit: Number of requests allowed in flight at start.
+        Defaults to 4.
+    :param min_limit: Lowest number of requests allowed in flight. Defaults to 1.
+    :param max_limit: Highest number of requests allowed in flight.
+        Dataset uploads, syncs and batch predictions run this many requests
+        at a time, or `num_workers` if it is higher. Defaults to 64.
+    :param backoff: Factor the limit is multiplied by when requests are
+        rejected with 429 or 5xx or fail. Defaults to 0.5.
+    :param latency_tolerance: Requests slower than this multiple of the average
+        latency also reduce the limit. Defaults to 2.
+    """
+
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    backoff: float
+    latency_tolerance: float
+
+
+class RetryOptions(typing.TypedDict, total=False):
+    """
+    RetryOptions options used to configure how failed API requests are retried.
+
+    :param attempts: Maximum number of attempts.
+        Defaults to the `retries` of the client.
+    :param status_codes: Response status codes that are retried.
+        Defaults to 429, 502, 503 and 504.
+    :param max_wait: Maximum seconds to wait between attempts. Defaults to 15.
+    :param honor_retry_after: If True, the `Retry-After` header of a response
+        sets the wait before the next attempt, and requests asked to wait longer
+        than `max_wait` are not retried. Defaults to True.
+    :param budget: If True, retries are taken from the retry budget
+        of the client. Defaults to True.
+    """
+
+    attempts: int
+    status_codes: typing.Sequence[int]
+    max_wait: float
+    honor_retry_after: bool
+    budget: bool
+
+
 class BoxFormat(str, enum.Enum):
     """
     Bounding Box format
@@ -62,3 +183,66 @@ class BoxFormat(str, enum.Enum):
     pascal_voc = "pascal_voc"
     yolo = "yolo"
     coco = "coco"
+
+
+class PipelineOptions(typing.TypedDict, total=False):
+    """
+    PipelineOptions options used to size the stages of a pipelined dataset upload.
+    Each stage defaults to the number of upload workers.
+
+    :param preprocess: Number of threads reading, resizing and encoding images.
+    :param presign: Number of threads requesting presigned storage urls.
+    :param put: Number of threads uploading images to storage.
+    :param record: Number of threads creating dataset records.
+    :param annotate: Number of threads creating annotations.
+    :param queue_size: Maximum number of images waiting at each stage.
+        Defaults to twice the number of threads of the stage.
+    """
+
+    preprocess: int
+    presign: int
+    put: int
+    record: int
+    annotate: int
+    queue_size: int
+
+
+class UploadOptions(typing.TypedDict, total=False):
+    """
+    UploadOptions options used to tune dataset uploads.
+
+    :param max_in_flight: Maximum number of images read from the dataset
+        and waiting to be uploaded. Defaults to twice the number of workers.
+        With the async client, it is the number of concurrent uploads
+        and defaults to the number of workers.
+    :param ordered: If True, upload results are yielded in dataset order.
+        Set to False to yield results as soon as each upload completes,
+        so one slow upload does not hold back the others.
+    :param journal_path: Path to a journal file recording the upload progress.
+        Re-running an upload with the same journal skips completed images
+        and resumes partially uploaded ones.
+    :param lazy: If True, object detection annotations are parsed while uploading
+        instead of before the first upload starts.
+        Pascal VOC labels are then created from the annotations of each image.
+    :param pipeline: If set, each image goes through separate preprocess,
+        presign, storage upload, record and annotate stages
+        sized by these options, instead of one worker running all steps.
+        Only used by the sync client.
+    :param process_workers: If set, images are read, resized and encoded
+        in a pool of this many processes, so preprocessing scales across cores.
+        Network calls stay on threads.
+    :param dedup: If True, images are hashed before upload and images
+        with the same contents as an earlier image of the run are skipped.
+    :param dedup_path: Path to a manifest file of the image hashes uploaded
+        to the project. Images uploaded in previous runs are skipped too.
+        Implies `dedup`.
+    """
+
+    max_in_flight: typing.Optional[int]
+    ordered: bool
+    journal_path: typing.Optional[typing.Union[str, "os.PathLike[str]"]]
+    lazy: bool
+    pipeline: typing.Optional[PipelineOptions]
+    process_workers: typing.Optional[int]
+    dedup: bool
+    dedup_path: typing.Optional[typing.Union[str, "os.PathLike[str]"]]
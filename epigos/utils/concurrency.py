@@ -0,0 +1,147 @@
+import asyncio
+import collections
+import os
+import typing
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+
+def bounded_map(
+    fn: typing.Callable[[T], R],
+    items: typing.Iterable[T],
+    max_workers: int,
+    window: typing.Optional[int] = None,
+    ordered: bool = True,
+) -> typing.Iterator[R]:
+    """
+    Apply `fn` to every item on a thread pool and yield the results.
+    Unlike `ThreadPoolExecutor.map`, items are only pulled from the iterable
+    while fewer than `window` calls are pending, so memory stays bounded.
+    :param fn: Function to apply to each item
+    :param items: Items to process
+    :param max_workers: Number of threads to use
+    :param window: Maximum number of pending calls. Defaults to `max_workers`.
+    :param ordered: If True, results are yielded in input order,
+    otherwise as soon as each call completes.
+    :return: Iterator of results
+    """
+    window = max(window or max_workers, 1)
+    pending: typing.Deque[Future[R]] = collections.deque()
+
+    def _drain(until: int) -> typing.Iterator[R]:
+        while len(pending) > until:
+            if ordered:
+                yield pending.popleft().result()
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in [f for f in pending if f in done]:
+                pending.remove(future)
+                yield future.result()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in items:
+                pending.append(executor.submit(fn, item))
+                yield from _drain(window - 1)
+
+            yield from _drain(0)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def start_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool and wait until its worker processes are running.
+    Call it before starting threads, so forked workers do not inherit
+    locks held by other threads.
+    :param max_workers: Number of worker processes
+    :return: ProcessPoolExecutor
+    """
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    executor.submit(os.getpid).result()
+    return executor
+
+
+def pipeline_map(
+    items: typing.Iterable[typing.Any],
+    stages: typing.Sequence[
+        typing.Tuple[typing.Callable[[typing.Any], typing.Any], int]
+    ],
+    window: typing.Optional[int] = None,
+    ordered: bool = True,
+) -> typing.Iterator[typing.Any]:
+    """
+    Pass every item through a chain of stages and yield the results of the last one.
+    Each stage runs on its own thread pool with its own number of workers,
+    so stages with different bottlenecks overlap. Items are only handed
+    to a stage while fewer than `window` of its calls are pending.
+    :param items: Items to process
+    :param stages: Sequence of (function, number of workers) of each stage
+    :param window: Maximum number of pending calls per stage.
+    Defaults to twice the number of workers of the stage.
+    :param ordered: If True, results are yielded in input order,
+    otherwise as soon as each item completes the last stage.
+    :return: Iterator of results
+    """
+    results: typing.Iterator[typing.Any] = iter(items)
+    for fn, workers in stages:
+        results = bounded_map(
+            fn,
+            results,
+            max_workers=max(workers, 1),
+            window=window or max(workers, 1) * 2,
+            ordered=ordered,
+        )
+    return results
+
+
+async def abounded_map(
+    fn: typing.Callable[[T], typing.Awaitable[R]],
+    items: typing.Iterable[T],
+    limit: int,
+    ordered: bool = True,
+) -> typing.AsyncIterator[R]:
+    """
+    Await `fn` for every item with at most `limit` calls in flight
+    and yield the results.
+    :param fn: Coroutine function to apply to each item
+    :param items: Items to process
+    :param limit: Maximum number of calls in flight
+    :param ordered: If True, results are yielded in input order,
+    otherwise as soon as each call completes.
+    :return: Async iterator of results
+    """
+    limit = max(limit, 1)
+    pending: typing.Deque[asyncio.Future[R]] = collections.deque()
+
+    async def _next() -> typing.List[R]:
+        if ordered:
+            return [await pending.popleft()]
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        completed = [f for f in pending if f in done]
+        for future in completed:
+            pending.remove(future)
+        return [f.result() for f in completed]
+
+    try:
+        for item in items:
+            pending.append(asyncio.ensure_future(fn(item)))
+            while len(pending) >= limit:
+                for result in await _next():
+                    yield result
+
+        while pending:
+            for result in await _next():
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
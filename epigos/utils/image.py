@@ -1,12 +1,19 @@
 import base64
+import collections
 import io
 import os
+import threading
+import time
+import typing
 import urllib.parse
 
 import httpx
 from PIL import Image
 
+from epigos import typings
+
 ACCEPTED_IMAGE_FORMATS = ["PNG", "JPEG"]
+JPEG_MAGIC = b"\xff\xd8\xff"
 
 
 def is_path(file_path: str) -> bool:
@@ -18,19 +25,89 @@ def is_path(file_path: str) -> bool:
     return os.path.exists(file_path)
 
 
-def is_url(url: str) -> bool:
+def has_url_scheme(url: str) -> bool:
+    """
+    Check whether a path is a http(s) url, without requesting it
+    :param url: URL of image
+    :returns: Boolean
+    """
+    return urllib.parse.urlparse(url).scheme in ("http", "https")
+
+
+def is_url(url: str, client: typing.Optional[httpx.Client] = None) -> bool:
     """
     Check whether a hosted image path is valid
     :param url: URL of image
+    :param client: Client to send the request with, so its connections are reused.
     :returns: Boolean
     """
-    if urllib.parse.urlparse(url).scheme not in ("http", "https"):
+    if not has_url_scheme(url):
         return False
 
-    resp = httpx.head(url, follow_redirects=True)
+    if client is None:
+        resp = httpx.head(url, follow_redirects=True)
+    else:
+        resp = client.head(url, follow_redirects=True)
     return resp.is_success
 
 
+async def ais_url(url: str, client: httpx.AsyncClient) -> bool:
+    """
+    Async counterpart of `is_url`
+    :param url: URL of image
+    :param client: Client to send the request with
+    :returns: Boolean
+    """
+    if not has_url_scheme(url):
+        return False
+
+    resp = await client.head(url, follow_redirects=True)
+    return resp.is_success
+
+
+class UrlCache:
+    """
+    Least recently used set of validated image urls, so repeated
+    predictions of the same url do not check it again.
+
+    :param max_entries: Maximum number of urls remembered.
+    :param ttl: Seconds a url stays validated.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._urls: typing.OrderedDict[str, float] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        with self._lock:
+            validated = self._urls.get(url)
+            if validated is None:
+                return False
+            if time.monotonic() - validated > self.ttl:
+                del self._urls[url]
+                return False
+            self._urls.move_to_end(url)
+            return True
+
+    def add(self, url: str) -> None:
+        """
+        Remembers a validated url
+        :param url: URL of image
+        """
+        with self._lock:
+            self._urls[url] = time.monotonic()
+            self._urls.move_to_end(url)
+            while len(self._urls) > self.max_entries:
+                self._urls.popitem(last=False)
+
+
 def check_image_path(image_path: str) -> bool:
     """
     Check whether a local OR remote image path is valid
@@ -40,21 +117,108 @@ def check_image_path(image_path: str) -> bool:
     return is_path(image_path) or is_url(image_path)
 
 
-def image_to_b64(image_path: str) -> str:
+def is_jpeg(content: bytes) -> bool:
+    """
+    Check whether encoded image bytes are a JPEG image
+    :param content: encoded image bytes
+    :return: Boolean
+    """
+    return content.startswith(JPEG_MAGIC)
+
+
+def encode_image(image: Image.Image) -> bytes:
+    """
+    Encode Pil.Image as JPEG
+    :param image: Pil.Image
+    :return: encoded image bytes
+    """
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, quality=90, format="JPEG")
+    return buffer.getvalue()
+
+
+def load_image(
+    image: typings.ImageSource,
+) -> typing.Union[str, bytes]:
+    """
+    Convert an in-memory image to encoded image bytes.
+    Paths and urls are returned as strings, encoded bytes are returned unchanged.
+    :param image: local path, url, encoded image bytes, binary file object,
+    Pil.Image or HxWxC uint8 array
+    :return: path, url or encoded image bytes
     """
-    Convert local image file to base64 encoded string
-    :param image_path: local path to image
+    if isinstance(image, (str, os.PathLike)):
+        return os.fspath(image)
+    if isinstance(image, bytes):
+        return image
+    if isinstance(image, Image.Image):
+        return encode_image(image)
+    if hasattr(image, "__array_interface__"):
+        try:
+            array_image = Image.fromarray(image)
+        except TypeError as exc:
+            raise ValueError(
+                f"Unsupported image array, expected HxWxC uint8: {exc}"
+            ) from exc
+        return encode_image(array_image)
+    if hasattr(image, "read"):
+        content = image.read()
+        if not isinstance(content, bytes):
+            raise ValueError("Image file objects must be opened in binary mode")
+        return content
+    raise ValueError(f"Unsupported image type {type(image).__name__}")
+
+
+def image_to_jpeg(image_path: typing.Union[str, bytes]) -> bytes:
+    """
+    Convert local image file or encoded image bytes to JPEG bytes.
+    JPEG bytes are returned as they are, other images are encoded as JPEG.
+    :param image_path: local path to image or encoded image bytes
+    :return: encoded image bytes
+    """
+    if isinstance(image_path, bytes) and is_jpeg(image_path):
+        return image_path
+    source = io.BytesIO(image_path) if isinstance(image_path, bytes) else image_path
+    with Image.open(source) as im:
+        return encode_image(im)
+
+
+def image_to_b64(image_path: typing.Union[str, bytes]) -> str:
+    """
+    Convert local image file or encoded image bytes to base64 encoded string.
+    JPEG bytes are sent as they are, other images are encoded as JPEG.
+    :param image_path: local path to image or encoded image bytes
     :return: base64 encoded string
     """
-    # open Image in RGB Format
-    with Image.open(image_path) as im:
-        im = im.convert("RGB")
-        buffer = io.BytesIO()
-        im.save(buffer, quality=90, format="JPEG")
-        # Base64 encode image
-        img_bytes = base64.b64encode(buffer.getvalue())
+    return base64.b64encode(image_to_jpeg(image_path)).decode("ascii")
+
+
+def downscale_image(
+    image_path: typing.Union[str, bytes], max_side: typing.Optional[int]
+) -> typing.Tuple[bytes, typing.Tuple[float, float]]:
+    """
+    Convert local image file or encoded image bytes to JPEG bytes,
+    downscaled so that its longest side is at most `max_side` pixels.
+    JPEG images are decoded at a reduced resolution when they are downscaled.
+    :param image_path: local path to image or encoded image bytes
+    :param max_side: maximum width and height of the encoded image.
+    Images are not downscaled if it is None.
+    :return: encoded image bytes and the factors mapping x and y coordinates
+    of the encoded image to the original image
+    """
+    if max_side is None:
+        return image_to_jpeg(image_path), (1.0, 1.0)
+    if max_side < 1:
+        raise ValueError("max_side must be a positive number of pixels")
 
-    return img_bytes.decode("ascii")
+    source = io.BytesIO(image_path) if isinstance(image_path, bytes) else image_path
+    with Image.open(source) as im:
+        width, height = im.size
+        if max(width, height) <= max_side:
+            return image_to_jpeg(image_path), (1.0, 1.0)
+        # uses the JPEG draft mode to skip decoding the full resolution image
+        im.thumbnail((max_side, max_side))
+        return encode_image(im), (width / im.width, height / im.height)
 
 
 def b64_to_image(image_str: str) -> Image.Image:
@@ -0,0 +1,241 @@
+"""
+Adaptive concurrency limiting for requests to the Epigos API and storage.
+
+The limiters follow AIMD (additive increase, multiplicative decrease):
+the number of requests allowed in flight grows by one for every window of
+healthy responses and is cut by `backoff` when a request is rejected with
+429 or 5xx, fails to connect, or is much slower than the average latency.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+import typing
+
+# latencies below this are treated as equally fast
+MIN_BASELINE_LATENCY = 0.01
+# weight of a new latency in the moving average of healthy latencies
+BASELINE_WEIGHT = 0.1
+
+
+def is_overload_status(status_code: int) -> bool:
+    """
+    Returns true if a response status means the server is overloaded
+    :param status_code: HTTP status code
+    :return: bool
+    """
+    return status_code == 429 or status_code >= 500
+
+
+class LimiterSlot:
+    """
+    A request admitted by a limiter. Requests are counted as failed
+    unless their response status is reported before the slot is released.
+    """
+
+    def __init__(self, epoch: int = 0) -> None:
+        self.epoch = epoch
+        self.started = time.monotonic()
+        self.overloaded = True
+
+    def report(self, status_code: int) -> None:
+        """
+        Records the response status of the request
+        :param status_code: HTTP status code
+        """
+        self.overloaded = is_overload_status(status_code)
+
+
+class _LimitSettings(typing.NamedTuple):
+    min_limit: int
+    max_limit: int
+    backoff: float
+    latency_tolerance: float
+
+
+class _AdaptiveLimit:
+    """
+    AIMD state shared by the sync and async limiters. Not thread-safe,
+    callers hold their own lock.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Concurrency limits must satisfy 1 <= min <= initial <= max"
+            )
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self._settings = _LimitSettings(
+            min_limit, max_limit, backoff, latency_tolerance
+        )
+        self._limit = initial_limit
+        self._successes = 0
+        self._in_flight = 0
+        self._epoch = 0
+        self._baseline: typing.Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        """
+        Number of requests currently allowed in flight
+        """
+        return self._limit
+
+    @property
+    def max_limit(self) -> int:
+        """
+        Highest number of requests allowed in flight
+        """
+        return self._settings.max_limit
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of requests in flight
+        """
+        return self._in_flight
+
+    def _has_capacity(self) -> bool:
+        return self._in_flight < self.limit
+
+    def _start(self) -> LimiterSlot:
+        self._in_flight += 1
+        return LimiterSlot(self._epoch)
+
+    def _finish(self, slot: LimiterSlot) -> None:
+        self._in_flight -= 1
+        latency = time.monotonic() - slot.started
+        overloaded = slot.overloaded
+
+        if not overloaded:
+            if self._baseline is None:
+                self._baseline = latency
+            threshold = max(self._baseline, MIN_BASELINE_LATENCY)
+            overloaded = latency > threshold * self._settings.latency_tolerance
+            self._baseline += (latency - self._baseline) * BASELINE_WEIGHT
+
+        if overloaded:
+            # requests started before the last decrease saw the old limit,
+            # so a burst of failures only backs off once
+            if slot.epoch == self._epoch:
+                self._limit = max(
+                    self._settings.min_limit, int(self._limit * self._settings.backoff)
+                )
+                self._successes = 0
+                self._epoch += 1
+        else:
+            self._successes += 1
+            if self._successes >= self._limit:
+                self._limit = min(self._settings.max_limit, self._limit + 1)
+                self._successes = 0
+
+
+class AdaptiveLimiter(_AdaptiveLimit):
+    """
+    Adaptive concurrency limiter for requests made from many threads.
+
+        with limiter.slot() as slot:
+            response = client.get(url)
+            slot.report(response.status_code)
+
+    :param initial_limit: Number of requests allowed in flight at start.
+    :param min_limit: Lowest number of requests allowed in flight.
+    :param max_limit: Highest number of requests allowed in flight.
+    :param backoff: Factor the limit is multiplied by on overload.
+    :param latency_tolerance: Requests slower than this multiple of
+    the average latency count as overload.
+    """
+
+    def __init__(self, **kwargs: typing.Any) -> None:
+        super().__init__(**kwargs)
+        self._cond = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self) -> typing.Iterator[LimiterSlot]:
+        """
+        Waits until a request can be sent and admits it
+        :return: Slot of the request
+        """
+        with self._cond:
+            self._cond.wait_for(self._has_capacity)
+            slot = self._start()
+        try:
+            yield slot
+        finally:
+            with self._cond:
+                self._finish(slot)
+                self._cond.notify_all()
+
+
+class AsyncAdaptiveLimiter(_AdaptiveLimit):
+    """
+    Adaptive concurrency limiter for requests made from an event loop.
+    Takes the same arguments as `AdaptiveLimiter`.
+
+        async with limiter.slot() as slot:
+            response = await client.get(url)
+            slot.report(response.status_code)
+    """
+
+    def __init__(self, **kwargs: typing.Any) -> None:
+        super().__init__(**kwargs)
+        self._cond: typing.Optional[asyncio.Condition] = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> typing.AsyncIterator[LimiterSlot]:
+        """
+        Waits until a request can be sent and admits it
+        :return: Slot of the request
+        """
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        cond = self._cond
+        async with cond:
+            await cond.wait_for(self._has_capacity)
+            slot = self._start()
+        try:
+            yield slot
+        finally:
+            async with cond:
+                self._finish(slot)
+                cond.notify_all()
+
+
+def limited(
+    limiter: typing.Optional[AdaptiveLimiter],
+) -> typing.ContextManager[LimiterSlot]:
+    """
+    Returns a slot of the limiter, or an unlimited slot if there is no limiter
+    :param limiter: Limiter or None
+    :return: Context manager of the slot
+    """
+    if limiter is None:
+        return contextlib.nullcontext(LimiterSlot())
+    return limiter.slot()
+
+
+@contextlib.asynccontextmanager
+async def _unlimited() -> typing.AsyncIterator[LimiterSlot]:
+    yield LimiterSlot()
+
+
+def alimited(
+    limiter: typing.Optional[AsyncAdaptiveLimiter],
+) -> typing.AsyncContextManager[LimiterSlot]:
+    """
+    Async counterpart of `limited`
+    :param limiter: Limiter or None
+    :return: Async context manager of the slot
+    """
+    if limiter is None:
+        return _unlimited()
+    return limiter.slot()
@@ -0,0 +1,144 @@
+"""
+Retry helpers for requests to the Epigos API.
+"""
+
+import datetime
+import email.utils
+import threading
+import time
+import typing
+
+import tenacity
+
+
+def parse_retry_after(value: typing.Optional[str]) -> typing.Optional[float]:
+    """
+    Parses the value of a `Retry-After` header
+    :param value: Delay in seconds or an HTTP date
+    :return: Seconds to wait or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    delay = (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+    return max(delay, 0.0)
+
+
+class RetryBudget:
+    """
+    Retry budget limits retries to a fraction of the requests made,
+    so retries cannot multiply the load on a struggling server.
+
+    Every request deposits `ratio` tokens and every retry withdraws one.
+    `min_per_second` retries are always allowed, so clients making
+    few requests can still retry.
+
+    :param ratio: Retries allowed per request made.
+    :param min_per_second: Retries allowed per second regardless of traffic.
+    :param max_tokens: Maximum number of retries that can be saved up.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        max_tokens: float = 10.0,
+    ) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        """
+        Number of retries currently allowed
+        """
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.max_tokens,
+            self._tokens + (now - self._updated) * self.min_per_second,
+        )
+        self._updated = now
+
+    def deposit(self) -> None:
+        """
+        Records a request
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Takes a retry from the budget
+        :return: True if the retry is allowed
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class wait_retry_after(tenacity.wait.wait_base):  # pylint: disable=invalid-name
+    """
+    Tenacity wait strategy waiting as long as the `retry_after` of the raised
+    exception, if the server sent one, and otherwise using `fallback`.
+    Waits are capped at `max_wait` seconds, use `stop_retry_after_exceeds`
+    to give up instead of retrying early.
+    """
+
+    def __init__(self, fallback: tenacity.wait.wait_base, max_wait: float) -> None:
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: tenacity.RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is None:
+            return self.fallback(retry_state)
+        return float(min(retry_after, self.max_wait))
+
+
+class stop_retry_budget(tenacity.stop.stop_base):  # pylint: disable=invalid-name
+    """
+    Tenacity stop condition stopping retries once the retry budget is spent.
+    """
+
+    def __init__(self, budget: RetryBudget) -> None:
+        self.budget = budget
+
+    def __call__(self, retry_state: tenacity.RetryCallState) -> bool:
+        return not self.budget.withdraw()
+
+
+class stop_retry_after_exceeds(tenacity.stop.stop_base):  # pylint: disable=invalid-name
+    """
+    Tenacity stop condition stopping retries when the server asks
+    to wait longer than `max_wait` seconds.
+    """
+
+    def __init__(self, max_wait: float) -> None:
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: tenacity.RetryCallState) -> bool:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(exc, "retry_after", None)
+        return retry_after is not None and retry_after > self.max_wait
@@ -9,7 +9,7 @@ import respx
 import yaml
 from PIL import Image
 
-from epigos import Epigos
+from epigos import AsyncEpigos, Epigos
 
 
 @pytest.fixture
@@ -17,6 +17,11 @@ def client():
     return Epigos("api_key", base_url="http://test", retries=0)
 
 
+@pytest.fixture
+def async_client():
+    return AsyncEpigos("api_key", base_url="http://test", retries=0)
+
+
 @pytest.fixture
 def classification_prediction() -> typing.Dict[str, typing.Any]:
     return dict(
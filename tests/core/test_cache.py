@@ -0,0 +1,109 @@
+import hashlib
+import json
+import time
+
+from epigos.core.cache import PredictionCache, image_digest
+
+
+def test_image_digest_identifies_content(tmp_path):
+    first = tmp_path / "first.jpg"
+    copy = tmp_path / "copy.jpg"
+    first.write_bytes(b"image")
+    copy.write_bytes(b"image")
+
+    assert image_digest(first) == image_digest(str(copy))
+    assert image_digest(b"image") == hashlib.sha256(b"image").hexdigest()
+    assert image_digest("https://foo.bar/a.jpg") != image_digest(
+        "https://foo.bar/b.jpg"
+    )
+
+
+def test_cache_key_depends_on_model_and_options(tmp_path):
+    key = PredictionCache.key("model", b"image", {"confidence": 0.5})
+
+    assert key == PredictionCache.key("model", b"image", {"confidence": 0.5})
+    assert key != PredictionCache.key("model", b"image", {"confidence": 0.7})
+    assert key != PredictionCache.key("other", b"image", {"confidence": 0.5})
+    assert key != PredictionCache.key("model", b"other", {"confidence": 0.5})
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2)
+    cache.set("a", {"value": "a"})
+    cache.set("b", {"value": "b"})
+    assert cache.get("a") == {"value": "a"}
+
+    cache.set("c", {"value": "c"})
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": "a"}
+    assert cache.get("c") == {"value": "c"}
+    assert cache.stats.hits == 3
+    assert cache.stats.misses == 1
+    assert cache.stats.evictions == 1
+
+
+def test_cache_expires_predictions():
+    cache = PredictionCache(ttl=0.01)
+    cache.set("a", {"value": "a"})
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_disk_tier_is_shared_between_runs(tmp_path):
+    path = tmp_path / "predictions.db"
+    cache = PredictionCache(path=path)
+    cache.set("a", {"value": "a"})
+    cache.close()
+
+    cache = PredictionCache(path=path)
+    assert len(cache) == 0
+    assert cache.get("a") == {"value": "a"}
+    assert cache.stats.disk_hits == 1
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_cache_disk_tier_evicts_by_size(tmp_path):
+    size = len('{"value": "a"}')
+    cache = PredictionCache(
+        max_entries=1, path=tmp_path / "predictions.db", max_bytes=size * 2
+    )
+    cache.set("a", {"value": "a"})
+    cache.set("b", {"value": "b"})
+    cache.get("a")
+    cache.set("c", {"value": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": "a"}
+    cache.close()
+
+
+def test_cache_evicts_by_memory_size():
+    size = len(json.dumps({"image": "a" * 10}))
+    cache = PredictionCache(max_memory_bytes=size * 2)
+    cache.set("a", {"image": "a" * 10})
+    cache.set("b", {"image": "b" * 10})
+    cache.set("c", {"image": "c" * 10})
+    cache.set("large", {"image": "l" * 100})
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("large") is None
+    assert cache.get("b") == {"image": "b" * 10}
+    assert cache.stats.evictions == 1
+
+
+def test_cache_returns_copies():
+    cache = PredictionCache()
+    value = {"detections": [{"label": "cat"}]}
+    cache.set("a", value)
+    value["detections"].append({"label": "dog"})
+
+    cached = cache.get("a")
+    assert cached == {"detections": [{"label": "cat"}]}
+    cached["detections"].clear()
+    assert cache.get("a") == {"detections": [{"label": "cat"}]}
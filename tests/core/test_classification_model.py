@@ -1,10 +1,17 @@
+import asyncio
+import base64
+import json
+import threading
+import time
 from pathlib import Path
 
 import httpx
 import pytest
 import respx
+from PIL import Image
 
-from epigos import Epigos
+from epigos import AsyncEpigos, Epigos, EpigosException
+from epigos.core.base import DEFAULT_BATCH_WORKERS
 
 ASSETS_PATH = Path(__file__).parent.parent / "assets"
 
@@ -34,3 +41,164 @@ def test_predict_ok(
 
     pred = model.predict(image_path)
     assert pred.dict() == classification_prediction
+
+
+@pytest.mark.parametrize(
+    "image_path", [str(ASSETS_PATH / "cat.jpg"), "https://foo.bar/image.jpg"]
+)
+def test_async_predict_ok(
+    async_client: AsyncEpigos,
+    respx_mock: respx.MockRouter,
+    classification_prediction,
+    image_path: str,
+):
+    model = async_client.classification("model_id")
+
+    url = model._build_url()
+    respx_mock.post(url).mock(
+        return_value=httpx.Response(200, json=dict(classification_prediction))
+    )
+    if "https" in image_path:
+        respx_mock.head(image_path).mock(return_value=httpx.Response(200))
+
+    pred = asyncio.run(model.predict(image_path))
+    assert pred.dict() == classification_prediction
+
+
+def test_async_predict_invalid_image(async_client: AsyncEpigos):
+    with pytest.raises(ValueError):
+        asyncio.run(async_client.classification("model_id").predict("invalid.jpg"))
+
+
+def test_predict_batch(
+    client: Epigos, respx_mock: respx.MockRouter, classification_prediction
+):
+    model = client.classification("model_id")
+
+    respx_mock.post(model._build_url()).mock(
+        return_value=httpx.Response(200, json=dict(classification_prediction))
+    )
+    image_path = ASSETS_PATH / "cat.jpg"
+    images = [image_path, "invalid.jpg", image_path.read_bytes()]
+
+    results = model.predict_batch(images, num_workers=2)
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert results[0].ok and results[0].image == str(image_path)
+    assert results[0].prediction.dict() == classification_prediction
+    assert not results[1].ok and isinstance(results[1].error, ValueError)
+    assert results[1].prediction is None
+    assert results[2].ok and results[2].image is None
+
+
+def test_async_predict_batch(
+    async_client: AsyncEpigos, respx_mock: respx.MockRouter, classification_prediction
+):
+    model = async_client.classification("model_id")
+
+    respx_mock.post(model._build_url()).mock(
+        side_effect=[
+            httpx.Response(200, json=dict(classification_prediction)),
+            httpx.Response(400, json={"message": "bad image"}),
+        ]
+    )
+    image_path = str(ASSETS_PATH / "cat.jpg")
+
+    results = asyncio.run(model.predict_batch([image_path, image_path], num_workers=1))
+
+    assert results[0].prediction.dict() == classification_prediction
+    assert isinstance(results[1].error, EpigosException)
+    assert results[1].error.status_code == 400
+
+
+def test_predict_batch_runs_up_to_concurrency_limit(
+    respx_mock: respx.MockRouter, classification_prediction
+):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        concurrency={"initial_limit": 16, "max_limit": 16},
+    )
+    assert client.concurrent_requests(DEFAULT_BATCH_WORKERS) == 16
+    assert client.concurrent_requests(32) == 32
+    model = client.classification("model_id")
+
+    in_flight = [0]
+    peak = [0]
+    lock = threading.Lock()
+
+    def _predict(request: httpx.Request) -> httpx.Response:
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return httpx.Response(200, json=dict(classification_prediction))
+
+    respx_mock.post(model._build_url()).mock(side_effect=_predict)
+    image = (ASSETS_PATH / "cat.jpg").read_bytes()
+
+    results = model.predict_batch([image] * 32)
+
+    assert all(result.ok for result in results)
+    assert DEFAULT_BATCH_WORKERS < peak[0] <= 16
+
+
+def test_async_predict_batch_runs_up_to_concurrency_limit(
+    respx_mock: respx.MockRouter, classification_prediction
+):
+    in_flight = [0]
+    peak = [0]
+
+    async def _predict(request: httpx.Request) -> httpx.Response:
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return httpx.Response(200, json=dict(classification_prediction))
+
+    respx_mock.post("http://test/predict/classify/model_id/").mock(
+        side_effect=_predict
+    )
+    image = (ASSETS_PATH / "cat.jpg").read_bytes()
+
+    async def _run():
+        client = AsyncEpigos(
+            "api_key",
+            base_url="http://test",
+            retries=0,
+            concurrency={"initial_limit": 16, "max_limit": 16},
+        )
+        model = client.classification("model_id")
+        assert model._build_url() == "/predict/classify/model_id/"
+        return await model.predict_batch([image] * 32)
+
+    results = asyncio.run(_run())
+
+    assert all(result.ok for result in results)
+    assert DEFAULT_BATCH_WORKERS < peak[0] <= 16
+
+
+def test_predict_in_memory_images(
+    client: Epigos,
+    respx_mock: respx.MockRouter,
+    classification_prediction,
+):
+    image_path = ASSETS_PATH / "cat.jpg"
+    model = client.classification("model_id")
+    route = respx_mock.post(model._build_url()).mock(
+        return_value=httpx.Response(200, json=dict(classification_prediction))
+    )
+
+    with Image.open(image_path) as im, image_path.open("rb") as f:
+        images = [image_path.read_bytes(), f, im]
+        for source in images:
+            pred = model.predict(source)
+            assert pred.category == classification_prediction["category"]
+
+    sent = json.loads(route.calls[0].request.content)["image"]
+    assert base64.b64decode(sent) == image_path.read_bytes()
+    assert json.loads(route.calls[1].request.content)["image"] == sent
+    assert route.call_count == 3
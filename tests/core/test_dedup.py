@@ -0,0 +1,64 @@
+import hashlib
+
+from epigos.core.dedup import REQUESTS_PER_UPLOAD, DedupIndex, file_digest
+
+
+def test_file_digest_streams_file_in_chunks(tmp_path):
+    path = tmp_path / "image.jpg"
+    content = bytes(range(256)) * 100
+    path.write_bytes(content)
+
+    assert file_digest(path, chunk_size=1000) == hashlib.sha256(content).hexdigest()
+
+
+def test_dedup_index_skips_duplicates_within_run(tmp_path):
+    first = tmp_path / "first.jpg"
+    copy = tmp_path / "copy.jpg"
+    other = tmp_path / "other.jpg"
+    first.write_bytes(b"image")
+    copy.write_bytes(b"image")
+    other.write_bytes(b"other")
+
+    with DedupIndex("project_id") as index:
+        assert index.check(first) is None
+        assert index.check(other) is None
+        assert index.check(copy) == first
+
+    assert index.stats.images == 3
+    assert index.stats.duplicates == 1
+    assert index.stats.bytes_saved == len(b"image")
+    assert index.stats.requests_saved == REQUESTS_PER_UPLOAD
+
+
+def test_dedup_index_manifest_skips_uploaded_images(tmp_path):
+    manifest_path = tmp_path / "manifest.db"
+    uploaded = tmp_path / "uploaded.jpg"
+    failed = tmp_path / "failed.jpg"
+    uploaded.write_bytes(b"uploaded")
+    failed.write_bytes(b"failed")
+
+    with DedupIndex("project_id", manifest_path) as index:
+        assert index.check(uploaded) is None
+        assert index.check(failed) is None
+        index.commit(uploaded)
+
+    with DedupIndex("project_id", manifest_path) as index:
+        assert index.check(uploaded) == uploaded.resolve()
+        assert index.check(failed) is None
+
+    with DedupIndex("other_project", manifest_path) as index:
+        assert index.check(uploaded) is None
+
+
+def test_dedup_index_release_failed_upload(tmp_path):
+    first = tmp_path / "first.jpg"
+    copy = tmp_path / "copy.jpg"
+    first.write_bytes(b"image")
+    copy.write_bytes(b"image")
+
+    with DedupIndex("project_id", tmp_path / "manifest.db") as index:
+        assert index.check(first) is None
+        index.release(first)
+        assert index.check(copy) is None
+        index.commit(copy)
+        assert index.check(first) == copy.resolve()
@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+from epigos.core.journal import JournalEntry, UploadJournal, UploadState
+
+
+def test_journal_batches(tmp_path: Path):
+    with UploadJournal(tmp_path / "journal.db") as journal:
+        assert journal.get_batch("batch") is None
+        journal.set_batch("batch", "batch-id")
+        assert journal.get_batch("batch") == "batch-id"
+
+    with UploadJournal(tmp_path / "journal.db") as journal:
+        assert journal.get_batch("batch") == "batch-id"
+
+
+def test_journal_records_upload_steps(tmp_path: Path, mock_image: Path):
+    presigned = {"uploadUrl": "http://upload", "uri": "s3://bucket/path"}
+    record = {"id": "record-id"}
+
+    with UploadJournal(tmp_path / "journal.db") as journal:
+        assert journal.get(mock_image) is None
+
+        journal.update(mock_image, UploadState.uploaded, presigned=presigned)
+        entry = journal.get(mock_image)
+        assert entry == JournalEntry(state=UploadState.uploaded, presigned=presigned)
+        assert entry.reached(UploadState.presigned)
+        assert not entry.reached(UploadState.recorded)
+
+        journal.update(
+            mock_image, UploadState.recorded, presigned=presigned, record=record
+        )
+        assert journal.get(mock_image).record == record
+
+
+def test_journal_restarts_modified_images(tmp_path: Path, mock_image: Path):
+    with UploadJournal(tmp_path / "journal.db") as journal:
+        journal.update(mock_image, UploadState.annotated, record={"id": "record-id"})
+
+        stat = os.stat(mock_image)
+        os.utime(mock_image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert journal.get(mock_image) is None
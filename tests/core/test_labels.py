@@ -0,0 +1,80 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from epigos.core.labels import LabelRegistry
+
+
+def _creator(calls: list):
+    def _create(names):
+        calls.append(list(names))
+        time.sleep(0.01)
+        return {name: f"id-{name}" for name in names}
+
+    return _create
+
+
+def test_label_registry_creates_missing_labels_in_bulk():
+    calls = []
+    registry = LabelRegistry()
+
+    assert registry.resolve(["cat", "dog", "cat"], _creator(calls)) == {
+        "cat": "id-cat",
+        "dog": "id-dog",
+    }
+    assert registry.resolve(["dog", "bird"], _creator(calls)) == {
+        "dog": "id-dog",
+        "bird": "id-bird",
+    }
+    assert registry.resolve(["cat"], _creator(calls)) == {"cat": "id-cat"}
+
+    assert calls == [["cat", "dog"], ["bird"]]
+    assert len(registry) == 3
+    assert "bird" in registry
+
+
+def test_label_registry_is_thread_safe():
+    calls = []
+    registry = LabelRegistry()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(
+                lambda _: registry.resolve(["cat", "dog"], _creator(calls)), range(16)
+            )
+        )
+
+    assert calls == [["cat", "dog"]]
+    assert all(result == {"cat": "id-cat", "dog": "id-dog"} for result in results)
+
+
+def test_label_registry_async_resolve():
+    calls = []
+
+    async def _create(names):
+        calls.append(list(names))
+        await asyncio.sleep(0.01)
+        return {name: f"id-{name}" for name in names}
+
+    async def _run(registry):
+        return await asyncio.gather(
+            *(registry.aresolve(["cat"], _create) for _ in range(5))
+        )
+
+    results = asyncio.run(_run(LabelRegistry()))
+
+    assert calls == [["cat"]]
+    assert results == [{"cat": "id-cat"}] * 5
+
+
+def test_label_registry_persists_labels(tmp_path: Path):
+    path = tmp_path / "labels.json"
+    calls = []
+
+    LabelRegistry(path).resolve(["cat"], _creator(calls))
+    assert json.loads(path.read_text()) == {"cat": "id-cat"}
+
+    registry = LabelRegistry(path)
+    assert registry.resolve(["cat"], _creator(calls)) == {"cat": "id-cat"}
+    assert calls == [["cat"]]
@@ -1,3 +1,7 @@
+import asyncio
+import base64
+import io
+import json
 from pathlib import Path
 
 import httpx
@@ -5,7 +9,9 @@ import pytest
 import respx
 from PIL import Image
 
-from epigos import Epigos
+from epigos import AsyncEpigos, Epigos, typings
+from epigos.core.cache import PredictionCache
+from epigos.utils import image as image_utils
 
 ASSETS_PATH = Path(__file__).parent.parent / "assets"
 
@@ -47,7 +53,7 @@ def test_detect_local_image(
     model = client.object_detection("model_id")
 
     if annotate:
-        object_detection_prediction["image"] = model._prepare_image(image_path)
+        object_detection_prediction["image"] = image_utils.image_to_b64(image_path)
 
     url = model._build_url()
     respx_mock.post(url).mock(
@@ -65,3 +71,181 @@ def test_detect_local_image(
             pred.get_image()
 
     assert pred.dict()["detections"] == object_detection_prediction["detections"]
+
+
+def test_async_detect_local_image(
+    async_client: AsyncEpigos,
+    respx_mock: respx.MockRouter,
+    object_detection_prediction,
+):
+    image_path = str(ASSETS_PATH / "cat.jpg")
+    model = async_client.object_detection("model_id")
+
+    url = model._build_url()
+    route = respx_mock.post(url).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+
+    pred = asyncio.run(model.detect(image_path, stroke_width=2))
+    assert pred.detections == object_detection_prediction["detections"]
+    assert json.loads(route.calls.last.request.content)["stroke_width"] == 2
+
+
+def test_detect_batch(
+    client: Epigos, respx_mock: respx.MockRouter, object_detection_prediction
+):
+    model = client.object_detection("model_id")
+
+    route = respx_mock.post(model._build_url()).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+    images = [str(ASSETS_PATH / "cat.jpg"), str(ASSETS_PATH / "dog.jpg")]
+
+    results = model.detect_batch(images, confidence=0.5, stroke_width=3)
+
+    assert [r.image for r in results] == images
+    assert all(r.ok for r in results)
+    assert route.call_count == 2
+    payload = json.loads(route.calls.last.request.content)
+    assert payload["confidence"] == 0.5
+    assert payload["stroke_width"] == 3
+
+
+def test_async_detect_batch(
+    async_client: AsyncEpigos,
+    respx_mock: respx.MockRouter,
+    object_detection_prediction,
+):
+    model = async_client.object_detection("model_id")
+
+    respx_mock.post(model._build_url()).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+    images = [str(ASSETS_PATH / "cat.jpg"), "invalid.jpg"]
+
+    results = asyncio.run(model.detect_batch(images))
+
+    assert results[0].prediction.detections == object_detection_prediction["detections"]
+    assert isinstance(results[1].error, ValueError)
+
+
+def test_detect_cached_prediction(
+    client: Epigos,
+    respx_mock: respx.MockRouter,
+    object_detection_prediction,
+):
+    image_path = str(ASSETS_PATH / "cat.jpg")
+    model = client.object_detection("model_id", cache=PredictionCache())
+
+    url = model._build_url()
+    route = respx_mock.post(url).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+
+    first = model.detect(image_path)
+    second = model.detect(image_path)
+    assert route.call_count == 1
+    assert second.detections == first.detections
+
+    model.detect(image_path, confidence=0.9)
+    assert route.call_count == 2
+    assert model.cache is not None
+    assert model.cache.stats.hits == 1
+
+
+def test_async_detect_cached_prediction(
+    async_client: AsyncEpigos,
+    respx_mock: respx.MockRouter,
+    object_detection_prediction,
+):
+    image_path = str(ASSETS_PATH / "cat.jpg")
+    cache = PredictionCache()
+    model = async_client.object_detection("model_id", cache=cache)
+
+    url = model._build_url()
+    route = respx_mock.post(url).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+
+    async def detect_twice():
+        await model.detect(image_path)
+        return await model.detect(image_path)
+
+    pred = asyncio.run(detect_twice())
+    assert route.call_count == 1
+    assert pred.detections == object_detection_prediction["detections"]
+
+
+def test_detect_image_url_checked_once(
+    client: Epigos,
+    respx_mock: respx.MockRouter,
+    object_detection_prediction,
+):
+    image_url = "https://foo.bar/image.jpg"
+    model = client.object_detection("model_id")
+
+    head = respx_mock.head(image_url).mock(return_value=httpx.Response(200))
+    post = respx_mock.post(model._build_url()).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+
+    model.detect_batch([image_url, image_url, image_url], num_workers=1)
+    assert head.call_count == 1
+    assert post.call_count == 3
+    assert json.loads(post.calls.last.request.content)["image"] == image_url
+
+
+def test_detect_downscaled_image(
+    client: Epigos,
+    respx_mock: respx.MockRouter,
+    object_detection_prediction,
+):
+    image_path = str(ASSETS_PATH / "cat.jpg")
+    model = client.object_detection("model_id", cache=PredictionCache())
+
+    route = respx_mock.post(model._build_url()).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+
+    pred = model.detect(image_path, max_side=160)
+
+    sent = json.loads(route.calls.last.request.content)["image"]
+    with Image.open(io.BytesIO(base64.b64decode(sent))) as im:
+        scale_x, scale_y = 320 / im.width, 267 / im.height
+    detection = object_detection_prediction["detections"][0]
+    assert pred.detections[0] == {
+        **detection,
+        "x": detection["x"] * scale_x,
+        "y": detection["y"] * scale_y,
+        "width": detection["width"] * scale_x,
+        "height": detection["height"] * scale_y,
+    }
+
+    model.detect(image_path)
+    assert route.call_count == 2
+    assert model.detect(image_path, max_side=160).detections == pred.detections
+    assert route.call_count == 2
+
+
+def test_detect_multipart_transport(
+    respx_mock: respx.MockRouter, object_detection_prediction
+):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        transport=typings.PredictTransport.multipart,
+    )
+    image_path = ASSETS_PATH / "cat.jpg"
+    model = client.object_detection("model_id")
+    route = respx_mock.post(model._build_url()).mock(
+        return_value=httpx.Response(200, json=dict(object_detection_prediction))
+    )
+
+    pred = model.detect(image_path.read_bytes(), confidence=0.5)
+
+    assert pred.detections == object_detection_prediction["detections"]
+    request = route.calls.last.request
+    assert request.headers["Content-Type"].startswith("multipart/form-data")
+    assert image_path.read_bytes() in request.content
+    assert b'name="confidence"\r\n\r\n0.5' in request.content
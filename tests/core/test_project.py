@@ -1,15 +1,26 @@
+import asyncio
+import collections
 import logging
-from unittest.mock import MagicMock, call
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
 import httpx
 import pytest
 import respx
 import yaml
 
-from epigos import Epigos, typings
-from epigos.core.uploader import Uploader
+from epigos import AsyncEpigos, Epigos, typings
+from epigos.core.dedup import DedupIndex
+from epigos.core.journal import JournalEntry, UploadState
+from epigos.core.sync import SyncAction
+from epigos.core.uploader import AsyncUploader, Uploader, UploadTask
 from epigos.dataset import ClassificationDataset, DetectionDataset
+from epigos.exceptions import EpigosException
 from epigos.utils import logger
+from epigos.utils.concurrency import start_process_pool
+
+
+def _create_labels(names):
+    return {name: f"label-{name}" for name in names}
 
 
 @pytest.fixture
@@ -345,6 +356,7 @@ def test_project_upload_classification_dataset(
     project = client.project("project_id")
 
     uploader = MagicMock(spec=Uploader)
+    uploader.create_labels.side_effect = _create_labels
     project._uploader = uploader
 
     data_dir = image_dataset_folder / split
@@ -365,8 +377,10 @@ def test_project_upload_classification_dataset(
             img,
             annotations=annots,
             box_format=typings.BoxFormat.pascal_voc,
-            labels_map=uploader.create_labels.return_value,
+            labels_map=_create_labels(ds.classes),
             label_names=ds.classes,
+            journal=None,
+            executor=None,
         )
         for img, annots in ds
     ]
@@ -382,6 +396,7 @@ def test_project_upload_object_detection_pascal_annotation_dataset(
     project = client.project("project_id")
 
     uploader = MagicMock(spec=Uploader)
+    uploader.create_labels.side_effect = _create_labels
     project._uploader = uploader
 
     images_dir = pascal_voc_directory / split / "images"
@@ -409,8 +424,10 @@ def test_project_upload_object_detection_pascal_annotation_dataset(
             img,
             annotations=annot,
             box_format=typings.BoxFormat.pascal_voc,
-            labels_map=uploader.create_labels.return_value,
+            labels_map=_create_labels(ds.classes),
             label_names=ds.classes,
+            journal=None,
+            executor=None,
         )
         for img, annot in ds
     ]
@@ -426,6 +443,7 @@ def test_project_upload_object_detection_yolo_annotation_dataset(
     project = client.project("project_id")
 
     uploader = MagicMock(spec=Uploader)
+    uploader.create_labels.side_effect = _create_labels
     project._uploader = uploader
 
     data_yaml_path = yolo_directory / "data.yaml"
@@ -458,8 +476,10 @@ def test_project_upload_object_detection_yolo_annotation_dataset(
             img,
             annotations=annot,
             box_format=typings.BoxFormat.yolo,
-            labels_map=uploader.create_labels.return_value,
+            labels_map=_create_labels(ds.classes),
             label_names=ds.classes,
+            journal=None,
+            executor=None,
         )
         for img, annot in ds
     ]
@@ -511,6 +531,8 @@ def test_project_upload_object_detection_yolo_annotation_dataset_with_labels_map
             box_format=typings.BoxFormat.yolo,
             labels_map=labels_map,
             label_names=ds.classes,
+            journal=None,
+            executor=None,
         )
         for img, annot in ds
     ]
@@ -525,6 +547,7 @@ def test_project_upload_object_detection_coco_annotation_dataset(
     project = client.project("project_id")
 
     uploader = MagicMock(spec=Uploader)
+    uploader.create_labels.side_effect = _create_labels
     project._uploader = uploader
 
     annotations_path = coco_directory / "coco.json"
@@ -553,14 +576,48 @@ def test_project_upload_object_detection_coco_annotation_dataset(
             img,
             annotations=annot,
             box_format=typings.BoxFormat.coco,
-            labels_map=uploader.create_labels.return_value,
+            labels_map=_create_labels(ds.classes),
             label_names=ds.classes,
+            journal=None,
+            executor=None,
         )
         for img, annot in ds
     ]
     uploader.upload.assert_has_calls(calls, any_order=True)
 
 
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_dataset_reuses_registered_labels(
+    client: Epigos, mock_project, coco_directory, tmp_path
+):
+    mock_project(typings.ProjectType.object_detection)
+    labels_path = tmp_path / "labels.json"
+    project = client.project("project_id", labels_path=labels_path)
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.create_labels.side_effect = _create_labels
+    project._uploader = uploader
+    annotations_path = coco_directory / "coco.json"
+
+    for _ in range(2):
+        tuple(
+            project.upload_coco_dataset(
+                coco_directory, annotations_path=annotations_path
+            )
+        )
+
+    ds = DetectionDataset.from_coco(
+        images_directory_path=coco_directory,
+        annotations_path=annotations_path,
+    )
+    uploader.create_labels.assert_called_once_with(ds.classes)
+    assert labels_path.exists()
+    assert all(
+        c.kwargs["labels_map"] == _create_labels(ds.classes)
+        for c in uploader.upload.call_args_list
+    )
+
+
 @pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
 def test_project_upload_dataset_error(
     client: Epigos, mock_project, coco_directory, caplog
@@ -592,3 +649,595 @@ def test_project_upload_dataset_error(
                 "Error occured while uploading file: %s" % record["img_path"]
                 in caplog.text
             )
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_async_project_upload_object_detection_coco_annotation_dataset(
+    async_client: AsyncEpigos, mock_project, coco_directory
+):
+    mock_project(typings.ProjectType.object_detection)
+    annotations_path = coco_directory / "coco.json"
+
+    async def _run():
+        project = await async_client.project("project_id")
+        assert project.project_id == "project_id"
+        assert project.is_object_detection is True
+
+        uploader = AsyncMock(spec=AsyncUploader)
+        uploader.create_labels.return_value = {"cat": "label-0", "dog": "label-1"}
+        project._uploader = uploader
+
+        recs = [
+            rec
+            async for rec in project.upload_coco_dataset(
+                coco_directory, annotations_path=annotations_path, num_workers=2
+            )
+        ]
+        return uploader, recs
+
+    uploader, recs = asyncio.run(_run())
+
+    ds = DetectionDataset.from_coco(
+        images_directory_path=coco_directory,
+        annotations_path=annotations_path,
+    )
+    assert [rec["img_path"] for rec in recs] == [img for img, _ in ds]
+    uploader.create_batch.assert_awaited_once_with("sdk-upload")
+    uploader.create_labels.assert_awaited_once_with(ds.classes)
+    assert uploader.upload.await_count == len(ds)
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_dataset_unordered_with_bounded_window(
+    client: Epigos, mock_project, coco_directory
+):
+    mock_project(typings.ProjectType.object_detection)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    project._uploader = uploader
+    annotations_path = coco_directory / "coco.json"
+
+    recs = tuple(
+        project.upload_coco_dataset(
+            coco_directory,
+            annotations_path=annotations_path,
+            num_workers=2,
+            max_in_flight=2,
+            ordered=False,
+        )
+    )
+
+    ds = DetectionDataset.from_coco(
+        images_directory_path=coco_directory,
+        annotations_path=annotations_path,
+    )
+    assert sorted(rec["img_path"] for rec in recs) == sorted(img for img, _ in ds)
+    assert all("response" in rec for rec in recs)
+    assert uploader.upload.call_count == len(ds)
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_dataset_reuses_journaled_batch(
+    client: Epigos, mock_project, coco_directory, tmp_path
+):
+    mock_project(typings.ProjectType.object_detection)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.create_batch.return_value = "batch-id"
+    project._uploader = uploader
+    annotations_path = coco_directory / "coco.json"
+    journal_path = tmp_path / "journal.db"
+
+    for _ in range(2):
+        tuple(
+            project.upload_coco_dataset(
+                coco_directory,
+                annotations_path=annotations_path,
+                journal_path=journal_path,
+            )
+        )
+
+    uploader.create_batch.assert_called_once_with("sdk-upload")
+    journal = uploader.upload.call_args.kwargs["journal"]
+    assert journal.path == journal_path
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_dataset_lazy_parses_annotations_in_workers(
+    client: Epigos, mock_project, pascal_voc_directory
+):
+    mock_project(typings.ProjectType.object_detection)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    project._uploader = uploader
+
+    images_dir = pascal_voc_directory / "train" / "images"
+    annotations_dir = pascal_voc_directory / "train" / "labels"
+
+    recs = list(
+        project.upload_pascal_voc_dataset(
+            images_dir,
+            annotations_directory=annotations_dir,
+            num_workers=2,
+            lazy=True,
+        )
+    )
+
+    ds = DetectionDataset.from_pascal_voc(
+        images_directory_path=images_dir,
+        annotations_directory_path=annotations_dir,
+    )
+    assert [rec["img_path"] for rec in recs] == [img for img, _ in ds]
+    uploader.create_labels.assert_not_called()
+
+    calls = [
+        call(
+            uploader.create_batch.return_value,
+            img,
+            annotations=annot,
+            box_format=typings.BoxFormat.pascal_voc,
+            labels_map=None,
+            label_names=[],
+            journal=None,
+            executor=None,
+        )
+        for img, annot in ds
+    ]
+    uploader.upload.assert_has_calls(calls, any_order=True)
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=False)
+def test_project_upload_dataset_pipeline(
+    client: Epigos, mock_project, mock_upload_api_calls, pascal_voc_directory
+):
+    mock_project(typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=["car", "person"])
+    http_mock.post("/projects/project_id/batches/").mock(
+        return_value=httpx.Response(201, json={"id": "batch-id"})
+    )
+    put_route = http_mock.put("http://upload").mock(
+        side_effect=[httpx.Response(500)] + [httpx.Response(204)] * 3
+    )
+    project = client.project("project_id")
+
+    images_dir = pascal_voc_directory / "train" / "images"
+    recs = list(
+        project.upload_pascal_voc_dataset(
+            images_dir,
+            annotations_directory=pascal_voc_directory / "train" / "labels",
+            pipeline={"preprocess": 2, "put": 3, "queue_size": 2},
+        )
+    )
+
+    ds = DetectionDataset.from_pascal_voc(
+        images_directory_path=images_dir,
+        annotations_directory_path=pascal_voc_directory / "train" / "labels",
+    )
+    assert [rec["img_path"] for rec in recs] == [img for img, _ in ds]
+    assert put_route.call_count == len(ds)
+
+    failed = [rec for rec in recs if "response" not in rec]
+    assert len(failed) == 1
+    uploaded = [rec["response"] for rec in recs if "response" in rec]
+    assert len(uploaded) == 3
+    assert all(rec["id"] == "record-id" for rec in uploaded)
+    assert all(rec["annotations"] == [{"id": "annotation-id"}] for rec in uploaded)
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=False)
+def test_project_upload_dataset_preprocesses_in_process_pool(
+    client: Epigos, mock_project, mock_upload_api_calls, pascal_voc_directory
+):
+    mock_project(typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=["car", "person"])
+    http_mock.post("/projects/project_id/batches/").mock(
+        return_value=httpx.Response(201, json={"id": "batch-id"})
+    )
+    project = client.project("project_id")
+
+    with patch(
+        "epigos.core.dataset_upload.start_process_pool", wraps=start_process_pool
+    ) as pool_mock:
+        recs = list(
+            project.upload_pascal_voc_dataset(
+                pascal_voc_directory / "train" / "images",
+                annotations_directory=pascal_voc_directory / "train" / "labels",
+                num_workers=2,
+                process_workers=2,
+            )
+        )
+
+    pool_mock.assert_called_once_with(2)
+    assert len(recs) == 4
+    assert all(rec["response"]["id"] == "record-id" for rec in recs)
+    assert all(
+        rec["response"]["annotations"] == [{"id": "annotation-id"}] for rec in recs
+    )
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_session_creates_batch_once(
+    client: Epigos, mock_project, mock_image
+):
+    mock_project(typings.ProjectType.classification)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    project._uploader = uploader
+
+    with project.session() as session:
+        uploader.create_batch.assert_not_called()
+        for _ in range(3):
+            session.upload(mock_image, use_folder_as_class_name=True)
+
+    uploader.create_batch.assert_called_once_with("sdk-upload")
+    assert uploader.upload.call_count == 3
+    assert session.count == 3
+    assert session.batch_ids == [uploader.create_batch.return_value]
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_session_rotates_batches(
+    client: Epigos, mock_project, mock_image
+):
+    mock_project(typings.ProjectType.classification)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.create_batch.side_effect = lambda name: f"id-{name}"
+    project._uploader = uploader
+
+    with project.session("camera", rotate_every=2) as session:
+        for _ in range(5):
+            session.upload(mock_image)
+
+    assert uploader.create_batch.call_args_list == [
+        call("camera"),
+        call("camera-2"),
+        call("camera-3"),
+    ]
+    batch_ids = [c.args[0] for c in uploader.upload.call_args_list]
+    assert batch_ids == ["id-camera"] * 2 + ["id-camera-2"] * 2 + ["id-camera-3"]
+
+    with pytest.raises(ValueError):
+        project.session(rotate_every=0)
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_session_flushes_submitted_uploads(
+    client: Epigos, mock_project, mock_image
+):
+    mock_project(typings.ProjectType.classification)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    project._uploader = uploader
+
+    with project.session(max_workers=2) as session:
+        futures = [session.submit(mock_image) for _ in range(10)]
+
+    assert all(future.done() for future in futures)
+    uploader.create_batch.assert_called_once_with("sdk-upload")
+    assert uploader.upload.call_count == 10
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_session_retries_failed_batch(
+    client: Epigos, mock_project, mock_image
+):
+    mock_project(typings.ProjectType.classification)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.create_batch.side_effect = [httpx.ConnectError("error"), "id-1", "id-2"]
+    project._uploader = uploader
+
+    with project.session(rotate_every=1) as session:
+        with pytest.raises(httpx.ConnectError):
+            session.upload(mock_image)
+        session.upload(mock_image)
+        session.upload(mock_image)
+
+    assert uploader.create_batch.call_args_list == [
+        call("sdk-upload"),
+        call("sdk-upload-2"),
+        call("sdk-upload-3"),
+    ]
+    assert session.batch_ids == ["id-1", "id-2"]
+    assert uploader.upload.call_count == 2
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_session_raises_failed_submitted_upload(
+    client: Epigos, mock_project, mock_image
+):
+    mock_project(typings.ProjectType.classification)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.upload.side_effect = [{}, httpx.ConnectError("error"), {}]
+    project._uploader = uploader
+
+    with pytest.raises(httpx.ConnectError):
+        with project.session(max_workers=1) as session:
+            futures = [session.submit(mock_image) for _ in range(3)]
+
+    assert all(future.done() for future in futures)
+    assert uploader.upload.call_count == 3
+    session.flush()
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_async_project_upload_session(
+    async_client: AsyncEpigos, mock_project, mock_image
+):
+    mock_project(typings.ProjectType.classification)
+
+    async def _run():
+        project = await async_client.project("project_id")
+        uploader = AsyncMock(spec=AsyncUploader)
+        project._uploader = uploader
+
+        async with project.session(rotate_every=3) as session:
+            tasks = [session.submit(mock_image) for _ in range(4)]
+            await session.upload(mock_image)
+        assert all(task.done() for task in tasks)
+        return uploader
+
+    uploader = asyncio.run(_run())
+
+    assert uploader.create_batch.await_args_list == [
+        call("sdk-upload"),
+        call("sdk-upload-2"),
+    ]
+    assert uploader.upload.await_count == 5
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_async_project_upload_session_failures(
+    async_client: AsyncEpigos, mock_project, mock_image
+):
+    mock_project(typings.ProjectType.classification)
+
+    async def _run():
+        project = await async_client.project("project_id")
+        uploader = AsyncMock(spec=AsyncUploader)
+        uploader.create_batch.side_effect = [httpx.ConnectError("error"), "id-1"]
+        uploader.upload.side_effect = [{}, httpx.ConnectError("error")]
+        project._uploader = uploader
+
+        session = project.session()
+        with pytest.raises(httpx.ConnectError):
+            await session.upload(mock_image)
+        await session.upload(mock_image)
+        assert session.batch_ids == ["id-1"]
+
+        task = session.submit(mock_image)
+        with pytest.raises(httpx.ConnectError):
+            await session.flush()
+        assert task.done()
+        await session.flush()
+        return uploader
+
+    uploader = asyncio.run(_run())
+
+    assert uploader.create_batch.await_count == 2
+    assert uploader.upload.await_count == 2
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+@pytest.mark.parametrize("pipeline", [None, {"put": 2}])
+def test_project_upload_dataset_skips_duplicate_images(
+    client: Epigos, mock_project, coco_directory, tmp_path, pipeline
+):
+    mock_project(typings.ProjectType.object_detection)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.start_task.side_effect = lambda batch_id, path, journal: UploadTask(
+        batch_id=batch_id,
+        image_path=path,
+        entry=JournalEntry(state=UploadState.pending),
+    )
+    for name in ("prepare_task", "presign_task", "put_task", "record_task"):
+        getattr(uploader, name).side_effect = lambda task, **kwargs: task
+    uploader.annotate_task.side_effect = lambda task, **kwargs: task
+    project._uploader = uploader
+    annotations_path = coco_directory / "coco.json"
+    manifest_path = tmp_path / "manifest.db"
+
+    # the images of the fixture all have the same contents
+    records = list(
+        project.upload_coco_dataset(
+            coco_directory,
+            annotations_path=annotations_path,
+            dedup_path=manifest_path,
+            pipeline=pipeline,
+        )
+    )
+    uploaded = [rec["img_path"] for rec in records if "duplicate_of" not in rec]
+    assert len(uploaded) == 1
+    assert {rec.get("duplicate_of", uploaded[0]) for rec in records} == set(uploaded)
+
+    records = list(
+        project.upload_coco_dataset(
+            coco_directory,
+            annotations_path=annotations_path,
+            dedup_path=manifest_path,
+            pipeline=pipeline,
+        )
+    )
+    assert all("duplicate_of" in rec for rec in records)
+    if pipeline is None:
+        assert uploader.upload.call_count == 1
+    else:
+        assert uploader.prepare_task.call_count == 1
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_upload_dataset_uploads_copy_of_failed_image(
+    client: Epigos, mock_project, coco_directory, tmp_path
+):
+    mock_project(typings.ProjectType.object_detection)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.upload.side_effect = [httpx.ConnectError("failed"), {"id": "record"}]
+    project._uploader = uploader
+
+    # the images of the fixture all have the same contents
+    records = list(
+        project.upload_coco_dataset(
+            coco_directory,
+            annotations_path=coco_directory / "coco.json",
+            dedup=True,
+            num_workers=1,
+        )
+    )
+
+    assert "response" not in records[0] and "duplicate_of" not in records[0]
+    assert records[1]["response"] == {"id": "record"}
+    assert {rec["duplicate_of"] for rec in records[2:]} == {records[1]["img_path"]}
+    assert uploader.upload.call_count == 2
+
+
+@pytest.mark.respx(assert_all_called=False, assert_all_mocked=True)
+@pytest.mark.parametrize("pipeline", [None, {"put": 1}])
+def test_project_upload_dataset_releases_image_on_api_error(
+    client: Epigos, mock_project, mock_upload_api_calls, coco_directory, pipeline
+):
+    mock_project(typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=["cat", "dog"])
+    http_mock.post("/projects/project_id/batches/").mock(
+        return_value=httpx.Response(201, json={"id": "batch-id"})
+    )
+    http_mock.post("/projects/project_id/datasets/records/").mock(
+        return_value=httpx.Response(500, json={"message": "error"})
+    )
+    project = client.project("project_id")
+
+    with patch.object(
+        DedupIndex, "release", autospec=True, side_effect=DedupIndex.release
+    ) as release:
+        with pytest.raises(EpigosException):
+            list(
+                project.upload_coco_dataset(
+                    coco_directory,
+                    annotations_path=coco_directory / "coco.json",
+                    dedup=True,
+                    num_workers=1,
+                    pipeline=pipeline,
+                )
+            )
+
+    assert release.call_args_list[0].args[1].name == "cat1.jpg"
+
+
+@pytest.mark.respx(assert_all_called=False, assert_all_mocked=True)
+def test_async_project_upload_dataset_releases_image_on_api_error(
+    async_client: AsyncEpigos, mock_project, mock_upload_api_calls, coco_directory
+):
+    mock_project(typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=["cat", "dog"])
+    http_mock.post("/projects/project_id/batches/").mock(
+        return_value=httpx.Response(201, json={"id": "batch-id"})
+    )
+    http_mock.post("/projects/project_id/datasets/records/").mock(
+        return_value=httpx.Response(500, json={"message": "error"})
+    )
+
+    async def _run():
+        project = await async_client.project("project_id")
+        async for _ in project.upload_coco_dataset(
+            coco_directory,
+            annotations_path=coco_directory / "coco.json",
+            dedup=True,
+            num_workers=1,
+        ):
+            pass
+
+    with patch.object(
+        DedupIndex, "release", autospec=True, side_effect=DedupIndex.release
+    ) as release:
+        with pytest.raises(EpigosException):
+            asyncio.run(_run())
+
+    assert release.call_args_list[0].args[1].name == "cat1.jpg"
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_project_sync_dataset_uploads_only_changes(
+    client: Epigos, mock_project, coco_directory, tmp_path
+):
+    mock_project(typings.ProjectType.object_detection)
+    project = client.project("project_id")
+
+    uploader = MagicMock(spec=Uploader)
+    uploader.create_batch.return_value = "batch-id"
+    uploads = collections.Counter()
+
+    def _upload(batch_id, path, **kwargs):
+        uploads[path.name] += 1
+        return {"id": f"record-{path.name}-{uploads[path.name]}"}
+
+    uploader.upload.side_effect = _upload
+    project._uploader = uploader
+    ds = DetectionDataset.from_coco(
+        images_directory_path=coco_directory,
+        annotations_path=coco_directory / "coco.json",
+    )
+    manifest_path = tmp_path / "sync.db"
+
+    records = list(project.sync_dataset(ds, manifest_path))
+    assert [rec["action"] for rec in records] == [SyncAction.new] * len(ds)
+    assert uploader.upload.call_count == len(ds)
+
+    assert list(project.sync_dataset(ds, manifest_path)) == []
+    uploader.create_batch.assert_called_once_with("sdk-sync")
+
+    ds.images["cat1.jpg"].write_bytes(b"new contents")
+    ds.annotations["dog1.jpg"] = []
+    records = list(project.sync_dataset(ds, manifest_path))
+
+    assert [(rec["img_path"].name, rec["action"]) for rec in records] == [
+        ("cat1.jpg", SyncAction.changed),
+        ("dog1.jpg", SyncAction.annotations),
+    ]
+    assert [rec["replaces"] for rec in records] == [
+        "record-cat1.jpg-1",
+        "record-dog1.jpg-1",
+    ]
+    assert uploader.upload.call_count == len(ds) + 2
+    assert uploader.upload.call_args.kwargs["annotations"] == []
+    uploader.annotate.assert_not_called()
+    assert list(project.sync_dataset(ds, manifest_path)) == []
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_async_project_sync_dataset(
+    async_client: AsyncEpigos, mock_project, coco_directory, tmp_path
+):
+    mock_project(typings.ProjectType.object_detection)
+    ds = DetectionDataset.from_coco(
+        images_directory_path=coco_directory,
+        annotations_path=coco_directory / "coco.json",
+    )
+
+    async def _run():
+        project = await async_client.project("project_id")
+        uploader = AsyncMock(spec=AsyncUploader)
+        uploader.upload.return_value = {"id": "record-id"}
+        project._uploader = uploader
+
+        first = [rec async for rec in project.sync_dataset(ds, tmp_path / "sync.db")]
+        second = [rec async for rec in project.sync_dataset(ds, tmp_path / "sync.db")]
+        return uploader, first, second
+
+    uploader, first, second = asyncio.run(_run())
+
+    assert len(first) == len(ds)
+    assert second == []
+    assert uploader.upload.await_count == len(ds)
@@ -0,0 +1,88 @@
+import os
+
+from epigos.core.sync import (
+    ManifestEntry,
+    SyncAction,
+    SyncManifest,
+    annotations_fingerprint,
+    diff_dataset,
+)
+from epigos.data_classes.dataset import Detection
+from epigos.dataset import DetectionDataset
+
+
+def _dataset(tmp_path, names):
+    images = {}
+    for name in names:
+        path = tmp_path / name
+        if not path.exists():
+            path.write_bytes(name.encode())
+        images[name] = path
+    annotations = {
+        name: [Detection(bbox=(1, 2, 3, 4), class_name="cat")] for name in names
+    }
+    return DetectionDataset(classes=["cat"], images=images, annotations=annotations)
+
+
+def _synced(manifest, item, record_id="record-id"):
+    item.entry.record_id = record_id
+    manifest.update(item.image_path, item.entry)
+
+
+def test_sync_manifest_diffs_dataset_against_synced_state(tmp_path):
+    ds = _dataset(tmp_path, ["a.jpg", "b.jpg", "c.jpg", "d.jpg"])
+
+    with SyncManifest("project_id", tmp_path / "sync.db") as manifest:
+        items, counts = diff_dataset(manifest, ds, num_workers=2)
+        assert [item.action for item in items] == [SyncAction.new] * 4
+        for item in items:
+            _synced(manifest, item)
+
+        ds.images["b.jpg"].write_bytes(b"new contents")
+        ds.annotations["c.jpg"] = [Detection(bbox=(5, 6, 7, 8), class_name="cat")]
+        os.utime(ds.images["d.jpg"], ns=(0, 0))
+
+        items, counts = diff_dataset(manifest, ds, num_workers=2)
+
+    assert {item.image_name: item.action for item in items} == {
+        "b.jpg": SyncAction.changed,
+        "c.jpg": SyncAction.annotations,
+    }
+    assert counts[SyncAction.unchanged] == 2
+    assert items[1].entry.record_id == "record-id"
+
+
+def test_sync_manifest_skips_hashing_unchanged_files(tmp_path, monkeypatch):
+    ds = _dataset(tmp_path, ["a.jpg"])
+    path = ds.images["a.jpg"]
+
+    with SyncManifest("project_id", tmp_path / "sync.db") as manifest:
+        stat = path.stat()
+        manifest.update(
+            path,
+            ManifestEntry(
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                digest="digest",
+                annotations=annotations_fingerprint(ds.annotations["a.jpg"]),
+                record_id="record-id",
+            ),
+        )
+        monkeypatch.setattr("epigos.core.sync.file_digest", None)
+
+        item = manifest.diff("a.jpg", path, ds.annotations["a.jpg"])
+
+    assert item.action == SyncAction.unchanged
+
+
+def test_sync_manifest_prunes_removed_images(tmp_path):
+    ds = _dataset(tmp_path, ["a.jpg", "b.jpg"])
+
+    with SyncManifest("project_id", tmp_path / "sync.db") as manifest:
+        items, _ = diff_dataset(manifest, ds)
+        for item in items:
+            _synced(manifest, item)
+
+        assert manifest.prune([ds.images["a.jpg"]]) == 1
+        assert manifest.get(ds.images["a.jpg"]) is not None
+        assert manifest.get(ds.images["b.jpg"]) is None
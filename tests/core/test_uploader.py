@@ -1,3 +1,5 @@
+import asyncio
+import json
 import logging
 from pathlib import Path
 from unittest import mock
@@ -5,10 +7,11 @@ from unittest import mock
 import httpx
 import pytest
 import respx
-from PIL import Image
+from PIL import Image, ImageOps
 
-from epigos import Epigos, typings
-from epigos.core.uploader import Uploader
+from epigos import AsyncEpigos, Epigos, typings
+from epigos.core.journal import UploadJournal, UploadState
+from epigos.core.uploader import AsyncUploader, Uploader, preprocess_image
 from epigos.dataset import utils
 from epigos.utils import logger
 
@@ -383,3 +386,223 @@ def test_upload_with_image_scaling(
 
     assert rec["id"] == "record-id"
     assert rec["annotations"] == [{"id": "annotation-id"}]
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_async_upload_pascal_voc_annotations(
+    async_client: AsyncEpigos,
+    mock_image: Path,
+    pascal_voc_annotation: Path,
+    mock_upload_api_calls,
+):
+    uploader = AsyncUploader(
+        async_client, "project_id", typings.ProjectType.object_detection
+    )
+
+    mock_upload_api_calls(labels=["car", "person"])
+
+    rec = asyncio.run(
+        uploader.upload(
+            batch_id="batch-id",
+            image_path=mock_image,
+            annotation_path=pascal_voc_annotation,
+        )
+    )
+    assert rec["id"] == "record-id"
+    assert rec["annotations"] == [{"id": "annotation-id"}]
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_async_create_batch(async_client: AsyncEpigos, respx_mock: respx.MockRouter):
+    uploader = AsyncUploader(
+        async_client, "project_id", typings.ProjectType.classification
+    )
+
+    url = "/projects/project_id/batches/"
+    respx_mock.post(url).mock(return_value=httpx.Response(201, json={"id": "test-id"}))
+    assert asyncio.run(uploader.create_batch("batch")) == "test-id"
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=False)
+def test_upload_resumes_from_journal(
+    client: Epigos,
+    mock_image: Path,
+    pascal_voc_annotation: Path,
+    mock_upload_api_calls,
+    tmp_path: Path,
+):
+    uploader = Uploader(client, "project_id", typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=["car", "person"])
+
+    presigned = {"uploadUrl": "http://upload", "uri": "s3://bucket/path"}
+    with UploadJournal(tmp_path / "journal.db") as journal:
+        journal.update(
+            mock_image,
+            UploadState.recorded,
+            presigned=presigned,
+            record={"id": "resumed-id"},
+        )
+
+        rec = uploader.upload(
+            batch_id="batch-id",
+            image_path=mock_image,
+            annotation_path=pascal_voc_annotation,
+            journal=journal,
+        )
+        assert rec["id"] == "resumed-id"
+        assert rec["annotations"] == [{"id": "annotation-id"}]
+        assert journal.get(mock_image).state == UploadState.annotated
+
+        # presign, put and record steps were completed before
+        assert not any(http_mock.routes[i].called for i in range(3))
+        assert http_mock.routes[4].call_count == 1
+
+        rec = uploader.upload(
+            batch_id="batch-id",
+            image_path=mock_image,
+            annotation_path=pascal_voc_annotation,
+            journal=journal,
+        )
+        assert rec["id"] == "resumed-id"
+        assert http_mock.routes[4].call_count == 1
+
+
+def test_start_task_of_unjournaled_image_is_pending(
+    client: Epigos, mock_image: Path, tmp_path: Path
+):
+    uploader = Uploader(client, "project_id", typings.ProjectType.object_detection)
+    with UploadJournal(tmp_path / "journal.db") as journal:
+        task = uploader.start_task("batch-id", mock_image, journal)
+        assert task.entry.state == UploadState.pending
+        assert not task.entry.reached(UploadState.presigned)
+        assert not task.uploaded
+        assert task.record is None
+        assert not task.done
+
+        journal.update(mock_image, UploadState.presigned, presigned={"uri": "uri"})
+        task = uploader.start_task("batch-id", mock_image, journal)
+        assert task.entry.state == UploadState.presigned
+        assert not task.uploaded
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=False)
+def test_upload_journals_failed_storage_upload(
+    client: Epigos, mock_image: Path, mock_upload_api_calls, tmp_path: Path
+):
+    uploader = Uploader(client, "project_id", typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=[])
+    http_mock.put("http://upload").mock(return_value=httpx.Response(500))
+
+    with UploadJournal(tmp_path / "journal.db") as journal:
+        with pytest.raises(httpx.HTTPStatusError):
+            uploader.upload(batch_id="batch-id", image_path=mock_image, journal=journal)
+
+        assert journal.get(mock_image).state == UploadState.presigned
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=False)
+def test_upload_passes_through_small_jpeg(
+    client: Epigos,
+    async_client: AsyncEpigos,
+    mock_image: Path,
+    mock_upload_api_calls,
+    tmp_path: Path,
+):
+    http_mock = mock_upload_api_calls(labels=[])
+    put_route = http_mock.routes[1]
+    record_route = http_mock.routes[2]
+    uploader = Uploader(client, "project_id", typings.ProjectType.object_detection)
+
+    with mock.patch.object(Image.Image, "save") as save_mock:
+        prepared = uploader.prepare(mock_image)
+        uploader.upload(batch_id="batch-id", image_path=mock_image)
+        save_mock.assert_not_called()
+
+    assert prepared.source == mock_image
+    assert prepared.content_size == mock_image.stat().st_size
+
+    original = mock_image.read_bytes()
+    request = put_route.calls.last.request
+    assert request.read() == original
+    assert request.headers["Content-Length"] == str(len(original))
+    assert json.loads(record_route.calls.last.request.content)["size"] == len(original)
+
+    async_uploader = AsyncUploader(
+        async_client, "project_id", typings.ProjectType.object_detection
+    )
+    asyncio.run(async_uploader.upload(batch_id="batch-id", image_path=mock_image))
+    assert put_route.calls.last.request.read() == original
+
+    large_image = tmp_path / "large.jpg"
+    Image.new("RGB", (2048, 1024), color="white").save(large_image)
+    resized = uploader.prepare(large_image)
+    assert resized.source is None
+    assert resized.size == (1024, 512)
+
+    rotated_image = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (200, 100)).save(rotated_image, exif=exif)
+    assert uploader.prepare(rotated_image).source is None
+
+
+def test_preprocess_image_decodes_large_jpeg_at_reduced_scale(tmp_path: Path):
+    image_path = tmp_path / "large.jpg"
+    Image.new("RGB", (4096, 2048), color="white").save(image_path)
+
+    with mock.patch(
+        "epigos.core.uploader.ImageOps.contain", wraps=ImageOps.contain
+    ) as contain_mock:
+        prepared = preprocess_image(image_path)
+
+    decoded = contain_mock.call_args.args[0]
+    assert decoded.size == (2048, 1024)
+    assert prepared.orig_size == (4096, 2048)
+    assert prepared.size == (1024, 512)
+
+
+@pytest.mark.respx(assert_all_called=True, assert_all_mocked=True)
+def test_upload_creates_labels_once(
+    client: Epigos,
+    mock_image: Path,
+    pascal_voc_annotation: Path,
+    mock_upload_api_calls,
+):
+    uploader = Uploader(client, "project_id", typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=["car", "person"])
+
+    for _ in range(3):
+        rec = uploader.upload(
+            batch_id="batch-id",
+            image_path=mock_image,
+            annotation_path=pascal_voc_annotation,
+        )
+        assert rec["annotations"] == [{"id": "annotation-id"}]
+
+    assert http_mock.routes[3].call_count == 1
+    assert http_mock.routes[4].call_count == 3
+    assert uploader.labels.lookup(["car", "person"]) == {
+        "car": "label-0",
+        "person": "label-1",
+    }
+
+
+@pytest.mark.respx(assert_all_mocked=True, assert_all_called=False)
+def test_upload_storage_errors_reduce_storage_concurrency(
+    mock_image: Path, mock_upload_api_calls
+):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        concurrency={"initial_limit": 8},
+    )
+    uploader = Uploader(client, "project_id", typings.ProjectType.object_detection)
+    http_mock = mock_upload_api_calls(labels=[])
+    http_mock.put("http://upload").mock(return_value=httpx.Response(503))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        uploader.upload(batch_id="batch-id", image_path=mock_image)
+
+    assert client.storage_limiter.limit == 4
+    assert client.limiter.limit == 8
@@ -1,9 +1,13 @@
+import io
+import json
 import os
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
-from epigos.dataset import ClassificationDataset, DetectionDataset
+from epigos.dataset import ClassificationDataset, DetectionDataset, coco
+from epigos.dataset.utils import read_pascal_voc_to_coco
 
 
 @pytest.mark.parametrize("split", ["train", "val"])
@@ -39,6 +43,65 @@ def test_coco_directory(coco_directory):
     assert len(ds.images) == len(ds.annotations)
 
 
+def test_coco_directory_streaming(coco_directory):
+    kwargs = {
+        "images_directory_path": coco_directory,
+        "annotations_path": coco_directory / "coco.json",
+    }
+    ds = DetectionDataset.from_coco(**kwargs)
+    streamed = DetectionDataset.from_coco(streaming=True, **kwargs)
+
+    assert isinstance(streamed.annotations, coco.CocoAnnotationStore)
+    assert streamed.classes == ds.classes
+    assert streamed.images == ds.images
+    assert dict(streamed.annotations) == ds.annotations
+    assert list(streamed) == list(ds)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_arrays(chunk_size: int):
+    document = {
+        "info": {"year": 2024, "tags": ["a", "b"]},
+        "images": [{"id": 1, "file_name": "a.jpg"}, {"id": 2, "file_name": "b.jpg"}],
+        "categories": [],
+        "annotations": [{"bbox": [1.5, 2e1, 3, 40000]}],
+    }
+    fp = io.StringIO(json.dumps(document, indent=2))
+
+    items = list(coco.iter_json_arrays(fp, coco.COCO_SECTIONS, chunk_size=chunk_size))
+
+    assert items == [
+        ("images", {"id": 1, "file_name": "a.jpg"}),
+        ("images", {"id": 2, "file_name": "b.jpg"}),
+        ("annotations", {"bbox": [1.5, 20.0, 3, 40000]}),
+    ]
+
+
+def test_iter_json_arrays_values_larger_than_chunk():
+    document = {
+        "info": {"description": 'skipped "value" ' * 1000, "tags": ["]", "}"]},
+        "images": [{"id": 1, "file_name": "a" * 10000 + ".jpg"}],
+    }
+    fp = io.StringIO(json.dumps(document))
+
+    raw_decode = json.JSONDecoder.raw_decode
+    with mock.patch.object(
+        json.JSONDecoder, "raw_decode", autospec=True, side_effect=raw_decode
+    ) as decode:
+        items = list(coco.iter_json_arrays(fp, ["images"], chunk_size=64))
+
+    assert items == [("images", document["images"][0])]
+    # the two keys and the image are decoded once, the skipped value not at all
+    assert decode.call_count == 3
+
+
+def test_iter_json_arrays_truncated_document():
+    fp = io.StringIO('{"info": {"year": 2024}, "images": [{"id": 1')
+
+    with pytest.raises(ValueError):
+        list(coco.iter_json_arrays(fp, ["images"], chunk_size=7))
+
+
 @pytest.mark.parametrize("split", ["train", "val"])
 def test_read_yolo_directory(yolo_directory, split: str):
     ds = DetectionDataset.from_yolo(
@@ -72,3 +135,71 @@ def test_read_image_folder(image_dataset_folder, split):
     assert all(path.exists() for path in ds.images.values())
 
     assert len(ds.images) == len(ds.annotations)
+
+
+@pytest.mark.parametrize("split", ["train", "val"])
+def test_parallel_directory_readers_preserve_order(
+    pascal_voc_directory, yolo_directory, split: str
+):
+    readers = [
+        lambda **kwargs: DetectionDataset.from_pascal_voc(
+            images_directory_path=pascal_voc_directory / split / "images",
+            annotations_directory_path=pascal_voc_directory / split / "labels",
+            **kwargs,
+        ),
+        lambda **kwargs: DetectionDataset.from_yolo(
+            images_directory_path=yolo_directory / split / "images",
+            annotations_directory_path=yolo_directory / split / "labels",
+            data_yaml_path=yolo_directory / "data.yaml",
+            **kwargs,
+        ),
+    ]
+    for reader in readers:
+        ds = reader()
+        parallel = reader(num_workers=4)
+
+        assert parallel.classes == ds.classes
+        assert list(parallel.images) == list(ds.images)
+        assert list(parallel.annotations.items()) == list(ds.annotations.items())
+
+
+def test_lazy_pascal_voc_directory_reads_annotations_on_iteration(
+    pascal_voc_directory,
+):
+    kwargs = {
+        "images_directory_path": pascal_voc_directory / "train" / "images",
+        "annotations_directory_path": pascal_voc_directory / "train" / "labels",
+    }
+    ds = DetectionDataset.from_pascal_voc(**kwargs)
+
+    with mock.patch(
+        "epigos.dataset.utils.read_pascal_voc_to_coco", wraps=read_pascal_voc_to_coco
+    ) as read_mock:
+        lazy = DetectionDataset.from_pascal_voc(lazy=True, **kwargs)
+        assert read_mock.call_count == 0
+        assert lazy.classes == []
+        assert lazy.images == ds.images
+
+        assert list(lazy) == list(ds)
+        assert read_mock.call_count == len(ds)
+
+
+def test_lazy_yolo_and_coco_directories(yolo_directory, coco_directory):
+    yolo_kwargs = {
+        "images_directory_path": yolo_directory / "train" / "images",
+        "annotations_directory_path": yolo_directory / "train" / "labels",
+        "data_yaml_path": yolo_directory / "data.yaml",
+    }
+    coco_kwargs = {
+        "images_directory_path": coco_directory,
+        "annotations_path": coco_directory / "coco.json",
+    }
+    for reader, kwargs in [
+        (DetectionDataset.from_yolo, yolo_kwargs),
+        (DetectionDataset.from_coco, coco_kwargs),
+    ]:
+        ds = reader(**kwargs)
+        lazy = reader(lazy=True, **kwargs)
+
+        assert lazy.classes == ds.classes
+        assert list(lazy) == list(ds)
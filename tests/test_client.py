@@ -1,13 +1,26 @@
+import asyncio
+import base64
+import json
 import logging
 
 import httpx
 import pytest
 import respx
 
-from epigos import ClassificationModel, Epigos, EpigosException, ObjectDetectionModel
+from epigos import (
+    AsyncClassificationModel,
+    AsyncEpigos,
+    AsyncObjectDetectionModel,
+    ClassificationModel,
+    Epigos,
+    EpigosException,
+    ObjectDetectionModel,
+    typings,
+)
 from epigos.__version__ import __version__
 from epigos.client import RETRY_STATUS_CODES
 from epigos.utils import logger
+from epigos.utils.retry import RetryBudget
 
 
 def test_client_and_headers(client: Epigos):
@@ -23,6 +36,33 @@ def test_client_and_headers(client: Epigos):
         assert client.client.headers.get(key) == value
 
 
+def test_client_storage_pool():
+    with Epigos(
+        "api_key", storage_options={"max_connections": 8, "timeout": 120.0}
+    ) as client:
+        assert isinstance(client.storage, httpx.Client)
+        assert "X-Api-Key" not in client.storage.headers
+        assert client.storage.timeout == httpx.Timeout(120.0)
+        pool = client.storage._transport._pool
+        assert pool._max_connections == 8
+        assert pool._max_keepalive_connections == 8
+
+    assert client.client.is_closed
+    assert client.storage.is_closed
+
+
+def test_async_client_storage_pool():
+    async def _run():
+        async with AsyncEpigos("api_key") as client:
+            assert isinstance(client.storage, httpx.AsyncClient)
+            assert "X-Api-Key" not in client.storage.headers
+        return client
+
+    client = asyncio.run(_run())
+    assert client.client.is_closed
+    assert client.storage.is_closed
+
+
 @pytest.mark.parametrize("path,method", [("/foo", "post"), ("/foo", "get")])
 def test_client_can_call_api_ok(
     client: Epigos, respx_mock: respx.MockRouter, path: str, method: str
@@ -109,3 +149,348 @@ def test_client_can_call_api_retry_on_exception(
     assert exc.value.status_code == status_code
     assert client._retry.attempt_number == client.retry_max_attempts
     assert "Retrying epigos.client.Epigos.make_request" in caplog.text
+
+
+def test_async_client_and_headers(async_client: AsyncEpigos):
+    assert isinstance(async_client.client, httpx.AsyncClient)
+    assert async_client.client.base_url == "http://test"
+    assert async_client.client.headers.get("X-Api-Key") == "api_key"
+
+
+@pytest.mark.parametrize("path,method", [("/foo", "post"), ("/foo", "get")])
+def test_async_client_can_call_api_ok(
+    async_client: AsyncEpigos, respx_mock: respx.MockRouter, path: str, method: str
+):
+    output = {"data": "ok"}
+    respx_mock.request(method, path).mock(return_value=httpx.Response(200, json=output))
+    resp = asyncio.run(async_client.make_request(path=path, method=method))
+    assert resp == output
+
+
+def test_async_client_can_make_get_and_post(
+    async_client: AsyncEpigos, respx_mock: respx.MockRouter
+):
+    output = {"data": "ok"}
+    respx_mock.get("/path").mock(return_value=httpx.Response(200, json=output))
+    respx_mock.post("/path").mock(return_value=httpx.Response(201, json=output))
+
+    async def _run():
+        async with async_client:
+            return (
+                await async_client.make_get(path="/path"),
+                await async_client.make_post(path="/path", json={}),
+            )
+
+    assert asyncio.run(_run()) == (output, output)
+
+
+def test_async_client_resouce_methods(async_client: AsyncEpigos):
+    assert isinstance(async_client.classification("model_id"), AsyncClassificationModel)
+    assert isinstance(
+        async_client.object_detection("model_id"), AsyncObjectDetectionModel
+    )
+
+    with pytest.raises(ValueError):
+        async_client.classification(None)
+
+    with pytest.raises(ValueError):
+        async_client.object_detection(None)
+
+    with pytest.raises(ValueError):
+        asyncio.run(async_client.project(None))
+
+
+@pytest.mark.parametrize("status_code", RETRY_STATUS_CODES)
+def test_async_client_can_call_api_retry_on_exception(
+    async_client: AsyncEpigos, respx_mock: respx.MockRouter, status_code, caplog
+):
+    method = "post"
+    path = "/foo"
+    async_client.retry_max_attempts = 2
+    output = {"message": "gateway errors", "details": [{"test": "error"}]}
+    respx_mock.request(method, path).mock(
+        return_value=httpx.Response(status_code, json=output)
+    )
+
+    with (
+        caplog.at_level(logger=logger.name, level=logging.ERROR),
+        pytest.raises(EpigosException) as exc,
+    ):
+        asyncio.run(async_client.make_request(path=path, method=method))
+
+    assert exc.value.status_code == status_code
+    assert async_client._retry.attempt_number == async_client.retry_max_attempts
+    assert "Retrying epigos.client.AsyncEpigos.make_request" in caplog.text
+
+
+def test_client_adapts_concurrency_to_responses(respx_mock: respx.MockRouter):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        concurrency={"initial_limit": 8},
+    )
+    assert client.limiter is not None and client.storage_limiter is not None
+    assert client.limiter is not client.storage_limiter
+    assert client.limiter.max_limit == 64
+
+    respx_mock.get("/ok").mock(return_value=httpx.Response(200, json={}))
+    respx_mock.get("/busy").mock(return_value=httpx.Response(429, json={}))
+
+    for _ in range(8):
+        client.make_get("/ok")
+    assert client.limiter.limit == 9
+
+    with pytest.raises(EpigosException):
+        client.make_get("/busy")
+    assert client.limiter.limit == 4
+    assert client.storage_limiter.limit == 8
+
+
+def test_client_without_concurrency_options(client: Epigos):
+    assert client.limiter is None
+    assert client.storage_limiter is None
+
+
+def test_async_client_adapts_concurrency_to_responses(respx_mock: respx.MockRouter):
+    respx_mock.get("http://test/busy").mock(return_value=httpx.Response(503, json={}))
+
+    async def _run():
+        async with AsyncEpigos(
+            "api_key",
+            base_url="http://test",
+            retries=1,
+            concurrency={"initial_limit": 8},
+        ) as client:
+            with pytest.raises(EpigosException):
+                await client.make_get("/busy")
+            return client.limiter.limit
+
+    assert asyncio.run(_run()) == 4
+
+
+def test_client_honors_retry_after_on_rate_limit(
+    client: Epigos, respx_mock: respx.MockRouter
+):
+    route = respx_mock.get("/foo")
+    route.side_effect = [
+        httpx.Response(429, json={}, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"ok": True}),
+    ]
+
+    assert client.make_get("/foo", retry={"attempts": 2}) == {"ok": True}
+    assert route.call_count == 2
+
+
+def test_client_does_not_retry_when_asked_to_wait_too_long(
+    client: Epigos, respx_mock: respx.MockRouter
+):
+    route = respx_mock.get("/foo").mock(
+        return_value=httpx.Response(429, json={}, headers={"Retry-After": "120"})
+    )
+
+    with pytest.raises(EpigosException) as exc:
+        client.make_get("/foo", retry={"attempts": 3, "max_wait": 60})
+
+    assert exc.value.retry_after == 120
+    assert route.call_count == 1
+
+
+def test_client_retry_options_per_call(client: Epigos, respx_mock: respx.MockRouter):
+    route = respx_mock.get("/foo").mock(
+        return_value=httpx.Response(500, json={}, headers={"Retry-After": "0"})
+    )
+
+    with pytest.raises(EpigosException):
+        client.make_get("/foo", retry={"attempts": 3})
+    assert route.call_count == 1
+
+    with pytest.raises(EpigosException):
+        client.make_get("/foo", retry={"attempts": 3, "status_codes": [500]})
+    assert route.call_count == 4
+
+
+def test_client_retry_budget_stops_retries(respx_mock: respx.MockRouter):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=3,
+        retry_budget=RetryBudget(ratio=0, min_per_second=0, max_tokens=1),
+    )
+    route = respx_mock.get("/foo").mock(
+        return_value=httpx.Response(503, json={}, headers={"Retry-After": "0"})
+    )
+
+    with pytest.raises(EpigosException):
+        client.make_get("/foo")
+    assert route.call_count == 2
+
+    with pytest.raises(EpigosException):
+        client.make_get("/foo")
+    assert route.call_count == 3
+
+    with pytest.raises(EpigosException):
+        client.make_get("/foo", retry={"budget": False})
+    assert route.call_count == 6
+
+
+def test_async_client_honors_retry_after_on_rate_limit(
+    async_client: AsyncEpigos, respx_mock: respx.MockRouter
+):
+    route = respx_mock.get("http://test/foo")
+    route.side_effect = [
+        httpx.Response(429, json={}, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"ok": True}),
+    ]
+
+    result = asyncio.run(async_client.make_get("/foo", retry={"attempts": 2}))
+
+    assert result == {"ok": True}
+    assert route.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "url_validation, head_calls",
+    [
+        (typings.UrlValidation.cached, 1),
+        (typings.UrlValidation.pooled, 3),
+        (typings.UrlValidation.off, 0),
+    ],
+)
+def test_client_check_url(
+    respx_mock: respx.MockRouter,
+    url_validation: typings.UrlValidation,
+    head_calls: int,
+):
+    url = "https://foo.bar/image.jpg"
+    route = respx_mock.head(url).mock(return_value=httpx.Response(200))
+    client = Epigos("api_key", base_url="http://test", url_validation=url_validation)
+
+    assert all(client.check_url(url) for _ in range(3))
+    assert route.call_count == head_calls
+    assert not client.check_url("foo.jpg")
+    if head_calls:
+        assert "X-Api-Key" not in route.calls.last.request.headers
+
+
+def test_client_check_url_does_not_cache_invalid_urls(
+    client: Epigos, respx_mock: respx.MockRouter
+):
+    url = "https://foo.bar/invalid.jpg"
+    route = respx_mock.head(url).mock(return_value=httpx.Response(404))
+
+    assert not client.check_url(url)
+    assert not client.check_url(url)
+    assert route.call_count == 2
+    assert len(client.url_cache) == 0
+
+
+def test_async_client_check_url(
+    async_client: AsyncEpigos, respx_mock: respx.MockRouter
+):
+    url = "https://foo.bar/image.jpg"
+    route = respx_mock.head(url).mock(return_value=httpx.Response(200))
+
+    async def check_twice():
+        return [await async_client.check_url(url) for _ in range(2)]
+
+    assert asyncio.run(check_twice()) == [True, True]
+    assert route.call_count == 1
+
+
+def test_client_make_image_post_multipart(respx_mock: respx.MockRouter):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        transport=typings.PredictTransport.multipart,
+    )
+    route = respx_mock.post("/predict").mock(
+        return_value=httpx.Response(200, json={"ok": True})
+    )
+
+    res = client.make_image_post(
+        "/predict",
+        image=b"\xff\xd8\xffimage",
+        fields={"confidence": 0.5, "annotate": True, "stroke_width": None},
+    )
+
+    assert res == {"ok": True}
+    request = route.calls.last.request
+    assert request.headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert request.headers["X-Api-Key"] == "api_key"
+    assert b"\xff\xd8\xffimage" in request.content
+    assert b'name="confidence"\r\n\r\n0.5' in request.content
+    assert b'name="annotate"\r\n\r\ntrue' in request.content
+    assert b"stroke_width" not in request.content
+
+
+def test_client_make_image_post_auto_falls_back_to_json(
+    respx_mock: respx.MockRouter,
+):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        transport=typings.PredictTransport.auto,
+    )
+    route = respx_mock.post("/predict").mock(
+        side_effect=[
+            httpx.Response(415, json={"message": "Unsupported media type"}),
+            httpx.Response(200, json={"ok": True}),
+            httpx.Response(200, json={"ok": True}),
+        ]
+    )
+
+    for _ in range(2):
+        client.make_image_post("/predict", image=b"image", fields={"confidence": 0.5})
+
+    assert route.call_count == 3
+    assert route.calls[1].request.headers["Content-Type"] == "application/json"
+    assert json.loads(route.calls.last.request.content) == {
+        "image": base64.b64encode(b"image").decode("ascii"),
+        "confidence": 0.5,
+    }
+
+
+def test_client_make_image_post_auto_keeps_multipart(respx_mock: respx.MockRouter):
+    client = Epigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        transport=typings.PredictTransport.auto,
+    )
+    route = respx_mock.post("/predict").mock(
+        side_effect=[
+            httpx.Response(200, json={"ok": True}),
+            httpx.Response(400, json={"message": "Invalid image"}),
+        ]
+    )
+
+    client.make_image_post("/predict", image=b"image", fields={})
+    with pytest.raises(EpigosException, match="Invalid image"):
+        client.make_image_post("/predict", image=b"image", fields={})
+
+    assert route.call_count == 2
+    assert route.calls.last.request.headers["Content-Type"].startswith(
+        "multipart/form-data"
+    )
+
+
+def test_async_client_make_image_post_sends_urls_as_json(
+    respx_mock: respx.MockRouter,
+):
+    client = AsyncEpigos(
+        "api_key",
+        base_url="http://test",
+        retries=0,
+        transport=typings.PredictTransport.multipart,
+    )
+    route = respx_mock.post("/predict").mock(
+        return_value=httpx.Response(200, json={"ok": True})
+    )
+
+    image_url = "https://foo.bar/image.jpg"
+    asyncio.run(client.make_image_post("/predict", image=image_url, fields={}))
+
+    assert json.loads(route.calls.last.request.content) == {"image": image_url}
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from epigos.utils.concurrency import abounded_map, bounded_map, pipeline_map
+
+
+def test_bounded_map_preserves_order():
+    def _slow_square(x: int) -> int:
+        time.sleep(0.01 * (5 - x))
+        return x * x
+
+    assert list(bounded_map(_slow_square, range(5), max_workers=3)) == [
+        0,
+        1,
+        4,
+        9,
+        16,
+    ]
+
+
+def test_bounded_map_limits_pending_items():
+    consumed = []
+    lock = threading.Lock()
+
+    def _items():
+        for i in range(10):
+            with lock:
+                consumed.append(i)
+            yield i
+
+    results = bounded_map(lambda x: x, _items(), max_workers=2, window=3)
+    assert next(results) == 0
+    assert len(consumed) == 3
+    assert list(results) == list(range(1, 10))
+
+
+def test_bounded_map_raises_errors():
+    def _fail(x: int) -> int:
+        raise ValueError(x)
+
+    with pytest.raises(ValueError):
+        list(bounded_map(_fail, range(3), max_workers=2))
+
+
+def test_pipeline_map_runs_stages_on_separate_pools():
+    threads = {"add": set(), "double": set()}
+
+    def _add(x: int) -> int:
+        threads["add"].add(threading.current_thread().name)
+        time.sleep(0.001 * (10 - x))
+        return x + 1
+
+    def _double(x: int) -> int:
+        threads["double"].add(threading.current_thread().name)
+        return x * 2
+
+    results = pipeline_map(range(10), [(_add, 4), (_double, 1)], window=3)
+
+    assert list(results) == [(x + 1) * 2 for x in range(10)]
+    assert len(threads["double"]) == 1
+    assert threads["add"].isdisjoint(threads["double"])
+
+
+def test_abounded_map_preserves_order_and_limit():
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _double(x: int) -> int:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.001 * (10 - x))
+        in_flight -= 1
+        return x * 2
+
+    async def _run():
+        return [r async for r in abounded_map(_double, range(10), limit=3)]
+
+    assert asyncio.run(_run()) == [x * 2 for x in range(10)]
+    assert max_in_flight == 3
+
+
+def test_bounded_map_unordered_yields_in_completion_order():
+    def _sleep(x: int) -> int:
+        time.sleep(0.05 if x == 0 else 0)
+        return x
+
+    results = list(bounded_map(_sleep, range(4), max_workers=4, ordered=False))
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[-1] == 0
+
+
+def test_abounded_map_unordered_yields_in_completion_order():
+    async def _sleep(x: int) -> int:
+        await asyncio.sleep(0.05 if x == 0 else 0)
+        return x
+
+    async def _run():
+        return [r async for r in abounded_map(_sleep, range(4), limit=4, ordered=False)]
+
+    results = asyncio.run(_run())
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[-1] == 0
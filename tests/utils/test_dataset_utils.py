@@ -1,11 +1,18 @@
+import json
+from unittest import mock
+
 import pytest
 
 from epigos.dataset.utils import (
+    clear_coco_index_cache,
+    load_coco_index,
+    read_coco_file,
     read_pascal_voc_to_coco,
     read_single_coco_annotation,
     read_yolo_config,
     read_yolo_to_coco,
     resize_bounding_box,
+    scan_images,
 )
 
 
@@ -75,3 +82,60 @@ def test_resize_bounding_box():
     orig_image_size = (400, 300)
     expected_output = (-20, -40, 60, 80)
     assert resize_bounding_box(bbox, img_scale, orig_image_size) == expected_output
+
+
+def test_coco_index_is_cached_and_invalidated(coco_directory):
+    annotation_path = coco_directory / "coco.json"
+    clear_coco_index_cache()
+
+    with mock.patch(
+        "epigos.dataset.utils.read_coco_file", wraps=read_coco_file
+    ) as read_mock:
+        index = load_coco_index(annotation_path)
+        for image_name in ["cat1.jpg", "dog1.jpg", "cat2.jpg", "dog2.jpg"]:
+            assert len(read_single_coco_annotation(image_name, annotation_path)) == 2
+        assert read_single_coco_annotation("missing.jpg", annotation_path) == []
+        assert read_mock.call_count == 1
+        assert index.categories == {0: "cat", 1: "dog"}
+
+        with open(annotation_path) as fp:
+            dataset = json.load(fp)
+        dataset["annotations"] = dataset["annotations"][:1]
+        with open(annotation_path, "w") as fp:
+            json.dump(dataset, fp)
+
+        assert len(read_single_coco_annotation("cat1.jpg", annotation_path)) == 1
+        assert read_mock.call_count == 2
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_scan_images_single_pass(tmp_path, num_workers):
+    files = [
+        "top.jpg",
+        "a/one.JPG",
+        "a/nested/two.png",
+        "b/three.jpeg",
+        "b/notes.txt",
+        "c/deep/er/four.PNG",
+    ]
+    for name in files:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    images = scan_images(tmp_path, num_workers=num_workers)
+
+    assert list(images) == ["top.jpg", "one.JPG", "two.png", "three.jpeg", "four.PNG"]
+    assert all(images[p.split("/")[-1]] == tmp_path / p for p in files[:4])
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_scan_images_does_not_follow_symlink_loops(tmp_path, num_workers):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "image.jpg").touch()
+    (tmp_path / "a" / "loop").symlink_to("..", target_is_directory=True)
+
+    images = scan_images(tmp_path, num_workers=num_workers)
+
+    assert images == {"image.jpg": tmp_path / "a" / "image.jpg"}
+    assert set(images) == {p.name for p in tmp_path.glob("**/*.jpg")}
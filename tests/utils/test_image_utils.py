@@ -1,5 +1,6 @@
 import base64
 import io
+import time
 from pathlib import Path
 
 import httpx
@@ -58,3 +59,83 @@ def test_image_to_b64() -> None:
 
     assert im2.width == 320
     assert im2.height == 267
+
+
+def test_image_to_b64_passes_jpeg_bytes_through() -> None:
+    content = (ASSETS_PATH / "cat.jpg").read_bytes()
+
+    assert base64.b64decode(image.image_to_b64(content)) == content
+
+
+def test_image_to_b64_encodes_other_formats_as_jpeg() -> None:
+    buffer = io.BytesIO()
+    Image.new("RGBA", (4, 3)).save(buffer, format="PNG")
+
+    content = base64.b64decode(image.image_to_b64(buffer.getvalue()))
+
+    assert image.is_jpeg(content)
+
+
+def test_load_image() -> None:
+    path = ASSETS_PATH / "cat.jpg"
+    content = path.read_bytes()
+
+    assert image.load_image(path) == str(path)
+    assert image.load_image(content) is content
+    with path.open("rb") as f:
+        assert image.load_image(f) == content
+    with Image.open(path) as im:
+        encoded = image.load_image(im)
+    assert isinstance(encoded, bytes) and image.is_jpeg(encoded)
+
+
+def test_load_image_array() -> None:
+    np = pytest.importorskip("numpy")
+
+    encoded = image.load_image(np.zeros((3, 4, 3), dtype=np.uint8))
+    assert isinstance(encoded, bytes)
+    with Image.open(io.BytesIO(encoded)) as im:
+        assert im.size == (4, 3)
+
+    with pytest.raises(ValueError, match="Unsupported image array"):
+        image.load_image(np.zeros((3, 4, 3), dtype=np.complex64))
+
+
+@pytest.mark.parametrize("source", [io.StringIO("image"), 1.5])
+def test_load_image_unsupported(source) -> None:
+    with pytest.raises(ValueError):
+        image.load_image(source)
+
+
+def test_url_cache_expires_and_evicts() -> None:
+    cache = image.UrlCache(max_entries=2, ttl=0.01)
+    cache.add("https://foo.bar/a.jpg")
+    cache.add("https://foo.bar/b.jpg")
+    cache.add("https://foo.bar/c.jpg")
+
+    assert "https://foo.bar/a.jpg" not in cache
+    assert "https://foo.bar/c.jpg" in cache
+    time.sleep(0.02)
+    assert "https://foo.bar/c.jpg" not in cache
+    assert len(cache) == 1
+
+
+def test_downscale_image() -> None:
+    path = str(ASSETS_PATH / "cat.jpg")
+
+    content, scale = image.downscale_image(path, 160)
+
+    with Image.open(io.BytesIO(content)) as im:
+        assert max(im.size) == 160
+        assert scale == (320 / im.width, 267 / im.height)
+
+
+def test_downscale_image_keeps_small_images() -> None:
+    content = (ASSETS_PATH / "cat.jpg").read_bytes()
+
+    encoded, scale = image.downscale_image(content, 1000)
+
+    assert encoded == content
+    assert scale == (1.0, 1.0)
+    with pytest.raises(ValueError):
+        image.downscale_image(content, 0)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from epigos.utils.limiter import (
+    AdaptiveLimiter,
+    AsyncAdaptiveLimiter,
+    alimited,
+    limited,
+)
+
+
+def _request(limiter: AdaptiveLimiter, status_code: int) -> None:
+    with limiter.slot() as slot:
+        slot.report(status_code)
+
+
+def test_adaptive_limiter_grows_additively_on_healthy_responses():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4)
+
+    for _ in range(2):
+        _request(limiter, 200)
+    assert limiter.limit == 3
+
+    for _ in range(100):
+        _request(limiter, 200)
+    assert limiter.limit == 4
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+def test_adaptive_limiter_backs_off_once_per_burst(status_code):
+    limiter = AdaptiveLimiter(initial_limit=8)
+
+    with limiter.slot() as first, limiter.slot() as second:
+        first.report(status_code)
+        second.report(status_code)
+    assert limiter.limit == 4
+
+    _request(limiter, status_code)
+    assert limiter.limit == 2
+
+    for _ in range(3):
+        _request(limiter, status_code)
+    assert limiter.limit == 1
+
+
+def test_adaptive_limiter_counts_errors_and_slow_requests_as_overload(monkeypatch):
+    limiter = AdaptiveLimiter(initial_limit=8)
+
+    with pytest.raises(ConnectionError):
+        with limiter.slot():
+            raise ConnectionError()
+    assert limiter.limit == 4
+
+    now = [0.0]
+    monkeypatch.setattr("epigos.utils.limiter.time.monotonic", lambda: now[0])
+    for latency in [0.1, 0.1, 0.5]:
+        with limiter.slot() as slot:
+            now[0] += latency
+            slot.report(200)
+    assert limiter.limit == 2
+
+
+def test_adaptive_limiter_bounds_requests_in_flight():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    peak = []
+    lock = threading.Lock()
+
+    def _worker():
+        with limiter.slot() as slot:
+            with lock:
+                peak.append(limiter.in_flight)
+            time.sleep(0.001)
+            slot.report(200)
+
+    threads = [threading.Thread(target=_worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+    assert limiter.in_flight == 0
+
+
+def test_adaptive_limiter_validates_limits():
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(initial_limit=8, max_limit=4)
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(backoff=1.5)
+
+
+def test_async_adaptive_limiter():
+    limiter = AsyncAdaptiveLimiter(initial_limit=2, max_limit=2)
+    peak = []
+
+    async def _request(status_code):
+        async with limiter.slot() as slot:
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0)
+            slot.report(status_code)
+
+    async def _run():
+        await asyncio.gather(*[_request(200) for _ in range(8)])
+        await _request(503)
+
+    asyncio.run(_run())
+    assert max(peak) == 2
+    assert limiter.limit == 1
+
+
+def test_limited_without_limiter():
+    with limited(None) as slot:
+        slot.report(200)
+
+    async def _run():
+        async with alimited(None) as slot:
+            slot.report(200)
+
+    asyncio.run(_run())
@@ -0,0 +1,42 @@
+import datetime
+import email.utils
+
+import pytest
+
+from epigos.utils.retry import RetryBudget, parse_retry_after
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(None, None), ("", None), ("120", 120.0), (" 3 ", 3.0), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    later = email.utils.format_datetime(now + datetime.timedelta(seconds=30), True)
+    earlier = email.utils.format_datetime(now - datetime.timedelta(seconds=30), True)
+
+    assert 25 < parse_retry_after(later) <= 30
+    assert parse_retry_after(earlier) == 0
+
+
+def test_retry_budget_limits_retries_to_fraction_of_requests(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("epigos.utils.retry.time.monotonic", lambda: now[0])
+    budget = RetryBudget(ratio=0.5, min_per_second=1.0, max_tokens=2.0)
+
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    now[0] += 1.5
+    assert budget.tokens == 1.5
+    assert budget.withdraw()
+    assert not budget.withdraw()